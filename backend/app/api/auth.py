@@ -4,19 +4,20 @@ Authentication API endpoints
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.auth import create_access_token
-from app.crud import UserCRUD
+from app.database import get_async_db
+from app.auth import create_access_token, get_password_hash_async, verify_and_update_password_async
+from app.crud import AsyncUserCRUD
 from app.models.schemas import Token, UserCreate, UserResponse, UserRegister, APIResponse
 from app.dependencies import get_current_active_user
 from app.config import settings
+from app.metrics import auth_logins
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=APIResponse)
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     
     # Validate password confirmation
@@ -27,14 +28,14 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Check if username already exists
-    if UserCRUD.get_user_by_username(db, user_data.username):
+    if await AsyncUserCRUD.get_user_by_username(db, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Check if email already exists
-    if UserCRUD.get_user_by_email(db, user_data.email):
+    if await AsyncUserCRUD.get_user_by_email(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -42,7 +43,8 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
     
     # Create user
     user_create = UserCreate(**user_data.dict(exclude={"confirm_password"}))
-    created_user = UserCRUD.create_user(db, user_create)
+    hashed_password = await get_password_hash_async(user_create.password)
+    created_user = await AsyncUserCRUD.create_user(db, user_create, hashed_password=hashed_password)
     
     return APIResponse(
         success=True,
@@ -53,13 +55,17 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login user and return access token"""
     
-    # Authenticate user
-    user = UserCRUD.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+    # Authenticate user (bcrypt runs in the hashing pool, not on the event loop)
+    user = await AsyncUserCRUD.get_user_by_username(db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not valid:
+        auth_logins.inc("invalid_credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -67,10 +73,16 @@ async def login_user(
         )
     
     if not user.is_active:
+        auth_logins.inc("inactive")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
+    auth_logins.inc("success")
+    
+    # Re-hash with the current work factor
+    if new_hash:
+        await AsyncUserCRUD.update_password_hash(db, user.id, new_hash)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
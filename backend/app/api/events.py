@@ -0,0 +1,108 @@
+"""
+Project change feed endpoints (Server-Sent Events and WebSocket)
+
+Browsers cannot set an Authorization header on EventSource or WebSocket
+connections, so both endpoints also accept the token as ?access_token=.
+Access is checked once when the client connects; the database session used
+for the check is closed before streaming starts so a long-lived connection
+does not hold a pooled database connection.
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.crud import AsyncProjectCRUD, AsyncProjectMemberCRUD
+from app.database import AsyncSessionLocal
+from app.dependencies import authenticate_token
+from app.events import encode_event, event_broker, next_event
+
+router = APIRouter(prefix="/projects", tags=["Events"])
+
+def _bearer_token(authorization: Optional[str], access_token: Optional[str]) -> Optional[str]:
+    if access_token:
+        return access_token
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return None
+
+async def _authorize_subscriber(project_id: int, token: Optional[str]):
+    """Check the token and project access; returns (status_code, detail) on failure"""
+    async with AsyncSessionLocal() as db:
+        user = await authenticate_token(token, db) if token else None
+        if user is None or not user.is_active:
+            return status.HTTP_401_UNAUTHORIZED, "Could not validate credentials"
+        project = await AsyncProjectCRUD.get_project(db, project_id)
+        if not project or not project.is_active:
+            return status.HTTP_404_NOT_FOUND, "Project not found"
+        if (project.owner_id != user.id and user.role != "admin"
+                and not await AsyncProjectMemberCRUD.check_user_permission(db, project_id, user.id)):
+            return status.HTTP_403_FORBIDDEN, "Not enough permissions"
+    return None
+
+@router.get("/{project_id}/events")
+async def project_events(
+    project_id: int,
+    request: Request,
+    access_token: Optional[str] = Query(None, description="Bearer token, for clients that cannot send headers")
+):
+    """Stream change events of a project as Server-Sent Events"""
+    failure = await _authorize_subscriber(
+        project_id, _bearer_token(request.headers.get("authorization"), access_token)
+    )
+    if failure:
+        raise HTTPException(status_code=failure[0], detail=failure[1])
+
+    async def stream():
+        async with event_broker.subscribe(project_id) as subscription:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                payload = await next_event(subscription, settings.events_keepalive_seconds)
+                if payload is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield b"data: " + encode_event(payload) + b"\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{project_id}/events/ws")
+async def project_events_ws(
+    websocket: WebSocket,
+    project_id: int,
+    access_token: Optional[str] = Query(None)
+):
+    """Stream change events of a project over a WebSocket (messages are JSON events)"""
+    failure = await _authorize_subscriber(
+        project_id, _bearer_token(websocket.headers.get("authorization"), access_token)
+    )
+    if failure:
+        # 4401/4403/4404 mirror the HTTP status codes
+        await websocket.close(code=4000 + failure[0], reason=failure[1])
+        return
+
+    await websocket.accept()
+    async with event_broker.subscribe(project_id) as subscription:
+        # Incoming messages are ignored; reading them is how a disconnect is noticed
+        async def drain():
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        receiver = asyncio.create_task(drain())
+        try:
+            while not receiver.done():
+                getter = asyncio.create_task(next_event(subscription, settings.events_keepalive_seconds))
+                await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                payload = getter.result() or {"type": "ping"}
+                await websocket.send_text(encode_event(payload).decode())
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            receiver.cancel()
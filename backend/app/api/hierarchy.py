@@ -1,10 +1,11 @@
 """
 API routes for task hierarchy (checklists and action items)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.conditional import conditional_response, make_etag
+from app.database import get_async_db
 from app.dependencies import get_current_user
 from app.models.database import User, Task
 from app.models.schemas import (
@@ -12,7 +13,10 @@ from app.models.schemas import (
     ActionItemCreate, ActionItemUpdate, ActionItemResponse,
     TaskCompleteHierarchy, APIResponse
 )
-from app.crud import ChecklistCRUD, ActionItemCRUD, TaskCRUD, TaskHierarchyCRUD, ProjectMemberCRUD
+from app.crud import (
+    AsyncChecklistCRUD, AsyncActionItemCRUD, AsyncTaskCRUD, AsyncTaskHierarchyCRUD, AsyncProjectMemberCRUD,
+    AsyncProjectCRUD
+)
 
 router = APIRouter(prefix="/api/v1", tags=["hierarchy"])
 
@@ -22,13 +26,13 @@ router = APIRouter(prefix="/api/v1", tags=["hierarchy"])
 async def create_checklist(
     task_id: int,
     checklist: ChecklistCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new checklist for a task"""
     
     # Verify task exists and user has access
-    db_task = TaskCRUD.get_task(db, task_id)
+    db_task = await AsyncTaskCRUD.get_task(db, task_id)
     if not db_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -36,7 +40,7 @@ async def create_checklist(
         )
     
     # Check permissions
-    if not ProjectMemberCRUD.check_user_permission(
+    if not await AsyncProjectMemberCRUD.check_user_permission(
         db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
@@ -46,19 +50,19 @@ async def create_checklist(
     
     # Override task_id from URL
     checklist.task_id = task_id
-    return ChecklistCRUD.create_checklist(db, checklist)
+    return await AsyncChecklistCRUD.create_checklist(db, checklist)
 
 
 @router.get("/tasks/{task_id}/checklists", response_model=List[ChecklistWithItems])
 async def get_task_checklists(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all checklists for a task"""
     
     # Verify task exists and user has access
-    db_task = TaskCRUD.get_task(db, task_id)
+    db_task = await AsyncTaskCRUD.get_task(db, task_id)
     if not db_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +70,7 @@ async def get_task_checklists(
         )
     
     # Check permissions
-    if not ProjectMemberCRUD.check_user_permission(
+    if not await AsyncProjectMemberCRUD.check_user_permission(
         db, db_task.project_id, current_user.id
     ):
         raise HTTPException(
@@ -74,76 +78,64 @@ async def get_task_checklists(
             detail="Not enough permissions"
         )
     
-    checklists = ChecklistCRUD.get_task_checklists(db, task_id)
-    
-    # Add action items to each checklist
-    result = []
-    for checklist in checklists:
-        action_items = ActionItemCRUD.get_checklist_action_items(db, checklist.id)
-        checklist_data = ChecklistResponse.model_validate(checklist)
-        result.append(ChecklistWithItems(
-            **checklist_data.model_dump(),
-            action_items=[ActionItemResponse.model_validate(item) for item in action_items]
-        ))
-    
-    return result
+    # Action items of all checklists come from one query
+    checklists = await AsyncChecklistCRUD.get_task_checklists_with_items(db, task_id)
+    return [ChecklistWithItems.model_validate(checklist) for checklist in checklists]
 
 
 @router.put("/checklists/{checklist_id}", response_model=ChecklistResponse)
 async def update_checklist(
     checklist_id: int,
     checklist_update: ChecklistUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a checklist"""
     
-    db_checklist = ChecklistCRUD.get_checklist(db, checklist_id)
-    if not db_checklist:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncChecklistCRUD.get_checklist_project_id(db, checklist_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Checklist not found"
         )
     
-    # Get task to check permissions
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    return ChecklistCRUD.update_checklist(db, checklist_id, checklist_update)
+    return await AsyncChecklistCRUD.update_checklist(db, checklist_id, checklist_update)
 
 
 @router.delete("/checklists/{checklist_id}", response_model=APIResponse)
 async def delete_checklist(
     checklist_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a checklist"""
     
-    db_checklist = ChecklistCRUD.get_checklist(db, checklist_id)
-    if not db_checklist:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncChecklistCRUD.get_checklist_project_id(db, checklist_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Checklist not found"
         )
     
-    # Get task to check permissions
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    success = ChecklistCRUD.delete_checklist(db, checklist_id)
+    success = await AsyncChecklistCRUD.delete_checklist(db, checklist_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,23 +150,21 @@ async def delete_checklist(
 async def create_action_item(
     checklist_id: int,
     action_item: ActionItemCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new action item for a checklist"""
     
-    # Verify checklist exists and user has access
-    db_checklist = ChecklistCRUD.get_checklist(db, checklist_id)
-    if not db_checklist:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncChecklistCRUD.get_checklist_project_id(db, checklist_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Checklist not found"
         )
     
-    # Get task to check permissions
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -183,36 +173,34 @@ async def create_action_item(
     
     # Override checklist_id from URL
     action_item.checklist_id = checklist_id
-    return ActionItemCRUD.create_action_item(db, action_item)
+    return await AsyncActionItemCRUD.create_action_item(db, action_item)
 
 
 @router.get("/checklists/{checklist_id}/action-items", response_model=List[ActionItemResponse])
 async def get_checklist_action_items(
     checklist_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all action items for a checklist"""
     
-    # Verify checklist exists and user has access
-    db_checklist = ChecklistCRUD.get_checklist(db, checklist_id)
-    if not db_checklist:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncChecklistCRUD.get_checklist_project_id(db, checklist_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Checklist not found"
         )
     
-    # Get task to check permissions
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    action_items = ActionItemCRUD.get_checklist_action_items(db, checklist_id)
+    action_items = await AsyncActionItemCRUD.get_checklist_action_items(db, checklist_id)
     return [ActionItemResponse.model_validate(item) for item in action_items]
 
 
@@ -220,61 +208,55 @@ async def get_checklist_action_items(
 async def update_action_item(
     action_item_id: int,
     action_item_update: ActionItemUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an action item"""
     
-    db_action_item = ActionItemCRUD.get_action_item(db, action_item_id)
-    if not db_action_item:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncActionItemCRUD.get_action_item_project_id(db, action_item_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Action item not found"
         )
     
-    # Get checklist and task to check permissions
-    db_checklist = ChecklistCRUD.get_checklist(db, db_action_item.checklist_id)
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    return ActionItemCRUD.update_action_item(db, action_item_id, action_item_update)
+    return await AsyncActionItemCRUD.update_action_item(db, action_item_id, action_item_update)
 
 
 @router.delete("/action-items/{action_item_id}", response_model=APIResponse)
 async def delete_action_item(
     action_item_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete an action item"""
     
-    db_action_item = ActionItemCRUD.get_action_item(db, action_item_id)
-    if not db_action_item:
+    # Resolve the project in one query to check permissions
+    project_id = await AsyncActionItemCRUD.get_action_item_project_id(db, action_item_id)
+    if project_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Action item not found"
         )
     
-    # Get checklist and task to check permissions
-    db_checklist = ChecklistCRUD.get_checklist(db, db_action_item.checklist_id)
-    db_task = TaskCRUD.get_task(db, db_checklist.task_id)
-    
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id, ["OWNER", "ADMIN", "MEMBER"]
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    success = ActionItemCRUD.delete_action_item(db, action_item_id)
+    success = await AsyncActionItemCRUD.delete_action_item(db, action_item_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -288,40 +270,53 @@ async def delete_action_item(
 @router.get("/tasks/{task_id}/hierarchy", response_model=TaskCompleteHierarchy)
 async def get_task_hierarchy(
     task_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels of subtasks to include"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get complete task hierarchy (task + subtasks + checklists + action items)"""
     
-    db_task = TaskHierarchyCRUD.get_task_with_hierarchy(db, task_id)
-    if not db_task:
+    task_version = await AsyncTaskCRUD.get_task_version(db, task_id)
+    if not task_version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    project_id, version = task_version
     
     # Check permissions
-    if not ProjectMemberCRUD.check_user_permission(
-        db, db_task.project_id, current_user.id
+    if not await AsyncProjectMemberCRUD.check_user_permission(
+        db, project_id, current_user.id
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
+    # Answer revalidation polls before loading the tree
+    not_modified = conditional_response(request, response, make_etag(project_id, version, "hierarchy", task_id, max_depth))
+    if not_modified:
+        return not_modified
+    
+    db_task = await AsyncTaskHierarchyCRUD.get_task_subtree(db, task_id, max_depth=max_depth)
     return TaskCompleteHierarchy.model_validate(db_task)
 
 
 @router.get("/projects/{project_id}/task-tree", response_model=List[TaskCompleteHierarchy])
 async def get_project_task_tree(
     project_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels of subtasks to include"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get complete project task tree"""
     
     # Check permissions
-    if not ProjectMemberCRUD.check_user_permission(
+    if not await AsyncProjectMemberCRUD.check_user_permission(
         db, project_id, current_user.id
     ):
         raise HTTPException(
@@ -329,19 +324,31 @@ async def get_project_task_tree(
             detail="Not enough permissions"
         )
     
-    tasks = TaskHierarchyCRUD.get_project_task_tree(db, project_id)
+    version = await AsyncProjectCRUD.get_project_version(db, project_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Answer revalidation polls before loading the tree
+    not_modified = conditional_response(request, response, make_etag(project_id, version, "task-tree", max_depth))
+    if not_modified:
+        return not_modified
+    
+    tasks = await AsyncTaskHierarchyCRUD.get_project_task_tree(db, project_id, max_depth=max_depth)
     return [TaskCompleteHierarchy.model_validate(task) for task in tasks]
 
 
 @router.get("/tasks/{task_id}/completion", response_model=dict)
 async def get_task_completion(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get task completion percentage based on hierarchy"""
+    """Get task completion percentage from the stored subtree rollup"""
     
-    db_task = TaskCRUD.get_task(db, task_id)
+    db_task = await AsyncTaskCRUD.get_task(db, task_id)
     if not db_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -349,7 +356,7 @@ async def get_task_completion(
         )
     
     # Check permissions
-    if not ProjectMemberCRUD.check_user_permission(
+    if not await AsyncProjectMemberCRUD.check_user_permission(
         db, db_task.project_id, current_user.id
     ):
         raise HTTPException(
@@ -357,11 +364,13 @@ async def get_task_completion(
             detail="Not enough permissions"
         )
     
-    completion_percentage = TaskHierarchyCRUD.calculate_task_completion(db, task_id)
+    completed_items, total_items = db_task.rollup_completed, db_task.rollup_total
     
     return {
         "task_id": task_id,
-        "completion_percentage": completion_percentage,
+        "completion_percentage": (completed_items / total_items * 100) if total_items > 0 else 0.0,
+        "completed_items": completed_items,
+        "total_items": total_items,
         "status": db_task.status
     }
 
@@ -370,7 +379,7 @@ async def get_task_completion(
 async def get_user_action_items(
     user_id: int,
     completed: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get action items assigned to a user"""
@@ -382,5 +391,5 @@ async def get_user_action_items(
             detail="Not enough permissions"
         )
     
-    action_items = ActionItemCRUD.get_user_action_items(db, user_id, completed)
+    action_items = await AsyncActionItemCRUD.get_user_action_items(db, user_id, completed)
     return [ActionItemResponse.model_validate(item) for item in action_items]
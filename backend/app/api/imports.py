@@ -0,0 +1,120 @@
+"""
+Bulk import API endpoints
+"""
+import os
+import tempfile
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.crud import AsyncImportRunCRUD, AsyncJobCRUD, AsyncProjectCRUD, AsyncProjectMemberCRUD
+from app.database import get_async_db
+from app.dependencies import get_current_active_user
+from app.importer import import_run_summary
+from app.jobs import wake_workers
+from app.models.schemas import APIResponse, ImportRunResponse
+
+router = APIRouter(prefix="/projects", tags=["Imports"])
+
+async def _check_import_access(db: AsyncSession, project_id: int, current_user):
+    """Only the project owner, project owners/admins and system admins may import"""
+    project = await AsyncProjectCRUD.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if (project.owner_id != current_user.id and current_user.role != "admin"
+            and not await AsyncProjectMemberCRUD.check_user_permission(db, project_id, current_user.id, ["OWNER", "ADMIN"])):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to import into this project"
+        )
+    return project
+
+def _create_upload_file(project_id: int, import_format: str):
+    os.makedirs(settings.import_upload_dir, exist_ok=True)
+    return tempfile.mkstemp(prefix=f"project{project_id}-", suffix=f".{import_format}", dir=settings.import_upload_dir)
+
+@router.post("/{project_id}/import", response_model=APIResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_project_data(
+    project_id: int,
+    request: Request,
+    response: Response,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    chunk_size: Optional[int] = Query(None, ge=1, le=50000, description="Rows per transaction"),
+    resume_run_id: Optional[int] = Query(None, description="Resume this run; send the same input again"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue an import of tasks, checklists and action items from an NDJSON or CSV request body.
+    
+    Answers 202 with the job that runs the import; its result is the import
+    run summary.
+    """
+    await _check_import_access(db, project_id, current_user)
+    if resume_run_id is not None and not await AsyncImportRunCRUD.get_import_run(db, project_id, resume_run_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import run not found"
+        )
+    
+    # Write the upload to disk for the import job; file I/O runs in the threadpool
+    fd, path = await run_in_threadpool(_create_upload_file, project_id, import_format)
+    try:
+        with os.fdopen(fd, "wb") as upload:
+            async for chunk in request.stream():
+                await run_in_threadpool(upload.write, chunk)
+        job = await AsyncJobCRUD.create_job(
+            db, "import", {
+                "path": os.path.abspath(path), "project_id": project_id, "format": import_format,
+                "user_id": current_user.id, "source_name": request.headers.get("x-filename"),
+                "chunk_size": chunk_size, "resume_run_id": resume_run_id,
+            },
+            created_by=current_user.id, project_id=project_id,
+            # A retry would start a second run; resume explicitly with resume_run_id instead
+            max_attempts=1
+        )
+    except BaseException:
+        # Synchronous on purpose: an await would not run if the request was cancelled
+        os.remove(path)
+        raise
+    wake_workers()
+    
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return APIResponse(
+        success=True,
+        message="Import queued",
+        data={"job_id": job.id, "status_url": f"/api/v1/jobs/{job.id}"}
+    )
+
+@router.get("/{project_id}/imports", response_model=List[ImportRunResponse])
+async def get_import_runs(
+    project_id: int,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the most recent import runs of a project"""
+    await _check_import_access(db, project_id, current_user)
+    runs = await AsyncImportRunCRUD.get_project_import_runs(db, project_id)
+    return [import_run_summary(run) for run in runs]
+
+@router.get("/{project_id}/imports/{run_id}", response_model=ImportRunResponse)
+async def get_import_run(
+    project_id: int,
+    run_id: int,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get progress and per-row errors of an import run"""
+    await _check_import_access(db, project_id, current_user)
+    run = await AsyncImportRunCRUD.get_import_run(db, project_id, run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import run not found"
+        )
+    return import_run_summary(run)
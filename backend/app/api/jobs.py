@@ -0,0 +1,88 @@
+"""
+Background job API endpoints
+"""
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import AsyncJobCRUD
+from app.database import get_async_db
+from app.dependencies import get_admin_user, get_current_active_user
+from app.jobs import MAINTENANCE_JOBS, discard_upload, is_cancellable, wake_workers
+from app.models.schemas import JobCreate, JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+async def _get_visible_job(db: AsyncSession, job_id: int, current_user):
+    """Users see the jobs they created; admins see all jobs"""
+    job = await AsyncJobCRUD.get_job(db, job_id)
+    if not job or (job.created_by != current_user.id and current_user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(queued|running|succeeded|failed|cancelled)$"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's most recent jobs (all jobs for admins)"""
+    created_by = None if current_user.role == "admin" else current_user.id
+    return await AsyncJobCRUD.get_jobs(db, created_by=created_by, status=status_filter, limit=limit)
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job: JobCreate,
+    current_user = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue a maintenance job (admin only)"""
+    if job.kind not in MAINTENANCE_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"kind must be one of: {', '.join(MAINTENANCE_JOBS)}"
+        )
+    project_id = job.payload.get("project_id")
+    if project_id is not None and not isinstance(project_id, int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="payload.project_id must be an integer"
+        )
+    created_job = await AsyncJobCRUD.create_job(
+        db, job.kind, job.payload, created_by=current_user.id, project_id=project_id
+    )
+    wake_workers()
+    return created_job
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get status, progress and result of a job"""
+    return await _get_visible_job(db, job_id, current_user)
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: int,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancel a queued job or ask a running one to stop"""
+    job = await _get_visible_job(db, job_id, current_user)
+    if not is_cancellable(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status} and cannot be cancelled"
+        )
+    cancelled_job = await AsyncJobCRUD.cancel_job(db, job_id)
+    # A queued import never runs, so nothing else removes its upload
+    if cancelled_job.kind == "import" and cancelled_job.status == "cancelled":
+        discard_upload(json.loads(cancelled_job.payload or "{}"))
+    return cancelled_job
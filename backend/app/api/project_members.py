@@ -1,20 +1,21 @@
 """
 Project Members API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import get_current_user
 from app.models.database import User, ProjectMember
 from app.models.schemas import (
     ProjectMemberCreate, 
     ProjectMemberUpdate,
     ProjectMemberWithUser,
+    ProjectRole,
     APIResponse
 )
-from app.crud import ProjectMemberCRUD, ProjectCRUD, UserCRUD
+from app.crud import AsyncProjectMemberCRUD, AsyncProjectCRUD, AsyncUserCRUD
 
 router = APIRouter()
 
@@ -22,13 +23,13 @@ router = APIRouter()
 async def add_member_to_project(
     project_id: int,
     member_data: ProjectMemberCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a member to a project"""
     
     # Check if project exists
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,7 +38,7 @@ async def add_member_to_project(
     
     # Check if current user has permission (owner or admin)
     if project.owner_id != current_user.id:
-        if not ProjectMemberCRUD.check_user_permission(
+        if not await AsyncProjectMemberCRUD.check_user_permission(
             db, project_id, current_user.id, ["owner", "admin"]
         ):
             raise HTTPException(
@@ -46,7 +47,7 @@ async def add_member_to_project(
             )
     
     # Check if user to be added exists
-    user_to_add = UserCRUD.get_user(db, member_data.user_id)
+    user_to_add = await AsyncUserCRUD.get_user(db, member_data.user_id)
     if not user_to_add:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +55,7 @@ async def add_member_to_project(
         )
     
     # Check if user is already a member
-    existing_member = ProjectMemberCRUD.get_member_by_project_and_user(
+    existing_member = await AsyncProjectMemberCRUD.get_member_by_project_and_user(
         db, project_id, member_data.user_id
     )
     if existing_member:
@@ -64,7 +65,7 @@ async def add_member_to_project(
         )
     
     # Add member
-    new_member = ProjectMemberCRUD.add_member_to_project(db, project_id, member_data)
+    new_member = await AsyncProjectMemberCRUD.add_member_to_project(db, project_id, member_data)
     
     return APIResponse(
         success=True,
@@ -75,13 +76,18 @@ async def add_member_to_project(
 @router.get("/projects/{project_id}/members", response_model=List[ProjectMemberWithUser])
 async def get_project_members(
     project_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    role: Optional[ProjectRole] = Query(None, description="Filter by project role"),
+    search: Optional[str] = Query(None, min_length=1, max_length=50, description="Username prefix"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all members of a project"""
+    """Get a page of project members with their user profiles"""
     
     # Check if project exists
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,53 +96,30 @@ async def get_project_members(
     
     # Check if user has access to project
     if project.owner_id != current_user.id:
-        if not ProjectMemberCRUD.get_member_by_project_and_user(db, project_id, current_user.id):
+        if not await AsyncProjectMemberCRUD.get_member_by_project_and_user(db, project_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions to view project members"
             )
     
-    members = ProjectMemberCRUD.get_project_members(db, project_id)
-    
-    # Load user data for each member
-    result = []
-    for member in members:
-        user = UserCRUD.get_user(db, member.user_id)
-        if user:
-            result.append({
-                "id": member.id,
-                "project_id": member.project_id,
-                "user_id": member.user_id,
-                "role": member.role,
-                "joined_at": member.joined_at,
-                "is_active": member.is_active,
-                "user": {
-                    "id": user.id,
-                    "username": user.username,
-                    "email": user.email,
-                    "full_name": user.full_name,
-                    "role": user.role,
-                    "is_active": user.is_active,
-                    "is_verified": user.is_verified,
-                    "created_at": user.created_at,
-                    "updated_at": user.updated_at
-                }
-            })
-    
-    return result
+    members, total = await AsyncProjectMemberCRUD.query_project_members(
+        db, project_id, role=role.value if role else None, username_prefix=search, skip=skip, limit=limit
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return [ProjectMemberWithUser.model_validate(member) for member in members]
 
 @router.put("/projects/{project_id}/members/{member_id}", response_model=APIResponse)
 async def update_member_role(
     project_id: int,
     member_id: int,
     member_update: ProjectMemberUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update member role in a project"""
     
     # Check if project exists
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,7 +128,7 @@ async def update_member_role(
     
     # Check permissions (owner or admin)
     if project.owner_id != current_user.id:
-        if not ProjectMemberCRUD.check_user_permission(
+        if not await AsyncProjectMemberCRUD.check_user_permission(
             db, project_id, current_user.id, ["owner", "admin"]
         ):
             raise HTTPException(
@@ -154,7 +137,7 @@ async def update_member_role(
             )
     
     # Update member
-    updated_member = ProjectMemberCRUD.update_member_role(db, member_id, member_update)
+    updated_member = await AsyncProjectMemberCRUD.update_member_role(db, member_id, member_update)
     if not updated_member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,13 +154,13 @@ async def update_member_role(
 async def remove_member_from_project(
     project_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Remove a member from a project"""
     
     # Check if project exists
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -186,7 +169,7 @@ async def remove_member_from_project(
     
     # Check permissions (owner or admin, or user removing themselves)
     if project.owner_id != current_user.id and user_id != current_user.id:
-        if not ProjectMemberCRUD.check_user_permission(
+        if not await AsyncProjectMemberCRUD.check_user_permission(
             db, project_id, current_user.id, ["owner", "admin"]
         ):
             raise HTTPException(
@@ -195,7 +178,7 @@ async def remove_member_from_project(
             )
     
     # Remove member
-    success = ProjectMemberCRUD.remove_member_from_project(db, project_id, user_id)
+    success = await AsyncProjectMemberCRUD.remove_member_from_project(db, project_id, user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -211,7 +194,7 @@ async def remove_member_from_project(
 @router.get("/users/{user_id}/projects", response_model=List[dict])
 async def get_user_projects(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all projects where user is a member"""
@@ -223,11 +206,11 @@ async def get_user_projects(
             detail="Not enough permissions to view user projects"
         )
     
-    memberships = ProjectMemberCRUD.get_user_projects(db, user_id)
+    memberships = await AsyncProjectMemberCRUD.get_user_projects(db, user_id)
     
     result = []
     for membership in memberships:
-        project = ProjectCRUD.get_project(db, membership.project_id)
+        project = await AsyncProjectCRUD.get_project(db, membership.project_id)
         if project:
             result.append({
                 "membership_id": membership.id,
@@ -2,97 +2,147 @@
 Project management API endpoints
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.crud import ProjectCRUD
-from app.models.database import Project
-from app.models.schemas import ProjectResponse, ProjectCreate, ProjectUpdate, APIResponse, PaginatedResponse
+from app.conditional import conditional_response, make_etag
+from app.database import get_async_db
+from app.crud import AsyncProjectCRUD, AsyncProjectMemberCRUD, AsyncTaskCRUD
+from app.export import EXPORT_FORMATS, iter_export
+from app.models.schemas import ProjectResponse, ProjectCreate, ProjectUpdate, ProjectStats, APIResponse, Page
+from app.responses import page_response
 from app.dependencies import get_current_active_user
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], default_response_class=ORJSONResponse)
 
-@router.get("/", response_model=PaginatedResponse)
+@router.get("/", response_model=Page[ProjectResponse])
 async def get_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all projects (paginated)"""
-    projects = ProjectCRUD.get_projects(db, skip=skip, limit=limit)
+    projects = await AsyncProjectCRUD.get_projects(db, skip=skip, limit=limit)
     total = len(projects)
     
-    return PaginatedResponse(
-        items=[ProjectResponse.from_orm(project).dict() for project in projects],
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return page_response(ProjectResponse, projects, total, skip, limit)
 
-@router.get("/my", response_model=PaginatedResponse)
+@router.get("/my", response_model=Page[ProjectResponse])
 async def get_my_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's projects"""
-    projects = ProjectCRUD.get_user_projects(db, current_user.id, skip=skip, limit=limit)
+    projects = await AsyncProjectCRUD.get_user_projects(db, current_user.id, skip=skip, limit=limit)
     total = len(projects)
     
-    return PaginatedResponse(
-        items=[ProjectResponse.from_orm(project).dict() for project in projects],
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return page_response(ProjectResponse, projects, total, skip, limit)
 
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project: ProjectCreate,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new project"""
     # Check if project key already exists
-    existing_project = db.query(Project).filter(Project.key == project.key).first()
+    existing_project = await AsyncProjectCRUD.get_project_by_key(db, project.key)
     if existing_project:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Project key already exists"
         )
     
-    created_project = ProjectCRUD.create_project(db, project, current_user.id)
+    created_project = await AsyncProjectCRUD.create_project(db, project, current_user.id)
     return created_project
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get project by ID"""
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
+    
+    not_modified = conditional_response(request, response, make_etag(project.id, project.version, "project"))
+    if not_modified:
+        return not_modified
     return project
 
+@router.get("/{project_id}/stats", response_model=ProjectStats)
+async def get_project_stats(
+    project_id: int,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Dashboard aggregates: task counts by status, priority and assignee, plus overdue counts"""
+    project = await AsyncProjectCRUD.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if (project.owner_id != current_user.id and current_user.role != "admin"
+            and not await AsyncProjectMemberCRUD.check_user_permission(db, project_id, current_user.id)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view this project"
+        )
+    
+    return await AsyncTaskCRUD.get_project_stats(db, project_id, project.version)
+
+@router.get("/{project_id}/export", response_class=StreamingResponse)
+async def export_project(
+    project_id: int,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    include_hierarchy: bool = Query(False, description="Also export checklists and action items"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream all tasks of a project as NDJSON or CSV"""
+    project = await AsyncProjectCRUD.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if (project.owner_id != current_user.id and current_user.role != "admin"
+            and not await AsyncProjectMemberCRUD.check_user_permission(db, project_id, current_user.id)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to export this project"
+        )
+    
+    # The generator opens its own session and runs in the threadpool
+    return StreamingResponse(
+        iter_export(project_id, export_format, include_hierarchy),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{project.key}-export.{export_format}"'}
+    )
+
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update project (owner or admin)"""
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,17 +156,17 @@ async def update_project(
             detail="Not enough permissions to update this project"
         )
     
-    updated_project = ProjectCRUD.update_project(db, project_id, project_update)
+    updated_project = await AsyncProjectCRUD.update_project(db, project_id, project_update)
     return updated_project
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: int,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete project (owner or admin only)"""
-    project = ProjectCRUD.get_project(db, project_id)
+    project = await AsyncProjectCRUD.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -133,7 +183,7 @@ async def delete_project(
     # Check if project has tasks (optional protection)
     # You might want to prevent deletion if project has tasks
     
-    success = ProjectCRUD.delete_project(db, project_id)
+    success = await AsyncProjectCRUD.delete_project(db, project_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
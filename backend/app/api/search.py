@@ -0,0 +1,39 @@
+"""
+Search API endpoints
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import AsyncSearchCRUD
+from app.database import get_async_db
+from app.dependencies import get_current_active_user
+from app.models.schemas import Page, SearchRecordType, SearchResult
+from app.responses import page_response
+
+router = APIRouter(prefix="/search", tags=["Search"], default_response_class=ORJSONResponse)
+
+@router.get("", response_model=Page[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms; term* matches a prefix"),
+    project_id: Optional[int] = Query(None, description="Only search this project"),
+    types: Optional[List[SearchRecordType]] = Query(None, alias="type", description="Record types to include"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search task, checklist and action item titles and descriptions.
+
+    Results are ranked by relevance and limited to projects the user owns or
+    is a member of. The last term also matches as a prefix.
+    """
+    rows, total = await AsyncSearchCRUD.search_records(
+        db, q, current_user.id,
+        is_admin=current_user.role == "admin",
+        project_id=project_id,
+        types=[record_type.value for record_type in types] if types else None,
+        skip=skip, limit=limit
+    )
+    return page_response(SearchResult, rows, total, skip, limit)
@@ -1,40 +1,50 @@
 """
 Task management API endpoints
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from app.database import get_db
-from app.crud import TaskCRUD, ProjectCRUD
-from app.models.database import Task
-from app.models.schemas import TaskResponse, TaskCreate, TaskUpdate, APIResponse, PaginatedResponse
+from app.conditional import conditional_response, make_etag
+from app.config import settings
+from app.database import get_async_db
+from app.crud import AsyncTaskCRUD, AsyncProjectCRUD, AsyncUserCRUD, AsyncJobCRUD
+from app.jobs import wake_workers
+from app.models.schemas import (
+    TaskResponse, TaskCreate, TaskUpdate, APIResponse, Page,
+    TaskBulkCreate, TaskBulkCreateResponse, TaskBulkUpdate, TaskBulkUpdateResponse
+)
 from app.dependencies import get_current_active_user
+from app.responses import page_response, serialize_rows
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], default_response_class=ORJSONResponse)
 
-@router.get("/", response_model=PaginatedResponse)
+@router.get("/", response_model=Page[TaskResponse])
 async def get_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
     project_id: int = Query(None, description="Filter by project ID"),
-    status: str = Query(None, description="Filter by status"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
     assignee_id: int = Query(None, description="Filter by assignee"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due before this date"),
+    due_after: Optional[datetime] = Query(None, description="Only tasks due on or after this date"),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get tasks with optional filters"""
     
     if project_id:
         # Check if user has access to the project
-        project = ProjectCRUD.get_project(db, project_id)
+        project = await AsyncProjectCRUD.get_project(db, project_id)
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
-        tasks = TaskCRUD.get_project_tasks(db, project_id, skip=skip, limit=limit)
     elif assignee_id:
         # Users can only see their own tasks unless they're admin
         if assignee_id != current_user.id and current_user.role != "admin":
@@ -42,59 +52,54 @@ async def get_tasks(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
-        tasks = TaskCRUD.get_user_tasks(db, assignee_id, skip=skip, limit=limit)
-    else:
-        tasks = TaskCRUD.get_tasks(db, skip=skip, limit=limit)
     
-    # Filter by status if provided
-    if status:
-        tasks = [task for task in tasks if task.status == status]
-    
-    total = len(tasks)
-    
-    return PaginatedResponse(
-        items=[TaskResponse.from_orm(task).dict() for task in tasks],
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        pages=(total + limit - 1) // limit
+    return await _paginate_tasks(
+        db, skip, limit, cursor,
+        project_id=project_id, status=status_filter, assignee_id=assignee_id,
+        priority=priority, due_before=due_before, due_after=due_after
     )
 
-@router.get("/my", response_model=PaginatedResponse)
+@router.get("/my", response_model=Page[TaskResponse])
 async def get_my_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    status: str = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due before this date"),
+    due_after: Optional[datetime] = Query(None, description="Only tasks due on or after this date"),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's assigned tasks"""
-    tasks = TaskCRUD.get_user_tasks(db, current_user.id, skip=skip, limit=limit)
-    
-    # Filter by status if provided
-    if status:
-        tasks = [task for task in tasks if task.status == status]
-    
-    total = len(tasks)
-    
-    return PaginatedResponse(
-        items=[TaskResponse.from_orm(task).dict() for task in tasks],
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        pages=(total + limit - 1) // limit
+    return await _paginate_tasks(
+        db, skip, limit, cursor,
+        assignee_id=current_user.id, status=status_filter, priority=priority,
+        due_before=due_before, due_after=due_after
     )
 
+async def _paginate_tasks(db: AsyncSession, skip: int, limit: int, cursor: Optional[str], **filters) -> ORJSONResponse:
+    """Run a filtered task query and wrap it in a paginated response"""
+    try:
+        tasks, total, next_cursor = await AsyncTaskCRUD.query_tasks(db, cursor=cursor, skip=skip, limit=limit, **filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return page_response(TaskResponse, tasks, total, skip, limit, next_cursor)
+
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task: TaskCreate,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new task"""
     
     # Check if project exists and user has access
-    project = ProjectCRUD.get_project(db, task.project_id)
+    project = await AsyncProjectCRUD.get_project(db, task.project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,8 +116,7 @@ async def create_task(
     
     # If assignee is specified, check if user exists
     if task.assignee_id:
-        from app.crud import UserCRUD
-        assignee = UserCRUD.get_user(db, task.assignee_id)
+        assignee = await AsyncUserCRUD.get_user(db, task.assignee_id)
         if not assignee:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -121,7 +125,7 @@ async def create_task(
     
     # If parent task is specified, check if it exists and belongs to same project
     if task.parent_task_id:
-        parent_task = TaskCRUD.get_task(db, task.parent_task_id)
+        parent_task = await AsyncTaskCRUD.get_task(db, task.parent_task_id)
         if not parent_task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -133,42 +137,73 @@ async def create_task(
                 detail="Parent task must belong to the same project"
             )
     
-    created_task = TaskCRUD.create_task(db, task)
+    created_task = await AsyncTaskCRUD.create_task(db, task)
     return created_task
 
+@router.post("/bulk", response_model=TaskBulkCreateResponse)
+async def bulk_create_tasks(
+    payload: TaskBulkCreate,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many tasks in one transaction, reporting the outcome of each row"""
+    
+    # Same rule as create_task: owner, admin or manager can create tasks
+    def can_create_in_project(project) -> bool:
+        return project.owner_id == current_user.id or current_user.role in ["admin", "manager"]
+    
+    results = await AsyncTaskCRUD.bulk_create_tasks(db, payload.tasks, can_create_in_project)
+    created = sum(1 for result in results if result.success)
+    return TaskBulkCreateResponse(created=created, failed=len(results) - created, results=results)
+
+@router.patch("/bulk", response_model=TaskBulkUpdateResponse)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply the same partial update to many tasks (by IDs or by filter)"""
+    result = await AsyncTaskCRUD.bulk_update_tasks(
+        db, payload.changes,
+        user_id=current_user.id,
+        privileged=current_user.role in ["admin", "manager"],
+        task_ids=payload.task_ids,
+        task_filter=payload.filter
+    )
+    return TaskBulkUpdateResponse(**result)
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get task by ID"""
-    task = TaskCRUD.get_task(db, task_id)
-    if not task:
+    # One joined lookup covers task and project existence and the ETag
+    task_version = await AsyncTaskCRUD.get_task_version(db, task_id)
+    if not task_version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    # Check if user has access to the project
-    project = ProjectCRUD.get_project(db, task.project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    return task
+    project_id, version = task_version
+    not_modified = conditional_response(request, response, make_etag(project_id, version, "task", task_id))
+    if not_modified:
+        return not_modified
+    return await AsyncTaskCRUD.get_task(db, task_id)
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update task"""
-    task = TaskCRUD.get_task(db, task_id)
+    task = await AsyncTaskCRUD.get_task(db, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -176,7 +211,7 @@ async def update_task(
         )
     
     # Check permissions (assignee, project owner, admin, or manager)
-    project = ProjectCRUD.get_project(db, task.project_id)
+    project = await AsyncProjectCRUD.get_project(db, task.project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,17 +236,21 @@ async def update_task(
     elif task_update.status != "done" and task.status == "done":
         task_update.completed_at = None
     
-    updated_task = TaskCRUD.update_task(db, task_id, task_update)
+    updated_task = await AsyncTaskCRUD.update_task(db, task_id, task_update)
     return updated_task
 
-@router.delete("/{task_id}", response_model=APIResponse)
+@router.delete("/{task_id}", response_model=APIResponse, responses={202: {"model": APIResponse}})
 async def delete_task(
     task_id: int,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete task (soft delete by marking as inactive)"""
-    task = TaskCRUD.get_task(db, task_id)
+    """Delete a task with its subtasks, checklists and action items.
+    
+    Answers 202 with a job ID when the subtree is too large to delete within
+    the request.
+    """
+    task = await AsyncTaskCRUD.get_task(db, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -219,7 +258,7 @@ async def delete_task(
         )
     
     # Check permissions (project owner or admin only)
-    project = ProjectCRUD.get_project(db, task.project_id)
+    project = await AsyncProjectCRUD.get_project(db, task.project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,10 +271,23 @@ async def delete_task(
             detail="Not enough permissions to delete this task"
         )
     
-    # For now, we'll actually delete the task
-    # In production, you might want to implement soft delete
-    db.delete(task)
-    db.commit()
+    # Large subtrees are deleted in batches by a background job
+    if task.rollup_total > settings.task_delete_inline_max_items:
+        job = await AsyncJobCRUD.create_job(
+            db, "task.delete", {"task_id": task_id}, created_by=current_user.id, project_id=task.project_id
+        )
+        wake_workers()
+        return ORJSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+            content=APIResponse(
+                success=True,
+                message=f"Task '{task.title}' and {task.rollup_total} items below it are being deleted",
+                data={"job_id": job.id, "status_url": f"/api/v1/jobs/{job.id}"}
+            ).model_dump()
+        )
+    
+    await AsyncTaskCRUD.delete_task(db, task_id)
     
     return APIResponse(
         success=True,
@@ -246,10 +298,10 @@ async def delete_task(
 async def get_task_subtasks(
     task_id: int,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get subtasks of a specific task"""
-    task = TaskCRUD.get_task(db, task_id)
+    task = await AsyncTaskCRUD.get_task(db, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -257,5 +309,5 @@ async def get_task_subtasks(
         )
     
     # Get subtasks
-    subtasks = db.query(Task).filter(Task.parent_task_id == task_id).all()
-    return [TaskResponse.from_orm(subtask) for subtask in subtasks]
+    subtasks = await AsyncTaskCRUD.get_subtasks(db, task_id)
+    return ORJSONResponse(serialize_rows(TaskResponse, subtasks))
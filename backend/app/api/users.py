@@ -3,42 +3,38 @@ User management API endpoints
 """
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.crud import UserCRUD
-from app.models.schemas import UserResponse, UserUpdate, APIResponse, PaginatedResponse
+from app.database import get_async_db
+from app.crud import AsyncUserCRUD
+from app.models.schemas import UserResponse, UserUpdate, APIResponse, Page
+from app.responses import page_response
 from app.dependencies import get_current_active_user, get_admin_user
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], default_response_class=ORJSONResponse)
 
-@router.get("/", response_model=PaginatedResponse)
+@router.get("/", response_model=Page[UserResponse])
 async def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all users (paginated)"""
-    users = UserCRUD.get_users(db, skip=skip, limit=limit)
+    users = await AsyncUserCRUD.get_users(db, skip=skip, limit=limit)
     total = len(users)  # Simple count for now
     
-    return PaginatedResponse(
-        items=[UserResponse.from_orm(user).dict() for user in users],
-        total=total,
-        page=skip // limit + 1,
-        per_page=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return page_response(UserResponse, users, total, skip, limit)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user by ID"""
-    user = UserCRUD.get_user(db, user_id)
+    user = await AsyncUserCRUD.get_user(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -51,7 +47,7 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user (self or admin)"""
     
@@ -62,7 +58,7 @@ async def update_user(
             detail="Not enough permissions to update this user"
         )
     
-    user = UserCRUD.update_user(db, user_id, user_update)
+    user = await AsyncUserCRUD.update_user(db, user_id, user_update)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,10 +70,10 @@ async def update_user(
 async def delete_user(
     user_id: int,
     admin_user = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete user (admin only)"""
-    user = UserCRUD.get_user(db, user_id)
+    user = await AsyncUserCRUD.get_user(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,7 +82,7 @@ async def delete_user(
     
     # Soft delete by deactivating
     user_update = UserUpdate(is_active=False)
-    UserCRUD.update_user(db, user_id, user_update)
+    await AsyncUserCRUD.update_user(db, user_id, user_update)
     
     return APIResponse(
         success=True,
@@ -1,23 +1,68 @@
 """
 Authentication utilities for TaskManager Pro
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.config import settings
+from app.metrics import CallbackMetric, password_hash_duration, password_hash_rejected
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with password_hash_duration.time("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one uses outdated settings"""
+    with password_hash_duration.time("verify"):
+        return pwd_context.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    with password_hash_duration.time("hash"):
+        return pwd_context.hash(password)
+
+class PasswordHasherPool:
+    """Bounded worker pool that keeps bcrypt off the event loop"""
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    
+    async def run(self, fn, *args):
+        """Run fn in the pool, failing fast with 503 when too much work is queued"""
+        if self.pending >= self.max_pending:
+            password_hash_rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+password_hasher = PasswordHasherPool(settings.password_hash_workers, settings.password_hash_max_pending)
+CallbackMetric("password_hash_pending", "Hashing jobs queued or running in the bcrypt pool", (),
+               lambda: {(): password_hasher.pending})
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash in the hashing pool"""
+    return await password_hasher.run(get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing pool, returning a replacement hash when needed"""
+    return await password_hasher.run(verify_and_update_password, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
@@ -0,0 +1,535 @@
+"""
+Caches for TaskManager Pro
+
+Each kind of cached value lives in a CacheNamespace (principal_cache,
+role_cache, ...) with its own TTL and hit counters. Values are stored in the
+backend chosen by settings.cache_backend:
+
+- memory: a per-worker LRU with TTLs (TTLCache); invalidations do not reach
+  other workers, so namespaces can cap their TTL with memory_ttl_seconds
+- redis: one Redis server shared by all workers ("auto" picks it when
+  settings.redis_url is set)
+
+Keys are "<cache_key_prefix><namespace>:<key>". Passing version= appends a
+data version (for example Project.version) to the key, so bumping that
+version retires old entries without having to delete them. Redis errors are
+logged and treated as cache misses, so an outage only costs database reads.
+
+Coroutines use the *_async accessors. The sync accessors are safe from
+worker threads and from sync CRUD code run through AsyncSession.run_sync:
+there Redis is awaited on the event loop instead of blocking it.
+"""
+import asyncio
+import logging
+import pickle
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.util import await_only
+
+from app.config import settings
+from app.metrics import CallbackMetric
+
+logger = logging.getLogger("app.cache")
+
+# Marks a miss in backend results (None is a valid cached value)
+MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (refreshing its LRU position) or default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix: Optional[str] = None):
+        """Drop all entries, or those whose string key starts with prefix"""
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if isinstance(key, str) and key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CacheBackend(ABC):
+    """Key/value storage behind CacheNamespace"""
+
+    name = "none"
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Any]:
+        """Values for keys, in order, with MISSING for misses"""
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, Any], ttl_seconds: float):
+        """Store values that expire after ttl_seconds"""
+
+    @abstractmethod
+    def delete_many(self, keys: List[str]):
+        """Delete keys (missing keys are ignored)"""
+
+    @abstractmethod
+    def clear(self, prefix: str):
+        """Delete every key starting with prefix"""
+
+    @abstractmethod
+    def status(self) -> dict:
+        """Backend health for /api/health"""
+
+    # Coroutine variants; backends that do network I/O override them
+
+    async def get_many_async(self, keys: List[str]) -> List[Any]:
+        return self.get_many(keys)
+
+    async def set_many_async(self, items: Dict[str, Any], ttl_seconds: float):
+        self.set_many(items, ttl_seconds)
+
+    async def delete_many_async(self, keys: List[str]):
+        self.delete_many(keys)
+
+    async def close(self):
+        """Release connections opened on the running event loop"""
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """Per-worker LRU storage; values are kept by reference"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self._cache = TTLCache(max_entries=max_entries)
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        return [self._cache.get(key, MISSING) for key in keys]
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: float):
+        for key, value in items.items():
+            self._cache.set(key, value, ttl_seconds)
+
+    def delete_many(self, keys: List[str]):
+        for key in keys:
+            self._cache.invalidate(key)
+
+    def clear(self, prefix: str):
+        self._cache.clear(prefix)
+
+    def status(self) -> dict:
+        return {
+            "backend": self.name,
+            "status": "online",
+            "size": len(self._cache),
+            "max_entries": self._cache.max_entries,
+        }
+
+
+class RedisBackend(CacheBackend):
+    """Storage on a Redis server shared by all workers.
+
+    Values are pickled, so the server must only be writable by this
+    application. After a connection error the server is skipped for
+    settings.cache_retry_seconds instead of stalling every request on
+    timeouts.
+
+    Threads without an event loop use a blocking client. On an event loop
+    each loop gets its own redis.asyncio client (its connections belong to
+    that loop), awaited directly by the *_async methods and through
+    await_only by sync code running inside AsyncSession.run_sync.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        # Optional dependency: only needed when the redis backend is selected
+        import redis
+        import redis.asyncio
+
+        self._errors = (redis.RedisError,)
+        self._connection_errors = (redis.ConnectionError, redis.TimeoutError)
+        options = dict(
+            socket_timeout=settings.cache_socket_timeout,
+            socket_connect_timeout=settings.cache_socket_timeout,
+            health_check_interval=30,
+        )
+        self._redis = redis.Redis.from_url(url, **options)
+        self._async_factory = lambda: redis.asyncio.Redis.from_url(url, **options)
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self.errors = 0
+        self._retry_at = 0.0
+
+    def _async_client(self, loop: asyncio.AbstractEventLoop):
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = self._async_factory()
+        return client
+
+    def _failed(self, operation: str, error: Exception, default):
+        self.errors += 1
+        if isinstance(error, self._connection_errors):
+            self._retry_at = time.monotonic() + settings.cache_retry_seconds
+        # A failed delete can leave a stale entry until its TTL runs out
+        log = logger.error if operation == "delete" else logger.warning
+        log("Redis cache %s failed: %s", operation, error)
+        return default
+
+    def _call(self, operation: str, command: Callable, default=None):
+        """Run command(client), turning failures into default.
+
+        command gets the blocking client, or on an event loop the asyncio
+        client, in which case it returns an awaitable.
+        """
+        if time.monotonic() < self._retry_at:
+            return default
+        try:
+            loop = _running_loop()
+            if loop is not None:
+                try:
+                    return await_only(command(self._async_client(loop)))
+                except MissingGreenlet:
+                    # Called straight from a coroutine rather than through
+                    # run_sync; such callers should use the *_async methods
+                    pass
+            return command(self._redis)
+        except self._errors as e:
+            return self._failed(operation, e, default)
+
+    async def _call_async(self, operation: str, command: Callable, default=None):
+        if time.monotonic() < self._retry_at:
+            return default
+        try:
+            return await command(self._async_client(asyncio.get_running_loop()))
+        except self._errors as e:
+            return self._failed(operation, e, default)
+
+    @staticmethod
+    def _decode(raw: Optional[List[Optional[bytes]]], count: int) -> List[Any]:
+        if raw is None:
+            return [MISSING] * count
+        return [MISSING if value is None else pickle.loads(value) for value in raw]
+
+    @staticmethod
+    def _writer(items: Dict[str, Any], ttl_seconds: float) -> Callable:
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        payload = {key: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) for key, value in items.items()}
+
+        def write(client):
+            pipe = client.pipeline(transaction=False)
+            for key, value in payload.items():
+                pipe.set(key, value, px=ttl_ms)
+            return pipe.execute()
+        return write
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        return self._decode(self._call("get", lambda client: client.mget(keys)), len(keys))
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: float):
+        self._call("set", self._writer(items, ttl_seconds))
+
+    def delete_many(self, keys: List[str]):
+        self._call("delete", lambda client: client.delete(*keys))
+
+    async def get_many_async(self, keys: List[str]) -> List[Any]:
+        return self._decode(await self._call_async("get", lambda client: client.mget(keys)), len(keys))
+
+    async def set_many_async(self, items: Dict[str, Any], ttl_seconds: float):
+        await self._call_async("set", self._writer(items, ttl_seconds))
+
+    async def delete_many_async(self, keys: List[str]):
+        await self._call_async("delete", lambda client: client.delete(*keys))
+
+    def clear(self, prefix: str):
+        def delete_matching(client):
+            if client is not self._redis:
+                return self._clear_async(client, prefix)
+            batch = []
+            for key in client.scan_iter(match=f"{prefix}*", count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    client.delete(*batch)
+                    batch = []
+            if batch:
+                client.delete(*batch)
+        self._call("delete", delete_matching)
+
+    @staticmethod
+    async def _clear_async(client, prefix: str):
+        batch = []
+        async for key in client.scan_iter(match=f"{prefix}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                await client.delete(*batch)
+                batch = []
+        if batch:
+            await client.delete(*batch)
+
+    async def close(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def status(self) -> dict:
+        """Ping and server stats over the blocking client (run it off the event loop)"""
+        status = {"backend": self.name, "errors": self.errors}
+        try:
+            started = time.perf_counter()
+            self._redis.ping()
+            latency_ms = (time.perf_counter() - started) * 1000
+        except self._errors as e:
+            return {**status, "status": "offline", "error": str(e)}
+        self._retry_at = 0.0
+        status.update(status="online", latency_ms=round(latency_ms, 2))
+        try:
+            # Server-wide numbers; some Redis-protocol servers do not implement INFO
+            stats = self._redis.info("stats")
+            memory = self._redis.info("memory")
+        except self._errors:
+            return status
+        lookups = stats.get("keyspace_hits", 0) + stats.get("keyspace_misses", 0)
+        status.update(
+            used_memory=memory.get("used_memory_human"),
+            server_hit_ratio=round(stats.get("keyspace_hits", 0) / lookups, 4) if lookups else 0.0,
+        )
+        return status
+
+
+_redis_backend: Optional[RedisBackend] = None
+
+def _redis_selected() -> bool:
+    backend = settings.cache_backend.lower()
+    if backend not in ("auto", "memory", "redis"):
+        raise ValueError(f"Unknown cache backend '{settings.cache_backend}'")
+    if backend == "redis" and not settings.redis_url:
+        raise ValueError("cache_backend is 'redis' but redis_url is not set")
+    return backend == "redis" or (backend == "auto" and bool(settings.redis_url))
+
+def build_backend(max_entries: int) -> CacheBackend:
+    """Backend for a new namespace: the shared Redis client, or a private LRU"""
+    global _redis_backend
+    if _redis_selected():
+        if _redis_backend is None:
+            _redis_backend = RedisBackend(settings.redis_url)
+        return _redis_backend
+    return MemoryBackend(max_entries)
+
+
+class CacheNamespace:
+    """One kind of cached value, with its own key prefix, TTL and hit counters.
+
+    memory_ttl_seconds caps the TTL on the per-worker memory backend, for
+    values whose invalidation must reach every worker.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 10000,
+                 backend: Optional[CacheBackend] = None, memory_ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.prefix = f"{settings.cache_key_prefix}{name}:"
+        self.backend = backend or build_backend(max_entries)
+        if memory_ttl_seconds is not None and isinstance(self.backend, MemoryBackend):
+            ttl_seconds = min(ttl_seconds, memory_ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, key: Hashable, version: Optional[int] = None) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        if version is not None:
+            parts = parts + (f"v{version}",)
+        return self.prefix + ":".join(str(part) for part in parts)
+
+    def _count(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, key: Hashable, default: Any = None, version: Optional[int] = None) -> Any:
+        """Return the cached value or default"""
+        value = self.backend.get_many([self._key(key, version)])[0]
+        self._count(int(value is not MISSING), int(value is MISSING))
+        return default if value is MISSING else value
+
+    def get_many(self, keys: Iterable[Hashable], version: Optional[int] = None) -> Dict[Hashable, Any]:
+        """Cached values for the keys that are present, in one backend round trip"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.backend.get_many([self._key(key, version) for key in keys])
+        return self._found(keys, values)
+
+    def _found(self, keys: List[Hashable], values: List[Any]) -> Dict[Hashable, Any]:
+        found = {key: value for key, value in zip(keys, values) if value is not MISSING}
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    async def get_async(self, key: Hashable, default: Any = None, version: Optional[int] = None) -> Any:
+        """get for coroutines (awaits Redis instead of blocking the event loop)"""
+        value = (await self.backend.get_many_async([self._key(key, version)]))[0]
+        self._count(int(value is not MISSING), int(value is MISSING))
+        return default if value is MISSING else value
+
+    async def get_many_async(self, keys: Iterable[Hashable], version: Optional[int] = None) -> Dict[Hashable, Any]:
+        """get_many for coroutines"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.backend.get_many_async([self._key(key, version) for key in keys])
+        return self._found(keys, values)
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, version: Optional[int] = None):
+        """Store a value for ttl_seconds (the namespace TTL by default)"""
+        self.set_many({key: value}, ttl_seconds, version)
+
+    def set_many(self, items: Dict[Hashable, Any], ttl_seconds: Optional[float] = None,
+                 version: Optional[int] = None):
+        """Store several values in one backend round trip"""
+        if items:
+            self.backend.set_many(
+                {self._key(key, version): value for key, value in items.items()},
+                self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            )
+
+    async def set_async(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None,
+                        version: Optional[int] = None):
+        """set for coroutines"""
+        await self.backend.set_many_async(
+            {self._key(key, version): value}, self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+
+    def invalidate(self, key: Hashable, version: Optional[int] = None):
+        """Drop a single entry on every worker"""
+        self.backend.delete_many([self._key(key, version)])
+
+    async def invalidate_async(self, key: Hashable, version: Optional[int] = None):
+        """invalidate for coroutines"""
+        await self.backend.delete_many_async([self._key(key, version)])
+
+    def invalidate_many(self, keys: Iterable[Hashable], version: Optional[int] = None):
+        """Drop several entries in one backend round trip"""
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self.backend.delete_many(keys)
+
+    def clear(self):
+        """Drop every entry of this namespace (scans the keyspace on Redis)"""
+        self.backend.clear(self.prefix)
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this worker"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.name,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Column values of authenticated users keyed by token subject (username).
+# A deactivated user or changed role must not outlive the short memory TTL
+# on workers that did not make the write.
+principal_cache = CacheNamespace(
+    "principal",
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+    memory_ttl_seconds=settings.auth_cache_memory_ttl_seconds
+)
+
+# Active project roles keyed by (project_id, user_id); None marks a non-member.
+# ProjectMemberCRUD invalidates entries when memberships change.
+role_cache = CacheNamespace(
+    "project_role",
+    ttl_seconds=settings.role_cache_ttl_seconds,
+    max_entries=settings.role_cache_max_entries,
+    memory_ttl_seconds=settings.auth_cache_memory_ttl_seconds
+)
+
+# Dashboard aggregates keyed by project_id under the project version, so any
+# write to the project retires them; the TTL bounds how stale the
+# time-dependent overdue counts can get.
+project_stats_cache = CacheNamespace(
+    "project_stats",
+    ttl_seconds=settings.project_stats_cache_ttl_seconds,
+    max_entries=settings.project_stats_cache_max_entries
+)
+
+def cache_status() -> dict:
+    """Health of the configured cache backend (pings Redis; blocking)"""
+    return principal_cache.backend.status()
+
+async def close_cache():
+    """Close the backend's connections on the running event loop (shutdown)"""
+    await principal_cache.backend.close()
+
+
+def _cache_lookups() -> dict:
+    values = {}
+    for cache in (principal_cache, role_cache, project_stats_cache):
+        with cache._lock:
+            values[(cache.name, "hit")] = cache.hits
+            values[(cache.name, "miss")] = cache.misses
+    return values
+
+
+CallbackMetric("cache_lookups_total", "Cache lookups of this worker by namespace and result",
+               ("cache", "result"), _cache_lookups, kind="counter")
@@ -0,0 +1,37 @@
+"""
+Conditional GET helpers (ETag / If-None-Match)
+
+ETags are derived from the per-project version counter that every write in
+app.crud bumps, so a client can revalidate a project, task or tree with one
+indexed lookup instead of reloading and re-serializing it.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(project_id: int, version: int, *parts) -> str:
+    """Strong ETag for a representation of project data at a given version"""
+    variant = ":".join(str(part) for part in parts)
+    digest = hashlib.sha1(f"{project_id}:{version}:{variant}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already covers this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (candidate.strip() for candidate in header.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 when the client's copy is current, otherwise tag the response"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -21,11 +21,80 @@ class Settings(BaseSettings):
     mongodb_url: Optional[str] = None
     redis_url: Optional[str] = None
     
+    # Database engine profile
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a pooled connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456  # 256 MB
+    
+    # SQL instrumentation (X-DB-* headers are only sent in debug mode)
+    query_stats_enabled: bool = True
+    query_n_plus_one_threshold: int = 5  # repeats of one statement shape per request
+    
+    # Prometheus metrics (GET /metrics) and health checks
+    metrics_enabled: bool = True
+    health_db_timeout_seconds: float = 2.0  # /api/health reports the database offline after this
+    
+    # Bulk import
+    import_chunk_size: int = 1000  # input rows per transaction
+    import_max_errors: int = 1000  # per-row errors kept on an import run
+    import_upload_dir: str = "uploads/imports"  # uploads wait here for the import job; share it with separate workers
+    
+    # Background jobs
+    jobs_inprocess_workers: int = 1  # worker threads started with the API (0: run `python -m app.jobs worker`)
+    jobs_poll_interval_seconds: float = 1.0
+    jobs_max_attempts: int = 3
+    jobs_retry_backoff_seconds: float = 10.0  # doubled after every failed attempt
+    jobs_stale_after_seconds: float = 300.0  # running jobs without a heartbeat this long are requeued
+    jobs_delete_batch_size: int = 500  # tasks deleted per transaction by task.delete
+    task_delete_inline_max_items: int = 200  # larger subtrees are deleted by a background job
+    
     # Security
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password hashing (bcrypt runs in a bounded worker pool)
+    bcrypt_rounds: int = 12  # hashes with another cost are upgraded on login
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64  # queued + running jobs before answering 503
+    
+    # Shared cache backend: "memory" (per worker LRU), "redis", or "auto"
+    # (redis when redis_url is set). Redis errors degrade to cache misses.
+    cache_backend: str = "auto"
+    cache_key_prefix: str = "tmp:"
+    cache_socket_timeout: float = 0.25  # seconds per Redis call
+    cache_retry_seconds: float = 5.0  # skip Redis for this long after a connection error
+    
+    # Project change feed (SSE / WebSocket): "memory" (single worker), "redis"
+    # (pub/sub across workers) or "auto" (redis when redis_url is set)
+    events_backend: str = "auto"
+    events_queue_size: int = 1000  # undelivered events per subscriber before it is told to resync
+    events_keepalive_seconds: float = 15.0
+    
+    # Principal cache (writes through UserCRUD invalidate it)
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_entries: int = 10000
+    
+    # Project role cache (membership writes invalidate it)
+    role_cache_ttl_seconds: float = 60.0
+    role_cache_max_entries: int = 50000
+    
+    # With the memory cache backend, invalidations only reach the worker that
+    # made the write, so principals and roles are cached at most this long
+    # (run more than one worker with redis to keep the longer TTLs)
+    auth_cache_memory_ttl_seconds: float = 5.0
+    
+    # Project dashboard stats cache (keyed by project version, so task writes retire entries)
+    project_stats_cache_ttl_seconds: float = 60.0
+    project_stats_cache_max_entries: int = 10000
+    
     # CORS
     backend_cors_origins: list = ["*"]  # Allow all origins for debugging
     
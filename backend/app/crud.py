@@ -1,16 +1,100 @@
 """
 CRUD operations for TaskManager Pro
 """
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import and_, case, delete, func, insert, literal, literal_column, or_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Callable, Dict, Optional, List, Set, Tuple
 from datetime import datetime
-from app.models.database import User, Project, Task, ProjectMember, Checklist, ActionItem
+import base64
+import functools
+import inspect
+import json
+from app.models.database import User, Project, Task, ProjectMember, Checklist, ActionItem, TaskType, ImportRun, Job
 from app.models.schemas import (
     UserCreate, UserUpdate, ProjectCreate, ProjectUpdate, TaskCreate, TaskUpdate,
     ProjectMemberCreate, ProjectMemberUpdate, ChecklistCreate, ChecklistUpdate,
-    ActionItemCreate, ActionItemUpdate
+    ActionItemCreate, ActionItemUpdate, TaskBulkItem, TaskBulkRowResult, TaskFilter
 )
-from app.auth import get_password_hash, verify_password
+from app.auth import get_password_hash, verify_and_update_password
+from app.config import settings
+from app.cache import principal_cache, project_stats_cache, role_cache
+from app.events import queue_event
+from app.search import (
+    SEARCH_TABLE, TITLE_WEIGHT, DESCRIPTION_WEIGHT, search_index, search_terms, fts_query, fts_available, rebuild_search_index
+)
+
+def encode_task_cursor(task: Task) -> str:
+    """Encode the keyset position (order_index, id) of a task as an opaque cursor"""
+    raw = f"{task.order_index}:{task.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_task_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by encode_task_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order_index, task_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(order_index), int(task_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+_MISSING = object()
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards (use with escape="\\")"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+def _is_done(status) -> bool:
+    return status == "done"
+
+# Deepest subtree the recursive CTEs walk; a backstop so that a parent cycle
+# in the data ends the recursion instead of looping forever
+MAX_TREE_DEPTH = 1000
+
+def _propagate_rollup(db: Session, task_id: Optional[int], completed_delta: int, total_delta: int):
+    """Add the deltas to the rollup counters of a task and all its ancestors.
+    
+    Runs inside the caller's transaction: one recursive CTE walks up the
+    parent chain and a single UPDATE applies the change. UNION (not UNION
+    ALL) stops the walk if the chain ever loops.
+    """
+    if task_id is None or (completed_delta == 0 and total_delta == 0):
+        return
+    chain = select(Task.id, Task.parent_task_id).where(Task.id == task_id).cte("ancestors", recursive=True)
+    chain = chain.union(select(Task.id, Task.parent_task_id).where(Task.id == chain.c.parent_task_id))
+    db.query(Task).filter(Task.id.in_(select(chain.c.id))).update({
+        Task.rollup_completed: Task.rollup_completed + completed_delta,
+        Task.rollup_total: Task.rollup_total + total_delta,
+    }, synchronize_session="fetch")
+
+def _adjust_checklist_items(db: Session, checklist: Checklist, completed_delta: int, total_delta: int):
+    """Update a checklist's action item counters and roll the change up to its task"""
+    db.query(Checklist).filter(Checklist.id == checklist.id).update({
+        Checklist.items_completed: Checklist.items_completed + completed_delta,
+        Checklist.items_total: Checklist.items_total + total_delta,
+    }, synchronize_session="fetch")
+    _propagate_rollup(db, checklist.task_id, completed_delta, total_delta)
+
+# Leaves updated_at alone: it tracks edits to the project itself
+_VERSION_BUMP = {Project.version: Project.version + 1, Project.updated_at: Project.updated_at}
+
+def _bump_project_versions(db: Session, project_ids):
+    """Bump the version (and so the ETags) of projects whose data changed"""
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if project_ids:
+        db.query(Project).filter(Project.id.in_(project_ids)).update(
+            _VERSION_BUMP, synchronize_session=False
+        )
+
+def _bump_task_project_version(db: Session, task_id: int) -> Optional[int]:
+    """Bump the version of the project a task belongs to and return the project ID"""
+    project_id = db.query(Task.project_id).filter(Task.id == task_id).scalar()
+    _bump_project_versions(db, [project_id])
+    return project_id
 
 class UserCRUD:
     """User CRUD operations"""
@@ -30,15 +114,23 @@ class UserCRUD:
         """Get user by email"""
         return db.query(User).filter(User.email == email).first()
     
+    @staticmethod
+    def get_existing_user_ids(db: Session, user_ids: Set[int]) -> Set[int]:
+        """Return the subset of user IDs that exist"""
+        if not user_ids:
+            return set()
+        return {row[0] for row in db.query(User.id).filter(User.id.in_(user_ids))}
+    
     @staticmethod
     def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         """Get all users with pagination"""
         return db.query(User).offset(skip).limit(limit).all()
     
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
-        """Create new user"""
-        hashed_password = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create new user (hashing the password unless a hash is given)"""
+        if hashed_password is None:
+            hashed_password = get_password_hash(user.password)
         db_user = User(
             username=user.username,
             email=user.email,
@@ -62,16 +154,30 @@ class UserCRUD:
                 setattr(db_user, field, value)
             db.commit()
             db.refresh(db_user)
+            # Drop the cached principal so the change (e.g. deactivation) applies at once
+            principal_cache.invalidate(db_user.username)
         return db_user
     
+    @staticmethod
+    def update_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+        """Replace the stored password hash (e.g. after a work factor change)"""
+        db_user = db.query(User).filter(User.id == user_id).first()
+        if db_user:
+            db_user.hashed_password = hashed_password
+            db.commit()
+            principal_cache.invalidate(db_user.username)
+    
     @staticmethod
     def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
         """Authenticate user with username and password"""
         user = UserCRUD.get_user_by_username(db, username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            UserCRUD.update_password_hash(db, user.id, new_hash)
         return user
 
 class ProjectCRUD:
@@ -82,6 +188,23 @@ class ProjectCRUD:
         """Get project by ID"""
         return db.query(Project).filter(Project.id == project_id).first()
     
+    @staticmethod
+    def get_project_version(db: Session, project_id: int) -> Optional[int]:
+        """Get a project's version counter (None if the project does not exist)"""
+        return db.query(Project.version).filter(Project.id == project_id).scalar()
+    
+    @staticmethod
+    def get_projects_by_ids(db: Session, project_ids: Set[int]) -> Dict[int, Project]:
+        """Get several projects by ID in one query"""
+        if not project_ids:
+            return {}
+        return {project.id: project for project in db.query(Project).filter(Project.id.in_(project_ids))}
+    
+    @staticmethod
+    def get_project_by_key(db: Session, key: str) -> Optional[Project]:
+        """Get project by key"""
+        return db.query(Project).filter(Project.key == key).first()
+    
     @staticmethod
     def get_projects(db: Session, skip: int = 0, limit: int = 100) -> List[Project]:
         """Get all projects with pagination"""
@@ -117,6 +240,7 @@ class ProjectCRUD:
             update_data = project_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_project, field, value)
+            _bump_project_versions(db, [project_id])
             db.commit()
             db.refresh(db_project)
         return db_project
@@ -128,6 +252,7 @@ class ProjectCRUD:
         if db_project:
             # Soft delete - just set is_active to False
             db_project.is_active = False
+            _bump_project_versions(db, [project_id])
             db.commit()
             return True
         return False
@@ -168,6 +293,146 @@ class TaskCRUD:
         """Get user assigned tasks"""
         return db.query(Task).filter(Task.assignee_id == user_id).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_subtasks(db: Session, task_id: int) -> List[Task]:
+        """Get direct subtasks of a task"""
+        return db.query(Task).filter(Task.parent_task_id == task_id).all()
+    
+    @staticmethod
+    def filter_tasks(
+        query,
+        project_id: Optional[int] = None,
+        status: Optional[str] = None,
+        assignee_id: Optional[int] = None,
+        priority: Optional[str] = None,
+        due_before: Optional[datetime] = None,
+        due_after: Optional[datetime] = None
+    ):
+        """Apply the task list filters to a query"""
+        if project_id is not None:
+            query = query.filter(Task.project_id == project_id)
+        if status is not None:
+            query = query.filter(Task.status == status)
+        if assignee_id is not None:
+            query = query.filter(Task.assignee_id == assignee_id)
+        if priority is not None:
+            query = query.filter(Task.priority == priority)
+        if due_before is not None:
+            query = query.filter(Task.due_date < due_before)
+        if due_after is not None:
+            query = query.filter(Task.due_date >= due_after)
+        return query
+    
+    @staticmethod
+    def query_tasks(
+        db: Session,
+        project_id: Optional[int] = None,
+        status: Optional[str] = None,
+        assignee_id: Optional[int] = None,
+        priority: Optional[str] = None,
+        due_before: Optional[datetime] = None,
+        due_after: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[Task], int, Optional[str]]:
+        """Get a filtered page of tasks ordered by (order_index, id).
+        
+        When a cursor is given the page starts right after it (keyset pagination)
+        and skip is ignored. The cursor is only a position, so with other filters
+        it continues after the same row. Returns the page, the total number of
+        matching tasks and the cursor for the next page (None on the last page).
+        """
+        filters = dict(
+            project_id=project_id, status=status, assignee_id=assignee_id,
+            priority=priority, due_before=due_before, due_after=due_after
+        )
+        total = TaskCRUD.filter_tasks(db.query(func.count(Task.id)), **filters).scalar()
+        
+        query = TaskCRUD.filter_tasks(db.query(Task), **filters).order_by(Task.order_index, Task.id)
+        if cursor:
+            order_index, task_id = decode_task_cursor(cursor)
+            query = query.filter(or_(
+                Task.order_index > order_index,
+                and_(Task.order_index == order_index, Task.id > task_id)
+            ))
+        else:
+            query = query.offset(skip)
+        
+        # Fetch one extra row to know whether there is a next page
+        tasks = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_task_cursor(tasks[-1])
+        return tasks, total, next_cursor
+    
+    @staticmethod
+    def get_task_version(db: Session, task_id: int) -> Optional[Tuple[int, int]]:
+        """Get (project_id, project version) for a task (None if the task does not exist)"""
+        row = db.query(Task.project_id, Project.version).join(Project, Project.id == Task.project_id).filter(
+            Task.id == task_id
+        ).first()
+        return (row[0], row[1]) if row else None
+    
+    @staticmethod
+    def get_project_stats(db: Session, project_id: int, version: int) -> dict:
+        """Task counts of a project by status, priority and assignee, plus overdue counts.
+        
+        Every breakdown is folded from one GROUP BY over (status, priority,
+        assignee_id). Results are cached under the project version, which
+        every task write bumps; a task is overdue when its due date has
+        passed and it is not done.
+        """
+        stats = project_stats_cache.get(project_id, version=version)
+        if stats is not None:
+            return stats
+        
+        now = datetime.utcnow()
+        overdue = and_(Task.due_date < now, Task.status != "done")
+        rows = db.query(
+            Task.status, Task.priority, Task.assignee_id,
+            func.count(), func.sum(case((overdue, 1), else_=0))
+        ).filter(Task.project_id == project_id).group_by(Task.status, Task.priority, Task.assignee_id).all()
+        
+        by_status: Dict[str, int] = {}
+        by_priority: Dict[str, int] = {}
+        by_assignee: Dict[Optional[int], Dict[str, int]] = {}
+        overdue_by_status: Dict[str, int] = {}
+        total = overdue_total = 0
+        for task_status, priority, assignee_id, count, overdue_count in rows:
+            overdue_count = int(overdue_count or 0)
+            total += count
+            overdue_total += overdue_count
+            by_status[task_status] = by_status.get(task_status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+            if overdue_count:
+                overdue_by_status[task_status] = overdue_by_status.get(task_status, 0) + overdue_count
+            assignee = by_assignee.setdefault(assignee_id, {"total": 0, "done": 0, "overdue": 0})
+            assignee["total"] += count
+            assignee["overdue"] += overdue_count
+            if _is_done(task_status):
+                assignee["done"] += count
+        
+        stats = {
+            "project_id": project_id,
+            "version": version,
+            "total": total,
+            "completed": by_status.get("done", 0),
+            "overdue": overdue_total,
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "overdue_by_status": overdue_by_status,
+            # Unassigned tasks are reported with assignee_id None
+            "by_assignee": [
+                {"assignee_id": assignee_id, **counts}
+                for assignee_id, counts in sorted(by_assignee.items(), key=lambda item: -item[1]["total"])
+            ],
+            "computed_at": now,
+        }
+        project_stats_cache.set(project_id, stats, version=version)
+        return stats
+    
     @staticmethod
     def create_task(db: Session, task: TaskCreate) -> Task:
         """Create new task"""
@@ -182,21 +447,322 @@ class TaskCRUD:
             due_date=task.due_date
         )
         db.add(db_task)
+        _propagate_rollup(db, task.parent_task_id, int(_is_done(task.status)), 1)
+        _bump_project_versions(db, [task.project_id])
+        db.flush()
+        queue_event(db, task.project_id, "task.created", db_task.id, parent_task_id=task.parent_task_id)
         db.commit()
         db.refresh(db_task)
         return db_task
     
+    @staticmethod
+    def bulk_create_tasks(
+        db: Session,
+        tasks: List[TaskBulkItem],
+        can_create_in_project: Callable[[Project], bool]
+    ) -> List[TaskBulkRowResult]:
+        """Validate and insert many tasks in a single transaction.
+        
+        Projects, assignees and existing parent tasks are checked with one
+        query each. Rows may point at other rows of the batch through
+        parent_ref; they are inserted level by level (parents first) with
+        executemany. Invalid rows, and rows whose parent row failed, are
+        reported without aborting the rest of the batch.
+        """
+        errors: Dict[int, str] = {}
+        projects = ProjectCRUD.get_projects_by_ids(db, {task.project_id for task in tasks})
+        assignee_ids = UserCRUD.get_existing_user_ids(db, {task.assignee_id for task in tasks if task.assignee_id})
+        parent_ids = {task.parent_task_id for task in tasks if task.parent_task_id}
+        parent_projects = dict(
+            db.query(Task.id, Task.project_id).filter(Task.id.in_(parent_ids)).all()
+        ) if parent_ids else {}
+        
+        refs: Dict[str, int] = {}
+        for index, task in enumerate(tasks):
+            if task.ref is not None:
+                if task.ref in refs:
+                    errors[index] = f"Duplicate ref '{task.ref}'"
+                    continue
+                refs[task.ref] = index
+        
+        for index, task in enumerate(tasks):
+            project = projects.get(task.project_id)
+            if index in errors:
+                continue
+            if not project:
+                errors[index] = "Project not found"
+            elif not can_create_in_project(project):
+                errors[index] = "Not enough permissions to create tasks in this project"
+            elif task.assignee_id and task.assignee_id not in assignee_ids:
+                errors[index] = "Assignee not found"
+            elif task.parent_task_id and task.parent_ref:
+                errors[index] = "Use either parent_task_id or parent_ref, not both"
+            elif task.parent_task_id and task.parent_task_id not in parent_projects:
+                errors[index] = "Parent task not found"
+            elif task.parent_task_id and parent_projects[task.parent_task_id] != task.project_id:
+                errors[index] = "Parent task must belong to the same project"
+            elif task.parent_ref and task.parent_ref not in refs:
+                errors[index] = f"Unknown parent_ref '{task.parent_ref}'"
+            elif task.parent_ref and tasks[refs[task.parent_ref]].project_id != task.project_id:
+                errors[index] = "Parent task must belong to the same project"
+        
+        # Insert level by level so rows referencing batch parents get their IDs
+        created_ids: Dict[int, int] = {}
+        pending = [index for index in range(len(tasks)) if index not in errors]
+        statement = insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        while pending:
+            ready, waiting = [], []
+            for index in pending:
+                parent_ref = tasks[index].parent_ref
+                if parent_ref is None or refs[parent_ref] in created_ids:
+                    ready.append(index)
+                elif refs[parent_ref] in errors:
+                    errors[index] = f"Parent row {refs[parent_ref]} was not created"
+                else:
+                    waiting.append(index)
+            if not ready:
+                for index in waiting:
+                    errors[index] = "Circular parent_ref"
+                break
+            
+            rows = []
+            for index in ready:
+                task = tasks[index]
+                parent_task_id = task.parent_task_id
+                if task.parent_ref is not None:
+                    parent_task_id = created_ids[refs[task.parent_ref]]
+                rows.append({
+                    "title": task.title,
+                    "description": task.description,
+                    "task_type": TaskType(task.task_type.value),
+                    "status": task.status.value,
+                    "priority": task.priority.value,
+                    "project_id": task.project_id,
+                    "assignee_id": task.assignee_id,
+                    "parent_task_id": parent_task_id,
+                    "order_index": task.order_index,
+                    "estimated_hours": task.estimated_hours,
+                    "due_date": task.due_date,
+                    "start_date": task.start_date,
+                })
+            new_ids = db.execute(statement, rows).scalars().all()
+            created_ids.update(zip(ready, new_ids))
+            pending = waiting
+        
+        # Sum rollups bottom-up inside the batch (rows were created parents
+        # first); only totals reaching pre-existing parents need an
+        # ancestor-chain update
+        batch_rollups = {index: [0, 0] for index in created_ids}
+        rollup_deltas: Dict[int, List[int]] = {}
+        for index in reversed(list(created_ids)):
+            task = tasks[index]
+            completed, total = batch_rollups[index]
+            if task.parent_ref is not None:
+                delta = batch_rollups[refs[task.parent_ref]]
+            elif task.parent_task_id is not None:
+                delta = rollup_deltas.setdefault(task.parent_task_id, [0, 0])
+            else:
+                continue
+            delta[0] += completed + int(_is_done(task.status))
+            delta[1] += total + 1
+        new_rollups = [
+            {"id": created_ids[index], "rollup_completed": completed, "rollup_total": total}
+            for index, (completed, total) in batch_rollups.items() if total
+        ]
+        if new_rollups:
+            db.execute(update(Task), new_rollups)
+        for parent_task_id, (completed_delta, total_delta) in rollup_deltas.items():
+            _propagate_rollup(db, parent_task_id, completed_delta, total_delta)
+        _bump_project_versions(db, {tasks[index].project_id for index in created_ids})
+        created_by_project: Dict[int, List[int]] = {}
+        for index, task_id in created_ids.items():
+            created_by_project.setdefault(tasks[index].project_id, []).append(task_id)
+        for project_id, task_ids in created_by_project.items():
+            queue_event(db, project_id, "task.bulk_created", ids=task_ids)
+        db.commit()
+        
+        return [
+            TaskBulkRowResult(
+                index=index, ref=task.ref, success=index in created_ids,
+                id=created_ids.get(index), error=errors.get(index)
+            )
+            for index, task in enumerate(tasks)
+        ]
+    
+    @staticmethod
+    def bulk_update_tasks(
+        db: Session,
+        task_update: TaskUpdate,
+        user_id: int,
+        privileged: bool = False,
+        task_ids: Optional[List[int]] = None,
+        task_filter: Optional[TaskFilter] = None
+    ) -> dict:
+        """Apply a partial update to a set of task IDs or to every task matching a filter.
+        
+        A user may update tasks assigned to them or in projects they own;
+        privileged users (admin/manager) may update any task. A filter only
+        matches tasks the user can see (assigned to them, or in projects they
+        own or are an active member of), so it never reaches other projects.
+        Permissions are resolved with one query over the distinct projects
+        involved and the write goes out as a single UPDATE. Returns the
+        matched and updated counts and, for explicit task IDs, the IDs denied
+        for lack of permission.
+        """
+        def target(query):
+            if task_ids is not None:
+                return query.filter(Task.id.in_(task_ids))
+            query = TaskCRUD.filter_tasks(query, **task_filter.model_dump(exclude_none=True))
+            if not privileged:
+                member_projects = select(ProjectMember.project_id).where(
+                    ProjectMember.user_id == user_id, ProjectMember.is_active == True
+                )
+                owned_projects = select(Project.id).where(Project.owner_id == user_id)
+                query = query.filter(or_(
+                    Task.assignee_id == user_id,
+                    Task.project_id.in_(owned_projects),
+                    Task.project_id.in_(member_projects)
+                ))
+            return query
+        
+        matches = target(db.query(
+            Task.id, Task.project_id, Task.assignee_id, Task.parent_task_id, Task.status
+        )).all()
+        allowed = target(db.query(Task))
+        denied: Set[int] = set()
+        if not privileged:
+            project_ids = {match.project_id for match in matches}
+            owned = {
+                project.id for project in ProjectCRUD.get_projects_by_ids(db, project_ids).values()
+                if project.owner_id == user_id
+            }
+            denied = {
+                match.id for match in matches
+                if match.project_id not in owned and match.assignee_id != user_id
+            }
+            allowed = allowed.filter(or_(Task.assignee_id == user_id, Task.project_id.in_(owned)))
+        
+        values = {}
+        for field, value in task_update.model_dump(exclude_unset=True).items():
+            if field == "task_type" and value is not None:
+                value = TaskType(value.value)
+            values[getattr(Task, field)] = value
+        
+        # Same completed_at rules as a single update: set when a task becomes
+        # done, cleared when it leaves done
+        new_status = task_update.status
+        if new_status is not None and "completed_at" not in task_update.model_fields_set:
+            if new_status == "done":
+                values[Task.completed_at] = case((Task.status != "done", datetime.utcnow()), else_=Task.completed_at)
+            else:
+                values[Task.completed_at] = case((Task.status == "done", None), else_=Task.completed_at)
+        
+        updated = 0
+        if len(denied) < len(matches):
+            updated = allowed.update(values, synchronize_session=False)
+        
+        _bump_project_versions(db, {match.project_id for match in matches if match.id not in denied})
+        
+        # Roll status flips up to the parents of the updated subtasks
+        if new_status is not None:
+            rollup_deltas: Dict[int, int] = {}
+            for match in matches:
+                if match.id in denied or match.parent_task_id is None:
+                    continue
+                flip = int(_is_done(new_status)) - int(_is_done(match.status))
+                if flip:
+                    rollup_deltas[match.parent_task_id] = rollup_deltas.get(match.parent_task_id, 0) + flip
+            for parent_task_id, completed_delta in rollup_deltas.items():
+                _propagate_rollup(db, parent_task_id, completed_delta, 0)
+        if updated:
+            updated_by_project: Dict[int, List[int]] = {}
+            for match in matches:
+                if match.id not in denied:
+                    updated_by_project.setdefault(match.project_id, []).append(match.id)
+            fields = sorted(task_update.model_fields_set)
+            for project_id, ids in updated_by_project.items():
+                queue_event(db, project_id, "task.bulk_updated", ids=ids, fields=fields)
+        db.commit()
+        # Filter matches the user may see but not edit are only counted
+        denied_ids = sorted(denied) if task_ids is not None else []
+        return {"matched": len(matches), "updated": updated, "denied_ids": denied_ids}
+    
     @staticmethod
     def update_task(db: Session, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
         """Update task"""
         db_task = db.query(Task).filter(Task.id == task_id).first()
         if db_task:
+            was_done = _is_done(db_task.status)
             update_data = task_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_task, field, value)
+            _propagate_rollup(db, db_task.parent_task_id, int(_is_done(db_task.status)) - int(was_done), 0)
+            _bump_project_versions(db, [db_task.project_id])
+            queue_event(db, db_task.project_id, "task.updated", db_task.id, fields=sorted(update_data))
             db.commit()
             db.refresh(db_task)
         return db_task
+    
+    @staticmethod
+    def _subtree(task_id: int):
+        """Recursive CTE of (id, depth) for a task and all its subtasks"""
+        subtree = select(Task.id, literal(0).label("depth")).where(Task.id == task_id).cte("subtree", recursive=True)
+        return subtree.union_all(select(Task.id, subtree.c.depth + 1).where(
+            Task.parent_task_id == subtree.c.id, subtree.c.depth < MAX_TREE_DEPTH
+        ))
+    
+    @staticmethod
+    def _delete_task_rows(db: Session, task_ids):
+        """Delete tasks with their checklists and action items using three set-based statements"""
+        checklist_ids = select(Checklist.id).where(Checklist.task_id.in_(task_ids))
+        db.execute(delete(ActionItem).where(ActionItem.checklist_id.in_(checklist_ids)))
+        db.execute(delete(Checklist).where(Checklist.task_id.in_(task_ids)))
+        db.execute(delete(Task).where(Task.id.in_(task_ids)))
+    
+    @staticmethod
+    def count_subtree_tasks(db: Session, task_id: int) -> int:
+        """Number of tasks a delete of task_id removes (the task and all its subtasks)"""
+        subtree = TaskCRUD._subtree(task_id)
+        return db.query(func.count()).select_from(subtree).scalar()
+    
+    @staticmethod
+    def delete_task(db: Session, task_id: int) -> bool:
+        """Delete task together with its subtasks, checklists and action items"""
+        db_task = db.query(Task).filter(Task.id == task_id).first()
+        if db_task:
+            _propagate_rollup(
+                db, db_task.parent_task_id,
+                -(int(_is_done(db_task.status)) + db_task.rollup_completed),
+                -(1 + db_task.rollup_total)
+            )
+            _bump_project_versions(db, [db_task.project_id])
+            queue_event(db, db_task.project_id, "task.deleted", db_task.id, parent_task_id=db_task.parent_task_id)
+            TaskCRUD._delete_task_rows(db, select(TaskCRUD._subtree(task_id).c.id))
+            db.commit()
+            return True
+        return False
+    
+    @staticmethod
+    def delete_task_batch(db: Session, task_id: int, batch_size: int) -> Tuple[int, bool]:
+        """Delete part of a task subtree in its own transaction, deepest subtasks first.
+        
+        Each call removes up to batch_size subtasks (with their checklists and
+        action items) and commits. Every task deeper than the shallowest one
+        removed goes in the same batch, so no orphans are left between calls.
+        Once only the task itself is left it is deleted like delete_task,
+        which also settles the rollups of its ancestors. Returns (tasks
+        deleted, finished).
+        """
+        subtree = TaskCRUD._subtree(task_id)
+        task_ids = db.execute(
+            select(subtree.c.id).where(subtree.c.depth > 0).order_by(subtree.c.depth.desc()).limit(batch_size)
+        ).scalars().all()
+        if task_ids:
+            TaskCRUD._delete_task_rows(db, task_ids)
+            _bump_task_project_version(db, task_id)
+            db.commit()
+            return len(task_ids), False
+        return int(TaskCRUD.delete_task(db, task_id)), True
 
 class ProjectMemberCRUD:
     """Project Member CRUD operations"""
@@ -210,7 +776,10 @@ class ProjectMemberCRUD:
             role=member_data.role
         )
         db.add(db_member)
+        _bump_project_versions(db, [project_id])
+        queue_event(db, project_id, "member.added", user_id=member_data.user_id, role=_enum_value(member_data.role))
         db.commit()
+        ProjectMemberCRUD._invalidate_role(db, project_id, member_data.user_id)
         db.refresh(db_member)
         return db_member
     
@@ -222,6 +791,34 @@ class ProjectMemberCRUD:
             ProjectMember.is_active == True
         ).all()
     
+    @staticmethod
+    def query_project_members(
+        db: Session,
+        project_id: int,
+        role: Optional[str] = None,
+        username_prefix: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[ProjectMember], int]:
+        """Get a page of active project members with their users loaded in the same query.
+        
+        Returns (members, total) where total counts all matching members.
+        """
+        query = db.query(ProjectMember).join(ProjectMember.user).filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.is_active == True
+        )
+        if role:
+            query = query.filter(ProjectMember.role == role)
+        if username_prefix:
+            query = query.filter(User.username.like(f"{_escape_like(username_prefix)}%", escape="\\"))
+        
+        total = query.count()
+        members = query.options(contains_eager(ProjectMember.user)).order_by(
+            User.username, ProjectMember.id
+        ).offset(skip).limit(limit).all()
+        return members, total
+    
     @staticmethod
     def get_member_by_project_and_user(db: Session, project_id: int, user_id: int) -> Optional[ProjectMember]:
         """Get specific member in a project"""
@@ -239,7 +836,13 @@ class ProjectMemberCRUD:
             update_data = member_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_member, field, value)
+            _bump_project_versions(db, [db_member.project_id])
+            queue_event(
+                db, db_member.project_id, "member.updated",
+                user_id=db_member.user_id, role=_enum_value(db_member.role), fields=sorted(update_data)
+            )
             db.commit()
+            ProjectMemberCRUD._invalidate_role(db, db_member.project_id, db_member.user_id)
             db.refresh(db_member)
         return db_member
     
@@ -249,7 +852,10 @@ class ProjectMemberCRUD:
         db_member = ProjectMemberCRUD.get_member_by_project_and_user(db, project_id, user_id)
         if db_member:
             db_member.is_active = False
+            _bump_project_versions(db, [project_id])
+            queue_event(db, project_id, "member.removed", user_id=user_id)
             db.commit()
+            ProjectMemberCRUD._invalidate_role(db, project_id, user_id)
             return True
         return False
     
@@ -261,17 +867,46 @@ class ProjectMemberCRUD:
             ProjectMember.is_active == True
         ).all()
     
+    @staticmethod
+    def get_member_role(db: Session, project_id: int, user_id: int) -> Optional[str]:
+        """Get the user's active role in a project (None if not a member).
+        
+        Lookups are memoized on the session for the rest of the request and
+        shared across requests through role_cache.
+        """
+        key = (project_id, user_id)
+        memo = db.info.setdefault("member_roles", {})
+        if key in memo:
+            return memo[key]
+        role = role_cache.get(key, _MISSING)
+        if role is _MISSING:
+            role = db.query(ProjectMember.role).filter(
+                ProjectMember.project_id == project_id,
+                ProjectMember.user_id == user_id,
+                ProjectMember.is_active == True
+            ).scalar()
+            role = role.value if role is not None else None
+            role_cache.set(key, role)
+        memo[key] = role
+        return role
+    
+    @staticmethod
+    def _invalidate_role(db: Session, project_id: int, user_id: int):
+        """Forget a cached membership role after it changed"""
+        db.info.get("member_roles", {}).pop((project_id, user_id), None)
+        role_cache.invalidate((project_id, user_id))
+    
     @staticmethod
     def check_user_permission(db: Session, project_id: int, user_id: int, required_roles: List[str] = None) -> bool:
         """Check if user has permission in project"""
-        member = ProjectMemberCRUD.get_member_by_project_and_user(db, project_id, user_id)
-        if not member:
+        role = ProjectMemberCRUD.get_member_role(db, project_id, user_id)
+        if role is None:
             return False
         
         if required_roles is None:
             return True
             
-        return member.role.value in required_roles
+        return role in required_roles
 
 
 class ChecklistCRUD:
@@ -282,6 +917,13 @@ class ChecklistCRUD:
         """Get checklist by ID"""
         return db.query(Checklist).filter(Checklist.id == checklist_id).first()
     
+    @staticmethod
+    def get_checklist_project_id(db: Session, checklist_id: int) -> Optional[int]:
+        """Get the project a checklist belongs to (None if the checklist does not exist)"""
+        return db.query(Task.project_id).join(Checklist, Checklist.task_id == Task.id).filter(
+            Checklist.id == checklist_id
+        ).scalar()
+    
     @staticmethod
     def get_task_checklists(db: Session, task_id: int) -> List[Checklist]:
         """Get all checklists for a task"""
@@ -289,6 +931,21 @@ class ChecklistCRUD:
             Checklist.task_id == task_id
         ).order_by(Checklist.order_index, Checklist.created_at).all()
     
+    @staticmethod
+    def get_task_checklists_with_items(db: Session, task_id: int) -> List[Checklist]:
+        """Get the checklists of a task with action_items populated (two queries)"""
+        checklists = ChecklistCRUD.get_task_checklists(db, task_id)
+        items_by_checklist: Dict[int, List[ActionItem]] = {}
+        if checklists:
+            action_items = db.query(ActionItem).filter(
+                ActionItem.checklist_id.in_([checklist.id for checklist in checklists])
+            ).order_by(ActionItem.order_index, ActionItem.created_at).all()
+            for item in action_items:
+                items_by_checklist.setdefault(item.checklist_id, []).append(item)
+        for checklist in checklists:
+            set_committed_value(checklist, "action_items", items_by_checklist.get(checklist.id, []))
+        return checklists
+    
     @staticmethod
     def create_checklist(db: Session, checklist: ChecklistCreate) -> Checklist:
         """Create new checklist"""
@@ -299,6 +956,9 @@ class ChecklistCRUD:
             order_index=checklist.order_index
         )
         db.add(db_checklist)
+        project_id = _bump_task_project_version(db, checklist.task_id)
+        db.flush()
+        queue_event(db, project_id, "checklist.created", db_checklist.id, task_id=checklist.task_id)
         db.commit()
         db.refresh(db_checklist)
         return db_checklist
@@ -320,6 +980,8 @@ class ChecklistCRUD:
                 else:
                     db_checklist.completed_at = None
             
+            project_id = _bump_task_project_version(db, db_checklist.task_id)
+            queue_event(db, project_id, "checklist.updated", db_checklist.id, task_id=db_checklist.task_id, fields=sorted(update_data))
             db.commit()
             db.refresh(db_checklist)
         return db_checklist
@@ -329,6 +991,9 @@ class ChecklistCRUD:
         """Delete checklist"""
         db_checklist = ChecklistCRUD.get_checklist(db, checklist_id)
         if db_checklist:
+            _propagate_rollup(db, db_checklist.task_id, -db_checklist.items_completed, -db_checklist.items_total)
+            project_id = _bump_task_project_version(db, db_checklist.task_id)
+            queue_event(db, project_id, "checklist.deleted", db_checklist.id, task_id=db_checklist.task_id)
             db.delete(db_checklist)
             db.commit()
             return True
@@ -343,6 +1008,13 @@ class ActionItemCRUD:
         """Get action item by ID"""
         return db.query(ActionItem).filter(ActionItem.id == action_item_id).first()
     
+    @staticmethod
+    def get_action_item_project_id(db: Session, action_item_id: int) -> Optional[int]:
+        """Get the project an action item belongs to (None if the action item does not exist)"""
+        return db.query(Task.project_id).join(Checklist, Checklist.task_id == Task.id).join(
+            ActionItem, ActionItem.checklist_id == Checklist.id
+        ).filter(ActionItem.id == action_item_id).scalar()
+    
     @staticmethod
     def get_checklist_action_items(db: Session, checklist_id: int) -> List[ActionItem]:
         """Get all action items for a checklist"""
@@ -363,6 +1035,12 @@ class ActionItemCRUD:
             order_index=action_item.order_index
         )
         db.add(db_action_item)
+        checklist = ChecklistCRUD.get_checklist(db, action_item.checklist_id)
+        if checklist:
+            _adjust_checklist_items(db, checklist, 0, 1)
+            project_id = _bump_task_project_version(db, checklist.task_id)
+            db.flush()
+            queue_event(db, project_id, "action_item.created", db_action_item.id, checklist_id=checklist.id)
         db.commit()
         db.refresh(db_action_item)
         return db_action_item
@@ -372,6 +1050,7 @@ class ActionItemCRUD:
         """Update action item"""
         db_action_item = ActionItemCRUD.get_action_item(db, action_item_id)
         if db_action_item:
+            was_completed = bool(db_action_item.is_completed)
             update_data = action_item_update.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_action_item, field, value)
@@ -384,6 +1063,15 @@ class ActionItemCRUD:
                 else:
                     db_action_item.completed_at = None
             
+            completed_delta = int(bool(db_action_item.is_completed)) - int(was_completed)
+            if completed_delta:
+                _adjust_checklist_items(db, db_action_item.checklist, completed_delta, 0)
+            project_id = _bump_task_project_version(db, db_action_item.checklist.task_id)
+            queue_event(
+                db, project_id, "action_item.updated", db_action_item.id,
+                checklist_id=db_action_item.checklist_id, fields=sorted(update_data)
+            )
+            
             db.commit()
             db.refresh(db_action_item)
         return db_action_item
@@ -393,6 +1081,10 @@ class ActionItemCRUD:
         """Delete action item"""
         db_action_item = ActionItemCRUD.get_action_item(db, action_item_id)
         if db_action_item:
+            if db_action_item.checklist:
+                _adjust_checklist_items(db, db_action_item.checklist, -int(bool(db_action_item.is_completed)), -1)
+                project_id = _bump_task_project_version(db, db_action_item.checklist.task_id)
+                queue_event(db, project_id, "action_item.deleted", db_action_item.id, checklist_id=db_action_item.checklist_id)
             db.delete(db_action_item)
             db.commit()
             return True
@@ -421,39 +1113,397 @@ class TaskHierarchyCRUD:
         ).filter(Task.id == task_id).first()
     
     @staticmethod
-    def get_project_task_tree(db: Session, project_id: int) -> List[Task]:
-        """Get all main tasks (no parent) for a project with their hierarchy"""
-        from sqlalchemy.orm import joinedload
+    def get_task_subtree(db: Session, task_id: int, max_depth: Optional[int] = None) -> Optional[Task]:
+        """Get a task with its whole subtree, checklists and action items.
         
-        return db.query(Task).options(
-            joinedload(Task.subtasks),
-            joinedload(Task.checklists).joinedload(Checklist.action_items)
-        ).filter(
-            Task.project_id == project_id,
-            Task.parent_task_id.is_(None)
-        ).order_by(Task.order_index, Task.created_at).all()
+        The subtree is fetched with one recursive CTE, checklists and action
+        items with one query each, and the tree is assembled in memory, so
+        serializing it issues no further queries. max_depth limits how many
+        levels of subtasks are loaded (0 = the task only). The populated
+        collections reflect max_depth, so use the result for reading only.
+        """
+        subtree = select(Task.id, literal(0).label("depth")).where(Task.id == task_id).cte("subtree", recursive=True)
+        children = select(Task.id, subtree.c.depth + 1).where(
+            Task.parent_task_id == subtree.c.id,
+            subtree.c.depth < (MAX_TREE_DEPTH if max_depth is None else min(max_depth, MAX_TREE_DEPTH))
+        )
+        subtree = subtree.union_all(children)
+        
+        rows = db.query(Task, subtree.c.depth).join(subtree, Task.id == subtree.c.id).all()
+        if not rows:
+            return None
+        tasks = [task for task, _ in rows]
+        depths = {task.id: depth for task, depth in rows}
+        truncated = {task_id for task_id, depth in depths.items() if max_depth is not None and depth >= max_depth}
+        TaskHierarchyCRUD._attach_hierarchy(db, tasks, select(subtree.c.id), truncated)
+        return next(task for task in tasks if task.id == task_id)
+    
+    @staticmethod
+    def get_project_task_tree(db: Session, project_id: int, max_depth: Optional[int] = None) -> List[Task]:
+        """Get all main tasks (no parent) for a project with their full hierarchy.
+        
+        Loads every task of the project in one query plus one query each for
+        checklists and action items, then assembles the trees in memory.
+        """
+        tasks = db.query(Task).filter(Task.project_id == project_id).all()
+        
+        roots = [task for task in tasks if task.parent_task_id is None]
+        truncated = set()
+        if max_depth is not None:
+            children = TaskHierarchyCRUD._group_children(tasks)
+            level, depth = roots, 0
+            while level:
+                if depth >= max_depth:
+                    truncated.update(task.id for task in level)
+                    break
+                level = [child for task in level for child in children.get(task.id, [])]
+                depth += 1
+        
+        project_task_ids = select(Task.id).where(Task.project_id == project_id)
+        TaskHierarchyCRUD._attach_hierarchy(db, tasks, project_task_ids, truncated)
+        return sorted(roots, key=lambda task: (task.order_index or 0, task.created_at))
+    
+    @staticmethod
+    def _group_children(tasks: List[Task]) -> Dict[int, List[Task]]:
+        children: Dict[int, List[Task]] = {}
+        for task in sorted(tasks, key=lambda task: (task.order_index or 0, task.created_at)):
+            if task.parent_task_id is not None:
+                children.setdefault(task.parent_task_id, []).append(task)
+        return children
+    
+    @staticmethod
+    def _attach_hierarchy(db: Session, tasks: List[Task], task_ids, truncated: Set[int]):
+        """Load checklists/action items for task_ids and populate the relationship
+        collections of the given tasks so no lazy loads happen afterwards"""
+        checklists = db.query(Checklist).filter(
+            Checklist.task_id.in_(task_ids)
+        ).order_by(Checklist.order_index, Checklist.created_at).all()
+        action_items = db.query(ActionItem).filter(
+            ActionItem.checklist_id.in_(select(Checklist.id).where(Checklist.task_id.in_(task_ids)))
+        ).order_by(ActionItem.order_index, ActionItem.created_at).all()
+        
+        items_by_checklist: Dict[int, List[ActionItem]] = {}
+        for item in action_items:
+            items_by_checklist.setdefault(item.checklist_id, []).append(item)
+        checklists_by_task: Dict[int, List[Checklist]] = {}
+        for checklist in checklists:
+            set_committed_value(checklist, "action_items", items_by_checklist.get(checklist.id, []))
+            checklists_by_task.setdefault(checklist.task_id, []).append(checklist)
+        
+        children = TaskHierarchyCRUD._group_children(tasks)
+        for task in tasks:
+            subtasks = [] if task.id in truncated else children.get(task.id, [])
+            set_committed_value(task, "subtasks", subtasks)
+            set_committed_value(task, "checklists", checklists_by_task.get(task.id, []))
+    
+    @staticmethod
+    def get_task_rollup(db: Session, task_id: int) -> Optional[Tuple[int, int]]:
+        """Get the stored (completed, total) rollup counters of a task"""
+        row = db.query(Task.rollup_completed, Task.rollup_total).filter(Task.id == task_id).first()
+        return (row[0], row[1]) if row else None
     
     @staticmethod
     def calculate_task_completion(db: Session, task_id: int) -> float:
-        """Calculate completion percentage based on subtasks and checklists"""
-        task = TaskHierarchyCRUD.get_task_with_hierarchy(db, task_id)
-        if not task:
+        """Calculate completion percentage of the task's subtree from the stored rollup"""
+        rollup = TaskHierarchyCRUD.get_task_rollup(db, task_id)
+        if not rollup:
             return 0.0
+        completed_items, total_items = rollup
+        return (completed_items / total_items * 100) if total_items > 0 else 0.0
+    
+    @staticmethod
+    def rebuild_rollups(db: Session, project_id: Optional[int] = None) -> int:
+        """Recompute all rollup counters from the raw rows and fix any drift.
         
-        total_items = 0
-        completed_items = 0
+        Returns the number of tasks and checklists whose stored counters were
+        wrong.
+        """
+        item_query = db.query(
+            ActionItem.checklist_id,
+            func.count(ActionItem.id),
+            func.sum(case((ActionItem.is_completed == True, 1), else_=0))
+        ).group_by(ActionItem.checklist_id)
+        checklist_query = db.query(Checklist.id, Checklist.task_id, Checklist.items_completed, Checklist.items_total)
+        task_query = db.query(Task.id, Task.parent_task_id, Task.status, Task.rollup_completed, Task.rollup_total)
+        if project_id is not None:
+            project_task_ids = select(Task.id).where(Task.project_id == project_id)
+            task_query = task_query.filter(Task.project_id == project_id)
+            checklist_query = checklist_query.filter(Checklist.task_id.in_(project_task_ids))
+            item_query = item_query.filter(ActionItem.checklist_id.in_(
+                select(Checklist.id).where(Checklist.task_id.in_(project_task_ids))
+            ))
         
-        # Count subtasks
-        for subtask in task.subtasks:
-            total_items += 1
-            if subtask.status == "done":
-                completed_items += 1
+        item_counts = {checklist_id: (completed or 0, total) for checklist_id, total, completed in item_query}
+        checklist_fixes = []
+        own_items: Dict[int, List[int]] = {}
+        for checklist_id, task_id, stored_completed, stored_total in checklist_query:
+            completed, total = item_counts.get(checklist_id, (0, 0))
+            if (completed, total) != (stored_completed, stored_total):
+                checklist_fixes.append({"id": checklist_id, "items_completed": completed, "items_total": total})
+            counts = own_items.setdefault(task_id, [0, 0])
+            counts[0] += completed
+            counts[1] += total
         
-        # Count checklists and action items
-        for checklist in task.checklists:
-            for action_item in checklist.action_items:
-                total_items += 1
-                if action_item.is_completed:
-                    completed_items += 1
+        tasks = {row.id: row for row in task_query}
+        children: Dict[int, List[int]] = {}
+        for row in tasks.values():
+            if row.parent_task_id in tasks:
+                children.setdefault(row.parent_task_id, []).append(row.id)
         
-        return (completed_items / total_items * 100) if total_items > 0 else 0.0
+        # Post-order walk so every child is computed before its parent
+        rollups: Dict[int, Tuple[int, int]] = {}
+        for root_id in (task_id for task_id, row in tasks.items() if row.parent_task_id not in tasks):
+            stack = [(root_id, False)]
+            while stack:
+                task_id, expanded = stack.pop()
+                if not expanded:
+                    stack.append((task_id, True))
+                    stack.extend((child_id, False) for child_id in children.get(task_id, []))
+                    continue
+                completed, total = own_items.get(task_id, [0, 0])
+                for child_id in children.get(task_id, []):
+                    child_completed, child_total = rollups[child_id]
+                    completed += int(_is_done(tasks[child_id].status)) + child_completed
+                    total += 1 + child_total
+                rollups[task_id] = (completed, total)
+        
+        task_fixes = [
+            {"id": task_id, "rollup_completed": completed, "rollup_total": total}
+            for task_id, (completed, total) in rollups.items()
+            if (completed, total) != (tasks[task_id].rollup_completed, tasks[task_id].rollup_total)
+        ]
+        if checklist_fixes:
+            db.execute(update(Checklist), checklist_fixes)
+        if task_fixes:
+            db.execute(update(Task), task_fixes)
+        db.commit()
+        return len(checklist_fixes) + len(task_fixes)
+
+
+class ImportRunCRUD:
+    """Import run lookups (runs are written by app.importer)"""
+    
+    @staticmethod
+    def get_import_run(db: Session, project_id: int, run_id: int) -> Optional[ImportRun]:
+        """Get an import run of a project"""
+        return db.query(ImportRun).filter(ImportRun.id == run_id, ImportRun.project_id == project_id).first()
+    
+    @staticmethod
+    def get_project_import_runs(db: Session, project_id: int, limit: int = 20) -> List[ImportRun]:
+        """Get the most recent import runs of a project"""
+        return db.query(ImportRun).filter(ImportRun.project_id == project_id).order_by(
+            ImportRun.id.desc()
+        ).limit(limit).all()
+
+
+class JobCRUD:
+    """Background job records (jobs are claimed and run by app.jobs)"""
+    
+    @staticmethod
+    def create_job(
+        db: Session,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        created_by: Optional[int] = None,
+        project_id: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """Queue a job for the worker pool"""
+        db_job = Job(
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            created_by=created_by,
+            project_id=project_id,
+            max_attempts=max_attempts or settings.jobs_max_attempts,
+            run_after=datetime.utcnow()
+        )
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+        return db_job
+    
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[Job]:
+        """Get job by ID"""
+        return db.query(Job).filter(Job.id == job_id).first()
+    
+    @staticmethod
+    def get_jobs(
+        db: Session,
+        created_by: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        """Get the most recent jobs, optionally only those of one user or status"""
+        query = db.query(Job)
+        if created_by is not None:
+            query = query.filter(Job.created_by == created_by)
+        if status:
+            query = query.filter(Job.status == status)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+    
+    @staticmethod
+    def cancel_job(db: Session, job_id: int) -> Optional[Job]:
+        """Cancel a queued job, or ask a running one to stop at its next progress report"""
+        db_job = JobCRUD.get_job(db, job_id)
+        if db_job and db_job.status in ("queued", "running"):
+            if db_job.status == "queued":
+                db_job.status = "cancelled"
+                db_job.finished_at = datetime.utcnow()
+            else:
+                db_job.cancel_requested = True
+            db.commit()
+            db.refresh(db_job)
+        return db_job
+
+
+class SearchCRUD:
+    """Full-text search over tasks, checklists and action items"""
+    
+    @staticmethod
+    def _searchable_projects(user_id: int, is_admin: bool):
+        """Active projects the user owns or is an active member of (all for admins)"""
+        projects = select(Project.id).where(Project.is_active == True)
+        if is_admin:
+            return projects
+        member_of = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == user_id,
+            ProjectMember.is_active == True
+        )
+        return projects.where(or_(Project.owner_id == user_id, Project.id.in_(member_of)))
+    
+    @staticmethod
+    def _fts_statements(query: str, projects, project_id: Optional[int], types: Optional[List[str]]):
+        """(page statement, count statement) against the FTS5 index, ranked by bm25"""
+        columns = search_index.c
+        fts_table = literal_column(SEARCH_TABLE)
+        conditions = [fts_table.op("MATCH")(fts_query(query)), columns.project_id.in_(projects)]
+        if project_id is not None:
+            conditions.append(columns.project_id == project_id)
+        if types:
+            conditions.append(columns.record_type.in_(types))
+        
+        bm25 = func.bm25(fts_table, TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        statement = select(
+            columns.record_type.label("type"),
+            columns.record_id.label("id"),
+            columns.project_id,
+            columns.title,
+            func.snippet(fts_table, -1, "<mark>", "</mark>", "…", 16).label("snippet"),
+            (-bm25).label("score"),
+        ).where(*conditions).order_by(bm25, columns.rowid)
+        return statement, select(func.count()).select_from(search_index).where(*conditions)
+    
+    @staticmethod
+    def _like_statements(query: str, projects, project_id: Optional[int], types: Optional[List[str]]):
+        """(page statement, count statement) matching every term with LIKE"""
+        patterns = [f"%{_escape_like(term.rstrip('*'))}%" for term in search_terms(query)]
+        
+        def matches(model):
+            title_hits = [model.title.ilike(pattern, escape="\\") for pattern in patterns]
+            text_hits = and_(*[
+                or_(title_hit, model.description.ilike(pattern, escape="\\"))
+                for title_hit, pattern in zip(title_hits, patterns)
+            ])
+            # Rows whose title has every term rank first
+            return text_hits, case((and_(*title_hits), 1.0), else_=0.0)
+        
+        selects = []
+        sources = [
+            ("task", Task, lambda statement: statement),
+            ("checklist", Checklist, lambda statement: statement.join(Task, Task.id == Checklist.task_id)),
+            ("action_item", ActionItem, lambda statement: statement.join(
+                Checklist, Checklist.id == ActionItem.checklist_id
+            ).join(Task, Task.id == Checklist.task_id)),
+        ]
+        for record_type, model, join_task in sources:
+            if types and record_type not in types:
+                continue
+            text_hits, score = matches(model)
+            statement = join_task(select(
+                literal(record_type).label("type"),
+                model.id.label("id"),
+                Task.project_id.label("project_id"),
+                model.title.label("title"),
+                func.substr(model.description, 1, 200).label("snippet"),
+                score.label("score"),
+            ).select_from(model)).where(text_hits, Task.project_id.in_(projects))
+            if project_id is not None:
+                statement = statement.where(Task.project_id == project_id)
+            selects.append(statement)
+        
+        hits = union_all(*selects).subquery()
+        statement = select(hits).order_by(hits.c.score.desc(), hits.c.type, hits.c.id)
+        return statement, select(func.count()).select_from(hits)
+    
+    @staticmethod
+    def search_records(
+        db: Session,
+        query: str,
+        user_id: int,
+        is_admin: bool = False,
+        project_id: Optional[int] = None,
+        types: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List, int]:
+        """Search titles and descriptions in the projects a user can access.
+        
+        Returns (rows, total); rows have type, id, project_id, title, snippet
+        and score (higher is better). Uses the FTS5 index where it exists and
+        LIKE matching otherwise.
+        """
+        if not search_terms(query) or types == []:
+            return [], 0
+        projects = SearchCRUD._searchable_projects(user_id, is_admin)
+        build = SearchCRUD._fts_statements if fts_available(db.connection()) else SearchCRUD._like_statements
+        statement, count_statement = build(query, projects, project_id, types)
+        
+        total = db.execute(count_statement).scalar()
+        rows = db.execute(statement.offset(skip).limit(limit)).all() if total > skip else []
+        return rows, total
+    
+    @staticmethod
+    def rebuild_search_index(db: Session, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Repopulate the FTS5 index from the source tables (0 if the database has none)"""
+        if not fts_available(db.connection()):
+            return 0
+        indexed = rebuild_search_index(db, progress)
+        db.commit()
+        return indexed
+
+
+def _run_in_session(method):
+    """Wrap a sync CRUD method as a coroutine running on the AsyncSession"""
+    @functools.wraps(method)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(method, *args, **kwargs)
+    return wrapper
+
+def make_async_crud(crud_class):
+    """Build the async counterpart of a CRUD class.
+    
+    Every public static method taking a session as its first argument is
+    exposed as a coroutine that runs the sync implementation through
+    AsyncSession.run_sync, so both paths share a single implementation and
+    the database I/O is awaited instead of blocking the event loop.
+    """
+    namespace = {"__doc__": f"Async {crud_class.__doc__}"}
+    for name, attr in vars(crud_class).items():
+        if not isinstance(attr, staticmethod) or name.startswith("_"):
+            continue
+        params = list(inspect.signature(attr.__func__).parameters)
+        if params and params[0] == "db":
+            namespace[name] = staticmethod(_run_in_session(attr.__func__))
+    return type(f"Async{crud_class.__name__}", (), namespace)
+
+AsyncUserCRUD = make_async_crud(UserCRUD)
+AsyncProjectCRUD = make_async_crud(ProjectCRUD)
+AsyncTaskCRUD = make_async_crud(TaskCRUD)
+AsyncProjectMemberCRUD = make_async_crud(ProjectMemberCRUD)
+AsyncChecklistCRUD = make_async_crud(ChecklistCRUD)
+AsyncActionItemCRUD = make_async_crud(ActionItemCRUD)
+AsyncTaskHierarchyCRUD = make_async_crud(TaskHierarchyCRUD)
+AsyncImportRunCRUD = make_async_crud(ImportRunCRUD)
+AsyncSearchCRUD = make_async_crud(SearchCRUD)
+AsyncJobCRUD = make_async_crud(JobCRUD)
@@ -1,24 +1,106 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+import asyncio
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.metrics import instrument_pool
 
 # Database URL - for now using SQLite for development
 # Will be configurable via environment variables
 DATABASE_URL = settings.database_url or "sqlite:///./taskmanager.db"
 
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite pragmas from settings to every new connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+    cursor.close()
+
+# Async drivers used for the async session factory
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_database_url(url: str) -> str:
+    """Translate a sync database URL to the matching async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    
+    if url.startswith("sqlite"):
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        }
+    
+    # In-memory SQLite keeps its default single-connection pool
+    if not (url.startswith("sqlite") and _is_memory_sqlite(url)):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    
+    return options
+
+def build_engine(url: str = DATABASE_URL, **overrides) -> Engine:
+    """Create an engine using the pool and SQLite settings from the engine profile"""
+    new_engine = create_engine(url, **{**_engine_options(url), **overrides})
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+def build_async_engine(url: str = DATABASE_URL, **overrides) -> AsyncEngine:
+    """Create an async engine with the same engine profile as build_engine"""
+    options = _engine_options(url)
+    if "pool_size" in options and url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool; keep connections pooled like the sync engine
+        options["poolclass"] = AsyncAdaptedQueuePool
+    new_engine = create_async_engine(async_database_url(url), **{**options, **overrides})
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = build_engine(DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory used by the API routers. Objects stay
+# loaded after commit so responses can be serialized outside the session.
+async_engine = build_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Pool checkouts and occupancy on /metrics
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -30,7 +112,27 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def ping_database(timeout: float) -> float:
+    """Run SELECT 1 through the async pool and return the round trip in seconds.
+
+    Raises asyncio.TimeoutError after timeout seconds, or the driver error.
+    """
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    started = time.perf_counter()
+    await asyncio.wait_for(ping(), timeout)
+    return time.perf_counter() - started
+
 def create_tables():
-    """Create all tables in the database"""
+    """Create all tables in the database and apply pending migrations"""
     from app.models.database import Base
+    from app.migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
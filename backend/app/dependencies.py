@@ -1,36 +1,63 @@
 """
 FastAPI dependencies for authentication and authorization
 """
+import time
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.auth import verify_token
-from app.crud import UserCRUD
+from app.cache import principal_cache
+from app.crud import AsyncUserCRUD
+from app.metrics import auth_token_duration
 from app.models.database import User
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+# Never cached: principal_cache may be shared with other workers through Redis
+_PRIVATE_COLUMNS = {"hashed_password"}
+
+def _principal_values(user: User) -> dict:
+    """Column values of a user, as stored in principal_cache (without the password hash)"""
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs if attr.key not in _PRIVATE_COLUMNS
+    }
+
+async def authenticate_token(token: str, db: AsyncSession) -> Optional[User]:
+    """Resolve a bearer token to its user (None if the token is invalid)"""
     try:
         payload = verify_token(token)
         username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except Exception:
-        raise credentials_exception
+        return None
+    if username is None:
+        return None
     
-    user = UserCRUD.get_user_by_username(db, username=username)
+    values = await principal_cache.get_async(username)
+    if values is None:
+        db_user = await AsyncUserCRUD.get_user_by_username(db, username=username)
+        if db_user is None:
+            return None
+        values = _principal_values(db_user)
+        await principal_cache.set_async(username, values)
+    # A fresh instance not bound to any session
+    return User(**values)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    """Get current authenticated user"""
+    started = time.perf_counter()
+    user = await authenticate_token(token, db)
+    auth_token_duration.observe(time.perf_counter() - started, "valid" if user is not None else "invalid")
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -41,7 +68,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 async def get_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
     """Require admin role"""
-    if current_user.role.value != "admin":
+    if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
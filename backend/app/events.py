@@ -0,0 +1,260 @@
+"""
+Project change feed for TaskManager Pro
+
+CRUD writes queue compact change events on the session with queue_event();
+they are published when the transaction commits and dropped on rollback.
+The broker delivers them to the SSE / WebSocket subscribers of this worker
+and, through a backend, to the other workers:
+
+- memory: single worker, nothing leaves the process
+- redis: Redis pub/sub ("auto" picks it when settings.redis_url is set)
+
+An event looks like:
+
+    {"type": "task.updated", "project_id": 1, "id": 42, "fields": ["status"], "ts": "..."}
+
+A subscriber that falls behind by more than settings.events_queue_size
+events gets a single {"type": "resync"} event and should refetch.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger("app.events")
+
+
+def queue_event(db: Session, project_id: Optional[int], event_type: str, record_id: Optional[int] = None, **fields):
+    """Publish a change event once the session's current transaction commits"""
+    if project_id is None:
+        return
+    payload = {"type": event_type, "project_id": project_id}
+    if record_id is not None:
+        payload["id"] = record_id
+    payload.update((key, value) for key, value in fields.items() if value is not None)
+    payload["ts"] = datetime.utcnow().isoformat()
+    db.info.setdefault("pending_events", []).append(payload)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session):
+    events = session.info.pop("pending_events", None)
+    if events:
+        event_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_events(session: Session):
+    session.info.pop("pending_events", None)
+
+
+class Subscription:
+    """Events of one project for one connected client"""
+
+    def __init__(self, project_id: int, max_pending: int):
+        self.project_id = project_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def deliver(self, payload: dict):
+        """Hand an event to the subscriber's event loop (safe from any thread)"""
+        self._loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload: dict):
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # The client is too slow: replace the backlog with a resync marker
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"type": "resync", "project_id": self.project_id})
+
+    async def get(self) -> dict:
+        return await self._queue.get()
+
+
+class EventBackend:
+    """Carries events between workers"""
+
+    name = "memory"
+
+    def start(self, deliver):
+        """Begin passing events published by other workers to deliver(events)"""
+
+    def publish(self, origin: str, events: List[dict]):
+        """Send events to the other workers"""
+
+    def close(self):
+        pass
+
+
+class RedisEventBackend(EventBackend):
+    """Fan-out through Redis pub/sub.
+
+    Publishing goes through a background thread so a slow or unreachable
+    Redis never delays the write that produced the event. A listener thread
+    relays messages from other workers and reconnects after errors.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        # Optional dependency: only needed when the redis backend is selected
+        import redis
+
+        self._redis_module = redis
+        self._url = url
+        self._channel = f"{settings.cache_key_prefix}events"
+        self._outbox: "queue.Queue[bytes]" = queue.Queue(maxsize=10000)
+        self._stopped = threading.Event()
+        self._publisher: Optional[threading.Thread] = None
+        self._listener: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.origin = uuid.uuid4().hex
+        self.errors = 0
+
+    def _client(self):
+        return self._redis_module.Redis.from_url(self._url, health_check_interval=30)
+
+    def _thread(self, target, *args) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, daemon=True, name=f"events{target.__name__}")
+        thread.start()
+        return thread
+
+    def start(self, deliver):
+        with self._start_lock:
+            if self._listener is None:
+                self._listener = self._thread(self._listen_loop, deliver)
+
+    def publish(self, origin: str, events: List[dict]):
+        with self._start_lock:
+            if self._publisher is None:
+                self._publisher = self._thread(self._publish_loop)
+        try:
+            self._outbox.put_nowait(orjson.dumps({"origin": origin, "events": events}))
+        except queue.Full:
+            self.errors += 1
+            logger.warning("Event outbox full, dropping %d events", len(events))
+
+    def _publish_loop(self):
+        client = self._client()
+        while not self._stopped.is_set():
+            try:
+                message = self._outbox.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                client.publish(self._channel, message)
+            except self._redis_module.RedisError as e:
+                self.errors += 1
+                logger.warning("Publishing events to Redis failed: %s", e)
+
+    def _listen_loop(self, deliver):
+        while not self._stopped.is_set():
+            try:
+                pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    payload = orjson.loads(message["data"])
+                    if payload.get("origin") != self.origin:
+                        deliver(payload["events"])
+            except self._redis_module.RedisError as e:
+                self.errors += 1
+                logger.warning("Redis event listener failed, reconnecting: %s", e)
+                self._stopped.wait(settings.cache_retry_seconds)
+
+    def close(self):
+        self._stopped.set()
+
+
+class EventBroker:
+    """Fans project events out to the subscribers of this worker and, through
+    the backend, to the subscribers of other workers"""
+
+    def __init__(self, backend: EventBackend):
+        self.backend = backend
+        self.origin = getattr(backend, "origin", uuid.uuid4().hex)
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def publish(self, events: List[dict]):
+        """Deliver events locally and hand them to the backend"""
+        self.published += len(events)
+        self._deliver(events)
+        self.backend.publish(self.origin, events)
+
+    def _deliver(self, events: List[dict]):
+        with self._lock:
+            targets = [(payload, list(self._subscribers.get(payload["project_id"], ()))) for payload in events]
+        for payload, subscriptions in targets:
+            for subscription in subscriptions:
+                subscription.deliver(payload)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: int):
+        """Receive the events of a project while the block runs"""
+        self.backend.start(self._deliver)
+        subscription = Subscription(project_id, settings.events_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(project_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscribers.get(project_id)
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[project_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = sum(len(subscriptions) for subscriptions in self._subscribers.values())
+        return {
+            "backend": self.backend.name,
+            "subscribers": subscribers,
+            "projects": len(self._subscribers),
+            "published": self.published,
+        }
+
+    def close(self):
+        self.backend.close()
+
+
+def _build_backend() -> EventBackend:
+    backend = settings.events_backend.lower()
+    if backend not in ("auto", "memory", "redis"):
+        raise ValueError(f"Unknown events backend '{settings.events_backend}'")
+    if backend == "redis" or (backend == "auto" and settings.redis_url):
+        if not settings.redis_url:
+            raise ValueError("events_backend is 'redis' but redis_url is not set")
+        return RedisEventBackend(settings.redis_url)
+    return EventBackend()
+
+
+event_broker = EventBroker(_build_backend())
+
+
+def encode_event(payload: dict) -> bytes:
+    return orjson.dumps(payload)
+
+
+async def next_event(subscription: Subscription, timeout: float) -> Optional[dict]:
+    """The next event, or None after timeout seconds without one"""
+    try:
+        return await asyncio.wait_for(subscription.get(), timeout)
+    except asyncio.TimeoutError:
+        return None
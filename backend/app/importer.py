@@ -0,0 +1,515 @@
+"""
+Streaming bulk import of tasks, checklists and action items
+
+Reads the format written by app.export (NDJSON or CSV, one record per row
+with a "type" of task, checklist or action_item) and inserts it into an
+existing project in chunked transactions. Records reference their parents
+by the "id" they carry in the input; these external IDs are mapped to the
+created rows in import_id_map, so later chunks and resumed runs can
+resolve them. Each chunk commits its rows, ID mappings and the run's
+progress together, so a crashed run resumes after its last committed chunk
+when the same input is supplied again.
+
+Usage:
+    python -m app.importer board.ndjson --project-id 3 [--chunk-size 1000] [--resume RUN_ID]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import and_, insert, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.crud import TaskHierarchyCRUD, UserCRUD, _bump_project_versions
+from app.events import queue_event
+from app.database import SessionLocal
+from app.models.database import Task, Checklist, ActionItem, ImportRun, ImportIdMap, TaskType
+from app.models.schemas import ImportRunResponse, TaskPriority, TaskStatus
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+class RowError(ValueError):
+    """A single input row that cannot be imported"""
+
+
+# Parsing
+
+def iter_records(stream: BinaryIO, import_format: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row_number, record) pairs, reading the stream incrementally.
+
+    record is a dict, None for blank NDJSON lines, or a RowError for rows
+    that cannot be parsed. Row numbers are stable across runs, which is
+    what resuming relies on.
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+        for row_number, row in enumerate(reader, 1):
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+
+    for row_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            yield row_number, None
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, RowError(f"Invalid JSON: {e}")
+            continue
+        yield row_number, record if isinstance(record, dict) else RowError("Expected a JSON object")
+
+
+def _text(record: dict, field: str, max_length: Optional[int] = None, required: bool = False) -> Optional[str]:
+    value = record.get(field)
+    if value is None or value == "":
+        if required:
+            raise RowError(f"Missing {field}")
+        return None
+    value = str(value)
+    if max_length and len(value) > max_length:
+        raise RowError(f"{field} is longer than {max_length} characters")
+    return value
+
+
+def _int(record: dict, field: str, default: Optional[int] = None) -> Optional[int]:
+    value = record.get(field)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"Invalid integer for {field}: {value!r}")
+
+
+def _bool(record: dict, field: str) -> bool:
+    value = record.get(field, False)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _datetime(record: dict, field: str) -> Optional[datetime]:
+    value = record.get(field)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise RowError(f"Invalid datetime for {field}: {value!r}")
+    # Columns hold naive UTC timestamps
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _choice(record: dict, field: str, enum, default):
+    value = record.get(field)
+    if value is None:
+        return default.value
+    try:
+        return enum(value).value
+    except ValueError:
+        raise RowError(f"Invalid {field}: {value!r}")
+
+
+def _external_id(record: dict, field: str) -> Optional[str]:
+    value = record.get(field)
+    return None if value is None else str(value)
+
+
+def _timestamps(record: dict, values: dict) -> dict:
+    for field in ("created_at", "updated_at"):
+        value = _datetime(record, field)
+        if value is not None:
+            values[field] = value
+    return values
+
+
+def task_values(record: dict) -> dict:
+    """Column values for a task record"""
+    return _timestamps(record, {
+        "title": _text(record, "title", 200, required=True),
+        "description": _text(record, "description"),
+        "task_type": TaskType(_choice(record, "task_type", TaskType, TaskType.TASK)),
+        "status": _choice(record, "status", TaskStatus, TaskStatus.TODO),
+        "priority": _choice(record, "priority", TaskPriority, TaskPriority.MEDIUM),
+        "assignee_id": _int(record, "assignee_id"),
+        "order_index": _int(record, "order_index", 0),
+        "estimated_hours": _int(record, "estimated_hours"),
+        "due_date": _datetime(record, "due_date"),
+        "start_date": _datetime(record, "start_date"),
+        "completed_at": _datetime(record, "completed_at"),
+    })
+
+
+def checklist_values(record: dict) -> dict:
+    """Column values for a checklist record"""
+    return _timestamps(record, {
+        "title": _text(record, "title", 200, required=True),
+        "description": _text(record, "description"),
+        "order_index": _int(record, "order_index", 0),
+        "is_completed": _bool(record, "is_completed"),
+        "completed_at": _datetime(record, "completed_at"),
+    })
+
+
+def action_item_values(record: dict) -> dict:
+    """Column values for an action item record"""
+    return _timestamps(record, {
+        "title": _text(record, "title", 200, required=True),
+        "description": _text(record, "description"),
+        "priority": _choice(record, "priority", TaskPriority, TaskPriority.MEDIUM),
+        "assignee_id": _int(record, "assignee_id"),
+        "order_index": _int(record, "order_index", 0),
+        "is_completed": _bool(record, "is_completed"),
+        "due_date": _datetime(record, "due_date"),
+        "completed_at": _datetime(record, "completed_at"),
+    })
+
+
+# (model, values builder, field holding the external parent ID, parent record type, parent column)
+RECORD_TYPES = {
+    "task": (Task, task_values, "parent_task_id", "task", "parent_task_id"),
+    "checklist": (Checklist, checklist_values, "task_id", "task", "task_id"),
+    "action_item": (ActionItem, action_item_values, "checklist_id", "checklist", "checklist_id"),
+}
+
+
+# Import runs
+
+def import_run_summary(run: ImportRun) -> ImportRunResponse:
+    """Progress and per-row errors of an import run"""
+    return ImportRunResponse(
+        id=run.id,
+        project_id=run.project_id,
+        format=run.format,
+        status=run.status,
+        rows_processed=run.rows_processed,
+        rows_imported=run.rows_imported,
+        rows_failed=run.rows_failed,
+        errors=json.loads(run.errors or "[]"),
+        created_at=run.created_at,
+        finished_at=run.finished_at,
+    )
+
+
+class ProjectImporter:
+    """Imports one input stream into a project as a resumable ImportRun"""
+
+    def __init__(
+        self,
+        db: Session,
+        run: ImportRun,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[ImportRun], None]] = None
+    ):
+        self.db = db
+        self.run = run
+        self.chunk_size = chunk_size or settings.import_chunk_size
+        self.progress = progress
+        self.errors: List[dict] = json.loads(run.errors or "[]")
+
+    @classmethod
+    def start(cls, db: Session, project_id: int, import_format: str, user_id: Optional[int] = None,
+              source_name: Optional[str] = None, **kwargs) -> "ProjectImporter":
+        """Create a new import run"""
+        run = ImportRun(project_id=project_id, user_id=user_id, format=import_format, source_name=source_name)
+        db.add(run)
+        db.commit()
+        return cls(db, run, **kwargs)
+
+    def execute(self, stream: BinaryIO) -> ImportRun:
+        """Import every row after the last committed chunk and finish the run"""
+        if self.run.status == "completed":
+            return self.run
+        self.run.status = "running"
+        self.db.commit()
+
+        try:
+            chunk = []
+            for row_number, record in iter_records(stream, self.run.format):
+                if row_number <= self.run.rows_processed:
+                    continue
+                chunk.append((row_number, record))
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self._import_chunk(chunk)
+            self._finish()
+        except Exception:
+            self.db.rollback()
+            self.run.status = "failed"
+            self.db.commit()
+            raise
+        return self.run
+
+    def _error(self, row_number: int, message: str):
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append({"row": row_number, "error": message})
+
+    def _lookup(self, record_type: str, external_ids: Set[str]) -> Dict[str, int]:
+        """Internal IDs already created for external IDs in this run"""
+        if not external_ids:
+            return {}
+        return dict(self.db.query(ImportIdMap.external_id, ImportIdMap.internal_id).filter(
+            ImportIdMap.run_id == self.run.id,
+            ImportIdMap.record_type == record_type,
+            ImportIdMap.external_id.in_(external_ids)
+        ).all())
+
+    def _import_chunk(self, chunk: List[Tuple[int, object]]):
+        """Insert one chunk of rows, their ID mappings and the run progress in one transaction"""
+        by_type: Dict[str, list] = {record_type: [] for record_type in RECORD_TYPES}
+        failed = 0
+        for row_number, record in chunk:
+            if record is None:
+                continue
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                record_type = record.get("type") or "task"
+                if record_type not in RECORD_TYPES:
+                    raise RowError(f"Unknown record type {record_type!r}")
+                _, build_values, parent_field, _, _ = RECORD_TYPES[record_type]
+                by_type[record_type].append((
+                    row_number, _external_id(record, "id"), _external_id(record, parent_field), build_values(record)
+                ))
+            except RowError as e:
+                self._error(row_number, str(e))
+                failed += 1
+
+        # Unknown assignees (users that were not migrated) are dropped, not rejected
+        assignee_ids = {
+            values["assignee_id"] for rows in by_type.values() for _, _, _, values in rows if values.get("assignee_id")
+        }
+        existing_assignees = UserCRUD.get_existing_user_ids(self.db, assignee_ids)
+
+        imported = 0
+        # Parents first, so rows in this chunk can reference parents earlier in it
+        for record_type in ("task", "checklist", "action_item"):
+            rows = by_type[record_type]
+            if not rows:
+                continue
+            inserted, rejected = self._insert_rows(record_type, rows, existing_assignees)
+            imported += inserted
+            failed += rejected
+
+        self.run.rows_processed = chunk[-1][0]
+        self.run.rows_imported += imported
+        self.run.rows_failed += failed
+        self.run.errors = json.dumps(self.errors)
+        self.db.commit()
+        if self.progress:
+            self.progress(self.run)
+
+    def _insert_rows(self, record_type: str, rows: list, existing_assignees: Set[int]) -> Tuple[int, int]:
+        model, _, parent_field, parent_type, parent_column = RECORD_TYPES[record_type]
+        external_ids = {external_id for _, external_id, _, _ in rows if external_id is not None}
+        taken = set(self._lookup(record_type, external_ids))
+        parents = self._lookup(parent_type, {parent for _, _, parent, _ in rows if parent is not None})
+
+        accepted, rejected = [], 0
+        for row_number, external_id, parent, values in rows:
+            if external_id is not None and external_id in taken:
+                self._error(row_number, f"Duplicate {record_type} id {external_id!r}")
+                rejected += 1
+                continue
+            # Only tasks may be top-level; a checklist or item without a parent would be orphaned
+            if parent is None and record_type != "task":
+                self._error(row_number, f"Missing {parent_field}")
+                rejected += 1
+                continue
+            if parent is not None and parent == external_id and record_type == "task":
+                self._error(row_number, f"Task {external_id!r} cannot be its own parent")
+                rejected += 1
+                continue
+            if parent is not None and parent not in parents and record_type != "task":
+                self._error(row_number, f"Unknown {parent_type} id {parent!r} (parents must come before their children)")
+                rejected += 1
+                continue
+            if values.get("assignee_id") not in existing_assignees:
+                values["assignee_id"] = None
+            if external_id is not None:
+                taken.add(external_id)
+            accepted.append((row_number, external_id, parent, values))
+        if not accepted:
+            return 0, rejected
+
+        extra = {"project_id": self.run.project_id} if model is Task else {}
+        new_ids = self.db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [{**values, **extra, parent_column: parents.get(parent)} for _, _, parent, values in accepted]
+        ).scalars().all()
+
+        # Link subtasks to parents inserted earlier in this same statement;
+        # parents that appear later in the input are linked when the run
+        # finishes, after a cycle check
+        created: Dict[str, int] = {}
+        links, mappings = [], []
+        for (row_number, external_id, parent, _), new_id in zip(accepted, new_ids):
+            pending = None
+            if parent is not None and parent not in parents:
+                if parent in created:
+                    links.append({"id": new_id, "parent_task_id": created[parent]})
+                else:
+                    pending = parent
+            if external_id is not None:
+                created[external_id] = new_id
+            if external_id is None and pending is None:
+                continue
+            mappings.append({
+                "run_id": self.run.id, "record_type": record_type,
+                "external_id": external_id if external_id is not None else f"#row{row_number}",
+                "internal_id": new_id, "pending_parent": pending, "row_number": row_number,
+            })
+        if links:
+            self.db.execute(update(Task), links)
+        if mappings:
+            self.db.execute(insert(ImportIdMap), mappings)
+        return len(accepted), rejected
+
+    def _cyclic_links(self, links) -> Set[int]:
+        """Tasks whose forward parent link would close a parent cycle.
+
+        Links made while inserting always point at rows inserted before
+        them, so every cycle contains at least one forward link; leaving
+        out the forward links of tasks on a cycle breaks all of them.
+        """
+        parent_of = dict(self.db.query(Task.id, Task.parent_task_id).join(
+            ImportIdMap, ImportIdMap.internal_id == Task.id
+        ).filter(
+            ImportIdMap.run_id == self.run.id,
+            ImportIdMap.record_type == "task",
+            Task.parent_task_id.isnot(None)
+        ).all())
+        parent_of.update((task_id, parent_id) for task_id, parent_id, _, _ in links if parent_id)
+
+        looping: Set[int] = set()
+        visited: Set[int] = set()
+        for start in parent_of:
+            path: List[int] = []
+            node = start
+            while node is not None and node not in visited:
+                visited.add(node)
+                path.append(node)
+                node = parent_of.get(node)
+            if node in path:
+                looping.update(path[path.index(node):])
+        forward = {task_id for task_id, parent_id, _, _ in links if parent_id}
+        return looping & forward
+
+    def _finish(self):
+        """Link forward parent references, rebuild rollups and complete the run"""
+        child, parent = aliased(ImportIdMap), aliased(ImportIdMap)
+        links = self.db.query(child.internal_id, parent.internal_id, child.pending_parent, child.row_number).outerjoin(
+            parent, and_(
+                parent.run_id == child.run_id,
+                parent.record_type == "task",
+                parent.external_id == child.pending_parent
+            )
+        ).filter(
+            child.run_id == self.run.id,
+            child.record_type == "task",
+            child.pending_parent.isnot(None)
+        ).all()
+        looping = self._cyclic_links(links)
+        resolved = [
+            {"id": task_id, "parent_task_id": parent_id}
+            for task_id, parent_id, _, _ in links if parent_id and task_id not in looping
+        ]
+        if resolved:
+            self.db.execute(update(Task), resolved)
+        for task_id, parent_id, pending, row_number in links:
+            if not parent_id:
+                self._error(row_number, f"Unknown task id {pending!r}; imported as a top-level task")
+            elif task_id in looping:
+                self._error(row_number, f"Parent task {pending!r} is its own descendant; imported as a top-level task")
+        if links:
+            self.db.query(ImportIdMap).filter(
+                ImportIdMap.run_id == self.run.id,
+                ImportIdMap.pending_parent.isnot(None)
+            ).update({ImportIdMap.pending_parent: None}, synchronize_session=False)
+        self.run.errors = json.dumps(self.errors)
+        self.db.commit()
+
+        # Rollups are rebuilt once instead of being maintained row by row
+        TaskHierarchyCRUD.rebuild_rollups(self.db, project_id=self.run.project_id)
+        _bump_project_versions(self.db, [self.run.project_id])
+        self.run.status = "completed"
+        self.run.finished_at = datetime.utcnow()
+        # One event for the whole import; clients refetch the project
+        queue_event(self.db, self.run.project_id, "project.imported", run_id=self.run.id, rows=self.run.rows_imported)
+        self.db.commit()
+
+
+def import_stream(
+    project_id: int,
+    stream: BinaryIO,
+    import_format: str,
+    user_id: Optional[int] = None,
+    source_name: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    resume_run_id: Optional[int] = None,
+    progress: Optional[Callable[[ImportRun], None]] = None
+) -> ImportRunResponse:
+    """Run (or resume) an import in its own session and return its summary"""
+    with SessionLocal() as db:
+        if resume_run_id is not None:
+            run = db.query(ImportRun).filter(
+                ImportRun.id == resume_run_id,
+                ImportRun.project_id == project_id
+            ).first()
+            if not run:
+                raise LookupError(f"Import run {resume_run_id} not found for project {project_id}")
+            importer = ProjectImporter(db, run, chunk_size=chunk_size, progress=progress)
+        else:
+            importer = ProjectImporter.start(
+                db, project_id, import_format, user_id=user_id, source_name=source_name,
+                chunk_size=chunk_size, progress=progress
+            )
+        run = importer.execute(stream)
+        return import_run_summary(run)
+
+
+def main(argv=None) -> int:
+    from app.database import create_tables
+
+    parser = argparse.ArgumentParser(description="Import tasks, checklists and action items into a project")
+    parser.add_argument("path", help="NDJSON or CSV file (as written by the project export)")
+    parser.add_argument("--project-id", type=int, required=True)
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.import_chunk_size)
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="continue a crashed or failed run")
+    parser.add_argument("--user-id", type=int, help="user recorded as the importer")
+    args = parser.parse_args(argv)
+
+    import_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    create_tables()
+
+    def report(run: ImportRun):
+        print(f"run {run.id}: {run.rows_processed} rows read, {run.rows_imported} imported, {run.rows_failed} failed",
+              flush=True)
+
+    with open(args.path, "rb") as stream:
+        summary = import_stream(
+            args.project_id, stream, import_format, user_id=args.user_id,
+            source_name=os.path.basename(args.path), chunk_size=args.chunk_size,
+            resume_run_id=args.resume, progress=report
+        )
+    print(f"Import run {summary.id} {summary.status}: {summary.rows_imported} rows imported, "
+          f"{summary.rows_failed} failed")
+    for error in summary.errors:
+        print(f"  row {error.row}: {error.error}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
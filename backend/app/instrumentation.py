@@ -0,0 +1,165 @@
+"""
+SQL query instrumentation for TaskManager Pro
+
+Counts the statements each request executes, their total database time and
+repeated statement shapes (likely N+1 loops). Results are logged per request
+and, in debug mode, returned as X-DB-* response headers. Every statement's
+duration also goes to the db_query_duration_seconds metric.
+
+In tests, query_budget() asserts an upper bound on the statements a block
+of code issues:
+
+    with query_budget(6):
+        client.get("/api/v1/tasks/1/checklists", headers=auth)
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.metrics import db_query_duration, statement_operation
+
+logger = logging.getLogger("app.sql")
+
+_NUMBER = re.compile(r"\b\d+\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|:\w+|\$\d+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so loop iterations share one shape"""
+    shape = _NUMBER.sub("N", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed within one request or budget block"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Statement shapes executed at least threshold times (likely N+1)"""
+        threshold = threshold or settings.query_n_plus_one_threshold
+        with self._lock:
+            return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+
+_request_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "request_query_stats", default=None
+)
+_budgets: List[QueryStats] = []
+_budgets_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being handled, if any"""
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    duration = time.perf_counter() - started
+    db_query_duration.observe(duration, statement_operation(statement))
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if _budgets:
+        with _budgets_lock:
+            for budget in _budgets:
+                budget.record(statement, duration)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that collects QueryStats for every HTTP request"""
+
+    def __init__(self, app, expose_headers: Optional[bool] = None):
+        self.app = app
+        self.expose_headers = settings.debug if expose_headers is None else expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.duration_ms:.2f}".encode()))
+                repeated = stats.repeated()
+                if repeated:
+                    headers.append((b"x-db-repeated-queries", str(max(repeated.values())).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
+            self._log(scope, stats)
+
+    @staticmethod
+    def _log(scope, stats: QueryStats):
+        path = f"{scope['method']} {scope['path']}"
+        logger.debug("%s: %d queries in %.2fms", path, stats.count, stats.duration_ms)
+        for shape, n in stats.repeated().items():
+            logger.warning("Possible N+1 in %s: statement executed %d times: %s", path, n, shape[:300])
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeated: bool = True):
+    """Fail with AssertionError when the block executes more than max_queries
+    statements (or, with allow_repeated=False, any N+1 shape).
+
+    Statements are counted on every thread, so requests made through
+    fastapi.testclient.TestClient are included.
+    """
+    stats = QueryStats()
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+
+    details = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common(10))
+    assert stats.count <= max_queries, (
+        f"Query budget exceeded: {stats.count} statements (budget {max_queries})\n{details}"
+    )
+    if not allow_repeated:
+        repeated = stats.repeated()
+        assert not repeated, f"Repeated statements (likely N+1):\n{details}"
@@ -0,0 +1,332 @@
+"""
+Background jobs for TaskManager Pro
+
+Jobs are rows in the jobs table. Workers claim queued jobs with a
+conditional UPDATE (so any number of threads and processes can share one
+queue), run the registered handler and record the result. Failed jobs are
+retried with exponential backoff up to max_attempts, and running jobs whose
+worker stopped sending heartbeats are requeued.
+
+The API starts settings.jobs_inprocess_workers worker threads; workers can
+also run as a separate process (imports read their upload from
+settings.import_upload_dir, so such workers need that directory too):
+
+    python -m app.jobs worker [--concurrency N]
+    python -m app.jobs enqueue rollups.rebuild [--payload '{"project_id": 1}']
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import JobCRUD, SearchCRUD, TaskCRUD, TaskHierarchyCRUD
+from app.database import SessionLocal
+from app.importer import import_stream
+from app.models.database import Job, Project
+
+logger = logging.getLogger("app.jobs")
+
+# Kinds admins may queue through POST /jobs
+MAINTENANCE_JOBS = ("rollups.rebuild", "search.rebuild")
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.progress when a cancel was requested"""
+
+
+class JobContext:
+    """What a handler gets: the job, its payload and a session to work with"""
+
+    def __init__(self, db: Session, job: Job, cancellable: bool = True):
+        self.db = db
+        self.job_id = job.id
+        self.payload = json.loads(job.payload or "{}")
+        self.cancellable = cancellable
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress and a heartbeat, then stop if a cancel was requested
+        (cancellable handlers only)"""
+        values = {Job.progress_done: done, Job.heartbeat_at: datetime.utcnow()}
+        if total is not None:
+            values[Job.progress_total] = total
+        if message is not None:
+            values[Job.message] = message[:255]
+        self.db.query(Job).filter(Job.id == self.job_id).update(values, synchronize_session=False)
+        self.db.commit()
+        if self.cancellable and self.db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar():
+            raise JobCancelled()
+
+
+class JobHandler:
+    def __init__(self, fn: Callable[[JobContext], Optional[dict]], cancellable: bool):
+        self.fn = fn
+        self.cancellable = cancellable
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str, cancellable: bool = True):
+    """Register a function as the handler of a job kind.
+
+    Handlers that leave data half-changed when stopped early pass
+    cancellable=False; running jobs of that kind cannot be cancelled.
+    """
+    def decorator(fn: Callable[[JobContext], Optional[dict]]):
+        HANDLERS[kind] = JobHandler(fn, cancellable)
+        return fn
+    return decorator
+
+
+def is_cancellable(job: Job) -> bool:
+    """Whether a cancel request can stop this job"""
+    handler = HANDLERS.get(job.kind)
+    return job.status == "queued" or (job.status == "running" and handler is not None and handler.cancellable)
+
+
+# Handlers
+
+@job_handler("task.delete", cancellable=False)
+def _delete_task(ctx: JobContext) -> dict:
+    task_id = ctx.payload["task_id"]
+    total = TaskCRUD.count_subtree_tasks(ctx.db, task_id)
+    deleted = 0
+    ctx.progress(0, total)
+    while total:
+        count, finished = TaskCRUD.delete_task_batch(ctx.db, task_id, settings.jobs_delete_batch_size)
+        deleted += count
+        ctx.progress(deleted, max(total, deleted))
+        if finished:
+            break
+    return {"task_id": task_id, "deleted_tasks": deleted}
+
+
+@job_handler("import")
+def _import_upload(ctx: JobContext) -> dict:
+    payload = ctx.payload
+
+    def report(run):
+        ctx.progress(run.rows_processed, message=f"{run.rows_imported} rows imported, {run.rows_failed} failed")
+
+    try:
+        with open(payload["path"], "rb") as stream:
+            summary = import_stream(
+                payload["project_id"], stream, payload["format"], user_id=payload.get("user_id"),
+                source_name=payload.get("source_name"), chunk_size=payload.get("chunk_size"),
+                resume_run_id=payload.get("resume_run_id"), progress=report
+            )
+    finally:
+        discard_upload(payload)
+    return summary.model_dump(mode="json")
+
+
+def discard_upload(payload: dict):
+    """Remove the uploaded file of an import job that ran or will not run"""
+    try:
+        os.remove(payload["path"])
+    except (KeyError, FileNotFoundError):
+        pass
+
+
+@job_handler("rollups.rebuild")
+def _rebuild_rollups(ctx: JobContext) -> dict:
+    # One project per transaction, with a heartbeat after each
+    project_id = ctx.payload.get("project_id")
+    if project_id is not None:
+        project_ids = [project_id]
+    else:
+        project_ids = [row.id for row in ctx.db.query(Project.id).order_by(Project.id)]
+    corrected = 0
+    ctx.progress(0, len(project_ids))
+    for done, project_id in enumerate(project_ids, 1):
+        corrected += TaskHierarchyCRUD.rebuild_rollups(ctx.db, project_id=project_id)
+        ctx.progress(done)
+    return {"corrected": corrected}
+
+
+@job_handler("search.rebuild")
+def _rebuild_search(ctx: JobContext) -> dict:
+    # Progress commits after each record type, so searches miss at most one type meanwhile
+    return {"indexed": SearchCRUD.rebuild_search_index(ctx.db, progress=ctx.progress)}
+
+
+# Queue
+
+_wakeup = threading.Event()
+
+
+def wake_workers():
+    """Let idle in-process workers pick up a new job without waiting for the next poll"""
+    _wakeup.set()
+
+
+def enqueue(db: Session, kind: str, payload: Optional[dict] = None, **options) -> Job:
+    """Queue a job (see JobCRUD.create_job for options) and wake local workers"""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job = JobCRUD.create_job(db, kind, payload, **options)
+    wake_workers()
+    return job
+
+
+def _finish(db: Session, job_id: int, **values):
+    db.query(Job).filter(Job.id == job_id).update(
+        {getattr(Job, field): value for field, value in values.items()}, synchronize_session=False
+    )
+    db.commit()
+
+
+def claim_job(db: Session, worker_id: str) -> Optional[Job]:
+    """Claim the oldest runnable job, or None when the queue is empty.
+
+    The claim is a conditional UPDATE on status, so when workers race for the
+    same job exactly one of them wins; the others move on to the next one.
+    """
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(
+        Job.status == "queued", Job.run_after <= now
+    ).order_by(Job.run_after, Job.id).limit(5).all()
+    for (job_id,) in candidates:
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == "queued").update({
+            Job.status: "running",
+            Job.worker_id: worker_id,
+            Job.attempts: Job.attempts + 1,
+            Job.started_at: now,
+            Job.heartbeat_at: now,
+            Job.error: None,
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    db.rollback()
+    return None
+
+
+def run_job(db: Session, job: Job):
+    """Run a claimed job and record its outcome"""
+    job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+    handler = HANDLERS.get(kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler for job kind '{kind}'")
+        result = handler.fn(JobContext(db, job, handler.cancellable))
+    except JobCancelled:
+        db.rollback()
+        _finish(db, job_id, status="cancelled", finished_at=datetime.utcnow())
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (%s) failed on attempt %d", job_id, kind, attempts)
+        error = f"{type(e).__name__}: {e}"[:2000]
+        if handler is not None and attempts < max_attempts:
+            backoff = settings.jobs_retry_backoff_seconds * 2 ** (attempts - 1)
+            _finish(db, job_id, status="queued", worker_id=None, error=error,
+                    run_after=datetime.utcnow() + timedelta(seconds=backoff))
+        else:
+            _finish(db, job_id, status="failed", error=error, finished_at=datetime.utcnow())
+    else:
+        _finish(db, job_id, status="succeeded", result=json.dumps(result or {}), finished_at=datetime.utcnow())
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Requeue (or fail, when out of attempts) running jobs whose worker went silent"""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.jobs_stale_after_seconds)
+    stale = db.query(Job).filter(Job.status == "running", Job.heartbeat_at < cutoff)
+    failed = stale.filter(Job.attempts >= Job.max_attempts).update({
+        Job.status: "failed", Job.error: "Worker stopped responding", Job.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    requeued = stale.filter(Job.attempts < Job.max_attempts).update({
+        Job.status: "queued", Job.worker_id: None, Job.run_after: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return failed + requeued
+
+
+class JobWorker:
+    """Pool of threads that claim and run queued jobs"""
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._next_stale_check = 0.0
+
+    def start(self):
+        for number in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, daemon=True, name=f"job-worker-{number}")
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming jobs and wait briefly for running ones"""
+        self._stopped.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_next(self) -> bool:
+        """Claim and run one job; False when there was nothing to run"""
+        with SessionLocal() as db:
+            if time.monotonic() >= self._next_stale_check:
+                self._next_stale_check = time.monotonic() + 60
+                requeue_stale_jobs(db)
+            job = claim_job(db, self.worker_id)
+            if job is None:
+                return False
+            run_job(db, job)
+            return True
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Job worker error")
+            _wakeup.wait(settings.jobs_poll_interval_seconds)
+            _wakeup.clear()
+
+
+def main(argv=None) -> int:
+    from app.database import create_tables
+
+    parser = argparse.ArgumentParser(description="TaskManager Pro background jobs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker = subparsers.add_parser("worker", help="run queued jobs until interrupted")
+    worker.add_argument("--concurrency", type=int, default=2)
+    queue = subparsers.add_parser("enqueue", help="queue a job")
+    queue.add_argument("kind", choices=sorted(HANDLERS))
+    queue.add_argument("--payload", default="{}", help="JSON arguments for the handler")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    if args.command == "enqueue":
+        with SessionLocal() as db:
+            job = enqueue(db, args.kind, json.loads(args.payload))
+            print(f"Queued job {job.id} ({job.kind})")
+        return 0
+
+    logging.basicConfig(level=logging.INFO)
+    pool = JobWorker(args.concurrency)
+    pool.start()
+    print(f"Job worker {pool.worker_id} running {args.concurrency} threads; Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
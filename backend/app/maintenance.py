@@ -0,0 +1,49 @@
+"""
+Maintenance commands for TaskManager Pro
+
+Usage:
+    python -m app.maintenance rebuild-rollups [--project-id N]
+    python -m app.maintenance rebuild-search
+"""
+import argparse
+import sys
+
+from app.crud import SearchCRUD, TaskHierarchyCRUD
+from app.database import SessionLocal, create_tables
+
+
+def rebuild_rollups(project_id=None) -> int:
+    """Recompute completion rollup counters and return the number of corrected rows"""
+    with SessionLocal() as db:
+        return TaskHierarchyCRUD.rebuild_rollups(db, project_id=project_id)
+
+
+def rebuild_search() -> int:
+    """Repopulate the full-text search index and return the number of indexed records"""
+    with SessionLocal() as db:
+        return SearchCRUD.rebuild_search_index(db)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TaskManager Pro maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rollups = subparsers.add_parser("rebuild-rollups", help="recompute task and checklist completion counters")
+    rollups.add_argument("--project-id", type=int, help="limit the rebuild to one project")
+    subparsers.add_parser("rebuild-search", help="repopulate the full-text search index")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    if args.command == "rebuild-rollups":
+        fixed = rebuild_rollups(args.project_id)
+        print(f"Rollups rebuilt, {fixed} rows corrected")
+    elif args.command == "rebuild-search":
+        indexed = rebuild_search()
+        if indexed:
+            print(f"Search index rebuilt, {indexed} records indexed")
+        else:
+            print("Search index is empty or not available on this database (LIKE search is used)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
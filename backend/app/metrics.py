@@ -0,0 +1,297 @@
+"""
+Prometheus metrics for TaskManager Pro
+
+Counters, gauges and histograms are kept in process memory and rendered in
+the Prometheus text format by GET /metrics, so nothing but a scraper is
+needed. Recording a value is a dict lookup and a few additions under a
+per-metric lock. Numbers that other modules already track (pool occupancy,
+cache hit counters, the password hashing queue) are read by callbacks at
+scrape time instead of on every call.
+
+Each API worker process keeps its own numbers; scrape every worker for
+complete figures.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+# Upper bounds in seconds
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+AUTH_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+_metrics: List["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """A named metric family with optional labels, registered on creation"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        """(sample name suffix, label values, value) for the current state"""
+        with self._lock:
+            return [("", labels, value) for labels, value in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            names = self.labelnames + ("le",) if suffix == "_bucket" else self.labelnames
+            lines.append(f"{self.name}{suffix}{_labels(names, labels)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative ``le`` buckets, with _sum and _count"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        # Per label set: one count per bucket plus +Inf, then sum
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the seconds spent in the block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            states = [(labels, list(state)) for labels, state in self._values.items()]
+        samples = []
+        for labels, state in states:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                samples.append(("_bucket", labels + (_number(bound),), cumulative))
+            samples.append(("_sum", labels, state[-1]))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class CallbackMetric(Metric):
+    """Counter or gauge whose samples come from a callback at scrape time.
+
+    The callback returns {label values: value}; a failing callback drops the
+    metric from that scrape instead of failing it.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[LabelValues, float]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception:
+            return []
+        return [("", labels, value) for labels, value in values.items()]
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled")
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is sent",
+    ("method", "route"), HTTP_BUCKETS
+)
+http_requests = Counter("http_requests_total", "HTTP responses by status code", ("method", "route", "status"))
+
+# Database
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("operation",), DB_BUCKETS
+)
+db_pool_checkouts = Counter("db_pool_checkouts_total", "Connections handed out by the pool", ("engine",))
+db_pool_invalidated = Counter("db_pool_invalidated_total", "Pooled connections discarded after errors", ("engine",))
+
+# Authentication
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash and verify time", ("operation",), AUTH_BUCKETS
+)
+password_hash_rejected = Counter(
+    "password_hash_rejected_total", "Hashing requests refused with 503 because the pool was full"
+)
+auth_token_duration = Histogram(
+    "auth_token_duration_seconds", "Bearer token resolution time, including the principal cache",
+    ("result",), AUTH_BUCKETS
+)
+auth_logins = Counter("auth_logins_total", "Login attempts by outcome", ("result",))
+
+
+_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "WITH"))
+
+
+def statement_operation(statement: str) -> str:
+    """First keyword of a statement, or OTHER, as a low-cardinality label"""
+    keyword = statement.lstrip()[:8].split(None, 1)
+    operation = keyword[0].upper() if keyword else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+_pools: Dict[str, object] = {}
+
+
+def instrument_pool(engine: Engine, name: str):
+    """Count checkouts of an engine's pool and expose its occupancy as gauges"""
+    event.listen(engine, "checkout", lambda *args: db_pool_checkouts.inc(name))
+    event.listen(engine, "invalidate", lambda *args: db_pool_invalidated.inc(name))
+    _pools[name] = engine.pool
+
+
+def _pool_connections() -> Dict[LabelValues, float]:
+    values = {}
+    for name, pool in _pools.items():
+        # Pools without a fixed size (StaticPool, NullPool) only report what they can
+        for state, method in (("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                values[(name, state)] = getattr(pool, method)()
+    return values
+
+
+def _pool_size() -> Dict[LabelValues, float]:
+    return {(name,): pool.size() for name, pool in _pools.items() if hasattr(pool, "size")}
+
+
+CallbackMetric("db_pool_connections", "Pooled connections by state (overflow is negative while below pool size)",
+               ("engine", "state"), _pool_connections)
+CallbackMetric("db_pool_size", "Configured pool size", ("engine",), _pool_size)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests, latency and status codes.
+
+    Requests are labelled by route template (/api/v1/tasks/{task_id}), never
+    by raw path, so label cardinality stays bounded; requests that match no
+    route share the label "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict[Callable, str]] = None
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            app = scope.get("app")
+            self._routes = {route.endpoint: route.path for route in getattr(app, "routes", ())
+                            if hasattr(route, "endpoint")}
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            method = scope["method"]
+            route = self._route(scope)
+            http_request_duration.observe(elapsed, method, route)
+            http_requests.inc(method, route, status)
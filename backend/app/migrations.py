@@ -0,0 +1,269 @@
+"""
+Versioned schema migrations for TaskManager Pro
+
+Usage:
+    python -m app.migrations upgrade   # apply pending migrations
+    python -m app.migrations current   # show the applied schema version
+    python -m app.migrations check     # assert CRUD queries use an index (SQLite)
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.database import Base, Task
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+class Migration:
+    """A single schema migration step"""
+
+    def __init__(self, version: int, description: str, upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register an upgrade function as the migration with the given version"""
+    def decorator(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return decorator
+
+
+# Helpers for upgrade functions. They are idempotent because a fresh database
+# already gets the latest schema from create_all before migrations run.
+
+def create_indexes(conn: Connection, table_name: str, *index_names: str):
+    """Create the named indexes declared on a model table if they are missing.
+
+    Indexes are named explicitly so that a migration keeps creating the
+    same set when later migrations declare more indexes on the model.
+    """
+    indexes = {index.name: index for index in Base.metadata.tables[table_name].indexes}
+    for name in index_names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+def create_table(conn: Connection, table_name: str):
+    """Create a model table and its indexes if they are missing"""
+    Base.metadata.tables[table_name].create(bind=conn, checkfirst=True)
+
+
+def add_column(conn: Connection, table_name: str, column_name: str, ddl: str):
+    """Add a column unless it already exists"""
+    columns = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    if column_name not in columns:
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+
+
+# Migrations
+
+@migration(1, "Composite indexes for task, membership, checklist and action item hot paths")
+def _hot_path_indexes(conn: Connection):
+    create_indexes(conn, "projects", "ix_projects_owner_active")
+    create_indexes(
+        conn, "tasks",
+        "ix_tasks_project_order", "ix_tasks_project_parent_order", "ix_tasks_assignee_order", "ix_tasks_parent_order"
+    )
+    create_indexes(conn, "checklists", "ix_checklists_task_order")
+    create_indexes(conn, "action_items", "ix_action_items_checklist_order", "ix_action_items_assignee_completed")
+    create_indexes(conn, "project_members", "ix_project_members_project_user_active", "ix_project_members_user_active")
+
+
+@migration(2, "Completion rollup counters on tasks and checklists")
+def _rollup_counters(conn: Connection):
+    from app.crud import TaskHierarchyCRUD
+
+    add_column(conn, "tasks", "rollup_completed", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "tasks", "rollup_total", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "checklists", "items_completed", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "checklists", "items_total", "INTEGER NOT NULL DEFAULT 0")
+    with Session(bind=conn) as db:
+        TaskHierarchyCRUD.rebuild_rollups(db)
+
+
+@migration(3, "Project version counter for conditional GETs")
+def _project_version(conn: Connection):
+    add_column(conn, "projects", "version", "INTEGER NOT NULL DEFAULT 1")
+
+
+@migration(4, "Import run tracking for resumable bulk imports")
+def _import_runs(conn: Connection):
+    create_table(conn, "import_runs")
+    create_table(conn, "import_id_map")
+
+
+@migration(5, "Full-text search index over task, checklist and action item text")
+def _search_index(conn: Connection):
+    from app.search import create_search_index, rebuild_search_index
+
+    # Other databases (and SQLite without FTS5) search with LIKE instead
+    if create_search_index(conn):
+        rebuild_search_index(conn)
+
+
+@migration(6, "Background job queue")
+def _jobs(conn: Connection):
+    create_table(conn, "jobs")
+
+
+@migration(7, "Covering index for project dashboard stats")
+def _project_stats_index(conn: Connection):
+    create_indexes(conn, "tasks", "ix_tasks_project_stats")
+
+
+@migration(8, "Backfill NULL task order_index (keyset pagination skips NULL rows)")
+def _task_order_index_not_null(conn: Connection):
+    conn.execute(text("UPDATE tasks SET order_index = 0 WHERE order_index IS NULL"))
+    # Other databases keep the nullable column; TaskUpdate rejects null writes
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE tasks ALTER COLUMN order_index SET DEFAULT 0"))
+        conn.execute(text("ALTER TABLE tasks ALTER COLUMN order_index SET NOT NULL"))
+
+
+# Runner
+
+def _ensure_migrations_table(conn: Connection):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(200) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+
+
+def current_version(engine: Engine) -> int:
+    """Return the highest applied migration version (0 if none)"""
+    with engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        version = conn.execute(text(f"SELECT MAX(version) FROM {MIGRATIONS_TABLE}")).scalar()
+    return version or 0
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply all pending migrations in order, each in its own transaction"""
+    applied = []
+    start = current_version(engine)
+    for step in MIGRATIONS:
+        if step.version <= start:
+            continue
+        with engine.begin() as conn:
+            step.upgrade(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {"version": step.version, "description": step.description, "applied_at": datetime.utcnow()}
+            )
+        applied.append(step.version)
+    return applied
+
+
+# Query plan check
+
+def hot_path_queries() -> List[Tuple[str, Callable[[Session], object]]]:
+    """CRUD calls on the access paths that must hit an index.
+
+    The check runs the real methods and explains the statements they
+    execute, so it cannot drift from what the application sends.
+    """
+    from app.crud import (
+        ActionItemCRUD, ChecklistCRUD, ProjectCRUD, ProjectMemberCRUD, TaskCRUD, TaskHierarchyCRUD, UserCRUD,
+        encode_task_cursor
+    )
+
+    cursor = encode_task_cursor(Task(id=1, order_index=0))
+    return [
+        ("UserCRUD.get_user_by_username", lambda db: UserCRUD.get_user_by_username(db, "admin")),
+        ("ProjectCRUD.get_user_projects", lambda db: ProjectCRUD.get_user_projects(db, 1)),
+        ("TaskCRUD.query_tasks[project]", lambda db: TaskCRUD.query_tasks(db, project_id=1)),
+        ("TaskCRUD.query_tasks[project, status]", lambda db: TaskCRUD.query_tasks(db, project_id=1, status="todo")),
+        ("TaskCRUD.query_tasks[project, cursor]", lambda db: TaskCRUD.query_tasks(db, project_id=1, cursor=cursor)),
+        ("TaskCRUD.query_tasks[assignee]", lambda db: TaskCRUD.query_tasks(db, assignee_id=1)),
+        # Version 0 is never assigned, so the stats cache cannot answer instead of the database
+        ("TaskCRUD.get_project_stats", lambda db: TaskCRUD.get_project_stats(db, 1, version=0)),
+        ("TaskCRUD.get_subtasks", lambda db: TaskCRUD.get_subtasks(db, 1)),
+        ("TaskHierarchyCRUD.get_project_task_tree", lambda db: TaskHierarchyCRUD.get_project_task_tree(db, 1)),
+        ("ProjectMemberCRUD.get_member_by_project_and_user",
+         lambda db: ProjectMemberCRUD.get_member_by_project_and_user(db, 1, 1)),
+        ("ProjectMemberCRUD.query_project_members", lambda db: ProjectMemberCRUD.query_project_members(db, 1)),
+        ("ProjectMemberCRUD.get_user_projects", lambda db: ProjectMemberCRUD.get_user_projects(db, 1)),
+        ("ChecklistCRUD.get_task_checklists_with_items", lambda db: ChecklistCRUD.get_task_checklists_with_items(db, 1)),
+        ("ActionItemCRUD.get_checklist_action_items", lambda db: ActionItemCRUD.get_checklist_action_items(db, 1)),
+        ("ActionItemCRUD.get_user_action_items", lambda db: ActionItemCRUD.get_user_action_items(db, 1, completed=False)),
+    ]
+
+
+def check_query_plans(engine: Engine) -> List[Tuple[str, List[str], bool]]:
+    """Run EXPLAIN QUERY PLAN for the statements of each hot-path call (SQLite only).
+
+    A call passes when no step of its statements is a bare table scan
+    ("SCAN <table>" without an index). Calls run in a transaction that is
+    rolled back.
+    """
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("Query plan check is only supported on SQLite")
+
+    results = []
+    for name, call in hot_path_queries():
+        with Session(bind=engine) as db:
+            conn = db.connection()
+            statements = []
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append((statement, parameters))
+
+            event.listen(conn, "before_cursor_execute", capture)
+            try:
+                call(db)
+            finally:
+                event.remove(conn, "before_cursor_execute", capture)
+            plan = []
+            for statement, parameters in statements:
+                plan += [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            db.rollback()
+        table_scan = any(step.startswith("SCAN ") and " INDEX " not in step for step in plan)
+        results.append((name, plan, bool(statements) and not table_scan))
+    return results
+
+
+def main(argv=None) -> int:
+    from app.database import engine, create_tables
+
+    parser = argparse.ArgumentParser(description="TaskManager Pro schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "check"])
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        before = current_version(engine)
+        create_tables()
+        print(f"Schema upgraded from version {before} to {current_version(engine)}")
+    elif args.command == "current":
+        print(f"Schema version: {current_version(engine)} (latest: {MIGRATIONS[-1].version})")
+    else:
+        create_tables()
+        failures = 0
+        for name, plan, ok in check_query_plans(engine):
+            print(f"{'OK  ' if ok else 'FAIL'} {name}")
+            for step in plan:
+                print(f"       {step}")
+            failures += not ok
+        if failures:
+            print(f"{failures} queries do not use an index")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
@@ -1,7 +1,7 @@
 """
 Database models for TaskManager Pro
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -70,11 +70,16 @@ class Project(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, default=1, server_default="1", nullable=False)  # bumped by every write, used for ETags
     
     # Relationships
     owner = relationship("User", back_populates="owned_projects")
     tasks = relationship("Task", back_populates="project")
     members = relationship("ProjectMember", back_populates="project")
+    
+    __table_args__ = (
+        Index("ix_projects_owner_active", "owner_id", "is_active"),
+    )
 
 class Task(Base):
     """Task model with hierarchical structure"""
@@ -93,10 +98,15 @@ class Task(Base):
     parent_task_id = Column(Integer, ForeignKey("tasks.id"))  # For subtasks
     
     # Additional hierarchy metadata
-    order_index = Column(Integer, default=0)  # For ordering within parent
+    order_index = Column(Integer, default=0, nullable=False, server_default="0")  # For ordering within parent
     is_template = Column(Boolean, default=False)  # For template tasks
     estimated_hours = Column(Integer)  # Time estimation
     
+    # Completion rollup over the whole subtree: every subtask and every action
+    # item below this task counts as one item (maintained by crud.py)
+    rollup_completed = Column(Integer, default=0, server_default="0", nullable=False)
+    rollup_total = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Dates
     due_date = Column(DateTime)
     start_date = Column(DateTime)  # For planning
@@ -110,6 +120,16 @@ class Task(Base):
     parent_task = relationship("Task", remote_side=[id], back_populates="subtasks")
     subtasks = relationship("Task", back_populates="parent_task", cascade="all, delete-orphan")
     checklists = relationship("Checklist", back_populates="task", cascade="all, delete-orphan")
+    
+    # Composite indexes matching the access paths in crud.py
+    __table_args__ = (
+        Index("ix_tasks_project_order", "project_id", "order_index", "id"),
+        Index("ix_tasks_project_parent_order", "project_id", "parent_task_id", "order_index"),
+        Index("ix_tasks_assignee_order", "assignee_id", "order_index", "id"),
+        Index("ix_tasks_parent_order", "parent_task_id", "order_index"),
+        # Covers the GROUP BY of TaskCRUD.get_project_stats
+        Index("ix_tasks_project_stats", "project_id", "status", "priority", "assignee_id", "due_date"),
+    )
 
 class Checklist(Base):
     """Checklist model - contains multiple action items"""
@@ -122,6 +142,10 @@ class Checklist(Base):
     order_index = Column(Integer, default=0)
     is_completed = Column(Boolean, default=False)
     
+    # Action item counters (maintained by crud.py)
+    items_completed = Column(Integer, default=0, server_default="0", nullable=False)
+    items_total = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Dates
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -130,6 +154,10 @@ class Checklist(Base):
     # Relationships
     task = relationship("Task", back_populates="checklists")
     action_items = relationship("ActionItem", back_populates="checklist", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_checklists_task_order", "task_id", "order_index"),
+    )
 
 class ActionItem(Base):
     """Action Item model - individual items within checklists"""
@@ -153,6 +181,11 @@ class ActionItem(Base):
     # Relationships
     checklist = relationship("Checklist", back_populates="action_items")
     assignee = relationship("User", back_populates="action_items")
+    
+    __table_args__ = (
+        Index("ix_action_items_checklist_order", "checklist_id", "order_index"),
+        Index("ix_action_items_assignee_completed", "assignee_id", "is_completed"),
+    )
 
 class ProjectMember(Base):
     """Project member association model"""
@@ -168,3 +201,73 @@ class ProjectMember(Base):
     # Relationships
     project = relationship("Project", back_populates="members")
     user = relationship("User", back_populates="project_memberships")
+    
+    __table_args__ = (
+        Index("ix_project_members_project_user_active", "project_id", "user_id", "is_active"),
+        Index("ix_project_members_user_active", "user_id", "is_active"),
+    )
+
+class ImportRun(Base):
+    """A resumable bulk import into a project"""
+    __tablename__ = "import_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    source_name = Column(String(255))
+    format = Column(String(10), nullable=False)  # ndjson, csv
+    status = Column(String(20), default="running")  # running, completed, failed
+    rows_processed = Column(Integer, default=0, nullable=False)  # input rows covered by committed chunks
+    rows_imported = Column(Integer, default=0, nullable=False)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    errors = Column(Text)  # JSON list of the first per-row errors
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class ImportIdMap(Base):
+    """External record IDs of an import run mapped to the rows created for them"""
+    __tablename__ = "import_id_map"
+    
+    run_id = Column(Integer, ForeignKey("import_runs.id", ondelete="CASCADE"), primary_key=True)
+    record_type = Column(String(20), primary_key=True)  # task, checklist, action_item
+    external_id = Column(String(100), primary_key=True)
+    internal_id = Column(Integer, nullable=False)
+    pending_parent = Column(String(100))  # external parent task ID not seen yet when the task was inserted
+    row_number = Column(Integer)
+
+class Job(Base):
+    """A background job run by the worker pool (see app.jobs)"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # handler name, e.g. task.delete
+    payload = Column(Text)  # JSON arguments for the handler
+    status = Column(String(20), default="queued", nullable=False)  # queued, running, succeeded, failed, cancelled
+    project_id = Column(Integer, ForeignKey("projects.id"))
+    created_by = Column(Integer, ForeignKey("users.id"))
+    
+    # Progress reported by the handler
+    progress_done = Column(Integer, default=0, nullable=False)
+    progress_total = Column(Integer)
+    message = Column(String(255))
+    
+    # Retries and cancellation
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # not claimed before this time
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    worker_id = Column(String(100))
+    heartbeat_at = Column(DateTime)  # running jobs without a recent heartbeat are requeued
+    
+    result = Column(Text)  # JSON returned by the handler
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after", "id"),
+        Index("ix_jobs_created_by", "created_by", "id"),
+    )
@@ -1,10 +1,11 @@
 """
 Pydantic schemas for API request/response validation
 """
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Any, Dict, Generic, Optional, List, TypeVar
 from datetime import datetime
 from enum import Enum
+import json
 
 class UserRole(str, Enum):
     ADMIN = "admin"
@@ -117,6 +118,14 @@ class TaskUpdate(BaseModel):
     estimated_hours: Optional[int] = None
     order_index: Optional[int] = None
     completed_at: Optional[datetime] = None
+    
+    @field_validator("order_index")
+    @classmethod
+    def order_index_not_null(cls, value):
+        # Omit the field to keep the position; NULL would drop out of keyset pages
+        if value is None:
+            raise ValueError("order_index cannot be null")
+        return value
 
 class TaskResponse(TaskBase):
     id: int
@@ -130,6 +139,71 @@ class TaskResponse(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskBulkItem(TaskCreate):
+    ref: Optional[str] = Field(None, max_length=100, description="Client-side key other rows can use as parent_ref")
+    parent_ref: Optional[str] = Field(None, max_length=100, description="ref of another row in the same batch")
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskBulkItem] = Field(..., min_length=1, max_length=5000)
+
+class TaskBulkRowResult(BaseModel):
+    index: int
+    ref: Optional[str] = None
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class TaskBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBulkRowResult]
+
+class TaskFilter(BaseModel):
+    project_id: Optional[int] = None
+    status: Optional[TaskStatus] = None
+    assignee_id: Optional[int] = None
+    priority: Optional[TaskPriority] = None
+    due_before: Optional[datetime] = None
+    due_after: Optional[datetime] = None
+
+class TaskBulkUpdate(BaseModel):
+    task_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[TaskFilter] = None
+    changes: TaskUpdate
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.task_ids is None) == (self.filter is None):
+            raise ValueError("Provide either task_ids or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must set at least one criterion")
+        if not self.changes.model_dump(exclude_unset=True):
+            raise ValueError("changes must set at least one field")
+        return self
+
+class TaskBulkUpdateResponse(BaseModel):
+    matched: int
+    updated: int
+    denied_ids: List[int] = []
+
+class AssigneeStats(BaseModel):
+    assignee_id: Optional[int] = None  # None for unassigned tasks
+    total: int
+    done: int
+    overdue: int
+
+class ProjectStats(BaseModel):
+    project_id: int
+    version: int
+    total: int
+    completed: int
+    overdue: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    overdue_by_status: Dict[str, int]
+    by_assignee: List[AssigneeStats]
+    computed_at: datetime
+
 # Checklist Schemas
 class ChecklistBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -248,6 +322,82 @@ class PaginatedResponse(BaseModel):
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = None
+
+PageItem = TypeVar("PageItem")
+
+class Page(BaseModel, Generic[PageItem]):
+    """Typed page of list results (see app.responses.page_response)"""
+    items: List[PageItem]
+    total: int
+    page: int
+    per_page: int
+    pages: int
+    next_cursor: Optional[str] = None
+
+# Import Schemas
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportRunResponse(BaseModel):
+    id: int
+    project_id: int
+    format: str
+    status: str
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+# Job Schemas
+class JobCreate(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    project_id: Optional[int] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def parse_result(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+# Search Schemas
+class SearchRecordType(str, Enum):
+    TASK = "task"
+    CHECKLIST = "checklist"
+    ACTION_ITEM = "action_item"
+
+class SearchResult(BaseModel):
+    type: SearchRecordType
+    id: int
+    project_id: int
+    title: str
+    snippet: Optional[str] = None
+    score: float
+
+    class Config:
+        from_attributes = True
 
 # Authentication Schemas
 class Token(BaseModel):
@@ -0,0 +1,44 @@
+"""
+Response helpers for list endpoints
+
+List handlers return page_response(...) directly instead of a response
+model instance, so FastAPI skips its own validate/jsonable_encoder pass.
+Rows are validated once with a cached TypeAdapter and the result is
+encoded with orjson.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(item_type: Type) -> TypeAdapter:
+    """Shared TypeAdapter for List[item_type]"""
+    return TypeAdapter(List[item_type])
+
+
+def serialize_rows(item_type: Type, rows: Iterable[Any]) -> List[dict]:
+    """Validate ORM rows against item_type in one pass and dump them to dicts"""
+    adapter = list_adapter(item_type)
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+
+
+def page_response(
+    item_type: Type,
+    rows: Iterable[Any],
+    total: int,
+    skip: int,
+    limit: int,
+    next_cursor: Optional[str] = None
+) -> ORJSONResponse:
+    """Build a Page[item_type] JSON response from ORM rows"""
+    return ORJSONResponse({
+        "items": serialize_rows(item_type, rows),
+        "total": total,
+        "page": skip // limit + 1,
+        "per_page": limit,
+        "pages": (total + limit - 1) // limit,
+        "next_cursor": next_cursor,
+    })
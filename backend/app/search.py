@@ -0,0 +1,175 @@
+"""
+Full-text search index for TaskManager Pro
+
+On SQLite, titles and descriptions of tasks, checklists and action items are
+indexed in an FTS5 table (search_index) that triggers keep in sync with the
+source tables. Each source row maps to the index rowid ``id * 4 + type code``,
+so trigger updates and deletes are rowid lookups. Other databases, or SQLite
+builds without FTS5, fall back to LIKE matching in SearchCRUD.
+"""
+import re
+from typing import Callable, List, Optional, Union
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+SEARCH_TABLE = "search_index"
+SEARCH_TYPES = ("task", "checklist", "action_item")
+
+# Not part of Base.metadata: create_all must not try to create the virtual table
+search_index = Table(
+    SEARCH_TABLE, MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("description", Text),
+    Column("record_type", String),
+    Column("record_id", Integer),
+    Column("project_id", Integer),
+)
+
+# bm25 weights per indexed column: a title hit counts more than a description hit
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# (record type, rowid type code, source table, project_id expression for trigger rows)
+_SOURCES = (
+    ("task", 1, "tasks", "NEW.project_id"),
+    ("checklist", 2, "checklists", "(SELECT project_id FROM tasks WHERE id = NEW.task_id)"),
+    ("action_item", 3, "action_items",
+     "(SELECT t.project_id FROM checklists c JOIN tasks t ON t.id = c.task_id WHERE c.id = NEW.checklist_id)"),
+)
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    title, description,
+    record_type UNINDEXED, record_id UNINDEXED, project_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+
+def _trigger_ddl(record_type: str, code: int, table: str, project_id: str) -> List[str]:
+    rowid = f"{{row}}.id * 4 + {code}"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, title, description, record_type, record_id, project_id)
+            VALUES ({rowid.format(row="NEW")}, NEW.title, NEW.description, '{record_type}', NEW.id, {project_id});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_au AFTER UPDATE OF title, description ON {table}
+        WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description BEGIN
+            UPDATE {SEARCH_TABLE} SET title = NEW.title, description = NEW.description
+            WHERE rowid = {rowid.format(row="NEW")};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = {rowid.format(row="OLD")};
+        END""",
+    ]
+
+
+# (record type, statement indexing all its rows)
+_REBUILD = [
+    ("task", f"""INSERT INTO {SEARCH_TABLE} (rowid, title, description, record_type, record_id, project_id)
+        SELECT id * 4 + 1, title, description, 'task', id, project_id FROM tasks"""),
+    ("checklist", f"""INSERT INTO {SEARCH_TABLE} (rowid, title, description, record_type, record_id, project_id)
+        SELECT c.id * 4 + 2, c.title, c.description, 'checklist', c.id, t.project_id
+        FROM checklists c JOIN tasks t ON t.id = c.task_id"""),
+    ("action_item", f"""INSERT INTO {SEARCH_TABLE} (rowid, title, description, record_type, record_id, project_id)
+        SELECT a.id * 4 + 3, a.title, a.description, 'action_item', a.id, t.project_id
+        FROM action_items a JOIN checklists c ON c.id = a.checklist_id JOIN tasks t ON t.id = c.task_id"""),
+]
+
+
+def fts_available(conn: Connection) -> bool:
+    """Whether the FTS5 search index exists on this connection's database.
+
+    The answer is kept on the pooled DBAPI connection, so the catalog is
+    queried once per connection.
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    if "fts_available" not in conn.info:
+        conn.info["fts_available"] = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE}
+        ).first() is not None
+    return conn.info["fts_available"]
+
+
+def create_search_index(conn: Connection) -> bool:
+    """Create the FTS5 table and its sync triggers (SQLite only).
+
+    Returns False when the database cannot host the index: not SQLite, or
+    an SQLite build without FTS5.
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    try:
+        conn.execute(text(_CREATE_TABLE))
+    except OperationalError as e:
+        if "fts5" in str(e):
+            return False
+        raise
+    for source in _SOURCES:
+        for ddl in _trigger_ddl(*source):
+            conn.execute(text(ddl))
+    conn.info.pop("fts_available", None)
+    return True
+
+
+def drop_search_triggers(conn: Connection):
+    """Stop syncing the index, e.g. during a bulk load.
+
+    create_search_index puts the triggers back; run rebuild_search_index
+    afterwards to index the rows written in between.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for _, _, table, _ in _SOURCES:
+        for suffix in ("ai", "au", "ad"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{table}_{suffix}"))
+
+
+def rebuild_search_index(conn: Union[Connection, Session],
+                         progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Repopulate the index from the source tables and return the number of indexed rows.
+
+    Record types are reindexed one at a time and progress(done, total) is
+    called after each, so a caller committing there only ever hides one
+    type from searches (pass the Session then, which outlives the commit).
+    """
+    for done, (record_type, index_rows) in enumerate(_REBUILD, 1):
+        conn.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE record_type = :record_type"), {"record_type": record_type})
+        conn.execute(text(index_rows))
+        if progress:
+            progress(done, len(_REBUILD))
+    conn.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+    return conn.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+
+
+_TERM = re.compile(r"\w+\*?")
+
+
+def search_terms(query: str) -> List[str]:
+    """Split user input into word terms; a trailing * marks a prefix term"""
+    return _TERM.findall(query)
+
+
+def fts_query(query: str, prefix_last: bool = True) -> Optional[str]:
+    """Translate user input into an FTS5 MATCH expression.
+
+    Terms are quoted so FTS5 operators in the input are matched literally and
+    all terms must match. ``term*`` is a prefix query; with prefix_last the
+    last term is one as well, for search-as-you-type. None if the input has
+    no searchable terms.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    parts = []
+    for position, term in enumerate(terms):
+        is_prefix = term.endswith("*") or (prefix_last and position == len(terms) - 1)
+        parts.append(f'"{term.rstrip("*")}"' + ("*" if is_prefix else ""))
+    return " ".join(parts)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic dataset for benchmarks
+
+Generates users, projects with members, deep task trees, checklists and
+action items from a seeded RNG. Ids are assigned up front and timestamps
+are offsets from a fixed date, so the same DatasetSpec always produces the
+same rows. Rows go in through Core executemany batches with rollup
+counters precomputed, and every user shares one password hash
+(DEFAULT_PASSWORD), so generating a dataset costs a single bcrypt call.
+
+The database must be empty (run_migrations / create_tables first). Nothing
+from app is imported until generate() runs, so callers can set
+DATABASE_URL after importing this module.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --users 50 --projects 10 --tasks-per-project 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+DEFAULT_PASSWORD = "benchmark-password"
+BASE_TIME = datetime(2025, 1, 1)
+
+STATUSES = (("todo", 35), ("in_progress", 25), ("in_review", 10), ("done", 25), ("blocked", 5))
+PRIORITIES = (("low", 25), ("medium", 45), ("high", 22), ("urgent", 8))
+WORDS = (
+    "api", "billing", "cache", "dashboard", "deploy", "docs", "export", "invoice", "login", "mobile",
+    "onboarding", "payment", "report", "search", "security", "settings", "signup", "sync", "upload", "webhook",
+)
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a generated dataset"""
+    users: int = 20
+    projects: int = 5
+    members_per_project: int = 5  # besides the owner
+    tasks_per_project: int = 500
+    depth: int = 5  # levels per task tree (1 = no subtasks)
+    fanout: int = 4  # maximum subtasks per task
+    checklist_ratio: float = 0.3  # share of tasks with a checklist
+    items_per_checklist: int = 4  # maximum action items per checklist
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    """What was generated: ids and credentials for driving the API"""
+    spec: DatasetSpec
+    password: str
+    admin_username: str
+    usernames: List[str] = field(default_factory=list)
+    user_ids: List[int] = field(default_factory=list)
+    project_ids: List[int] = field(default_factory=list)
+    project_owners: Dict[int, int] = field(default_factory=dict)  # project_id -> owner user_id
+    project_members: Dict[int, List[int]] = field(default_factory=dict)  # project_id -> member user_ids
+    root_task_ids: Dict[int, List[int]] = field(default_factory=dict)  # project_id -> top-level task ids
+    task_ids: Dict[int, List[int]] = field(default_factory=dict)  # project_id -> all task ids
+    checklist_ids: Dict[int, List[int]] = field(default_factory=dict)  # project_id -> checklist ids
+    action_item_ids: Dict[int, List[int]] = field(default_factory=dict)  # project_id -> action item ids
+    rows: Dict[str, int] = field(default_factory=dict)  # table name -> rows inserted
+
+
+def _table(weighted) -> Tuple[str, ...]:
+    """Expand (value, weight) pairs so a uniform index picks by weight"""
+    return tuple(value for value, weight in weighted for _ in range(weight))
+
+
+# Generation runs at seeding speed, so picks index these tables with
+# rng.random() instead of going through rng.choices / rng.randint
+STATUS_TABLE = _table(STATUSES)
+PRIORITY_TABLE = _table(PRIORITIES)
+
+
+def _pick(rng: random.Random, values):
+    return values[int(rng.random() * len(values))]
+
+
+def _title(rng: random.Random, kind: str, number: int) -> str:
+    return f"{kind} {number}: {_pick(rng, WORDS)} {_pick(rng, WORDS)}"
+
+
+def datetime_stamp(minutes: int) -> datetime:
+    """Timestamp minutes after BASE_TIME, as a datetime for Core inserts"""
+    return BASE_TIME + timedelta(minutes=minutes)
+
+
+class DatasetGenerator:
+    """Builds the rows of a dataset table by table.
+
+    Timestamps come from stamp(minutes after BASE_TIME), so a loader that
+    bypasses SQLAlchemy's type processing can have them generated in its
+    storage format.
+    """
+
+    def __init__(self, spec: DatasetSpec, password_hash: str, stamp: Callable[[int], Any] = datetime_stamp):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.password_hash = password_hash
+        self.stamp = stamp
+        self.base_time = stamp(0)
+        self.due_dates = tuple(stamp(days * 1440) for days in range(-30, 121))
+        self.dataset = Dataset(spec=spec, password=DEFAULT_PASSWORD, admin_username="bench_admin")
+        self.next_task_id = self.next_checklist_id = self.next_item_id = 1
+
+    def tables(self) -> Iterator[Tuple[str, List[dict]]]:
+        """(table name, rows) chunks in foreign key order, one project's tasks at a time"""
+        yield "users", self.users()
+        projects, members = self.projects()
+        yield "projects", projects
+        yield "project_members", members
+        for project_id in self.dataset.project_ids:
+            tasks, checklists, items = self.project_tasks(project_id)
+            yield "tasks", tasks
+            yield "checklists", checklists
+            yield "action_items", items
+
+    def users(self) -> List[dict]:
+        rows = []
+        for number in range(self.spec.users):
+            username = "bench_admin" if number == 0 else f"bench_user{number}"
+            rows.append({
+                "id": number + 1, "username": username, "email": f"{username}@example.com",
+                "full_name": f"Bench User {number}", "hashed_password": self.password_hash,
+                "role": "admin" if number == 0 else "developer", "is_active": True, "is_verified": True,
+                "created_at": self.base_time, "updated_at": self.base_time,
+            })
+            self.dataset.usernames.append(username)
+            self.dataset.user_ids.append(number + 1)
+        return rows
+
+    def projects(self) -> Tuple[List[dict], List[dict]]:
+        projects, members = [], []
+        user_ids = self.dataset.user_ids
+        for number in range(self.spec.projects):
+            project_id = number + 1
+            owner_id = user_ids[(number + 1) % len(user_ids)]
+            others = [user_id for user_id in user_ids if user_id != owner_id]
+            member_ids = self.rng.sample(others, min(self.spec.members_per_project, len(others)))
+            projects.append({
+                "id": project_id, "name": f"Benchmark project {number}", "description": "Synthetic benchmark data",
+                "key": f"B{number}", "owner_id": owner_id, "is_active": True, "version": 1,
+                "created_at": self.base_time, "updated_at": self.base_time,
+            })
+            for position, user_id in enumerate([owner_id] + member_ids):
+                role = "OWNER" if position == 0 else "ADMIN" if position == 1 else "MEMBER"
+                members.append({
+                    "project_id": project_id, "user_id": user_id, "role": role,
+                    "joined_at": self.base_time, "is_active": True,
+                })
+            self.dataset.project_ids.append(project_id)
+            self.dataset.project_owners[project_id] = owner_id
+            self.dataset.project_members[project_id] = [owner_id] + member_ids
+        return projects, members
+
+    def project_tasks(self, project_id: int) -> Tuple[List[dict], List[dict], List[dict]]:
+        """Task trees of one project with their checklists and action items"""
+        spec, rng = self.spec, self.rng
+        assignees = self.dataset.project_members[project_id]
+        tasks: List[dict] = []
+        checklists: List[dict] = []
+        items: List[dict] = []
+        roots: List[int] = []
+
+        def new_task(parent_id: Optional[int], depth: int, order_index: int) -> dict:
+            task_id = self.next_task_id
+            self.next_task_id += 1
+            created_at = self.stamp(task_id)
+            status = _pick(rng, STATUS_TABLE)
+            task = {
+                "id": task_id, "title": _title(rng, "Task", task_id),
+                "description": f"Synthetic task {task_id} about {_pick(rng, WORDS)}",
+                "task_type": "TASK" if parent_id is None else "SUBTASK",
+                "status": status, "priority": _pick(rng, PRIORITY_TABLE), "project_id": project_id,
+                "assignee_id": _pick(rng, assignees) if rng.random() < 0.8 else None,
+                "parent_task_id": parent_id, "order_index": order_index, "is_template": False,
+                "estimated_hours": 1 + int(rng.random() * 40),
+                "due_date": _pick(rng, self.due_dates) if rng.random() < 0.7 else None,
+                "created_at": created_at, "updated_at": created_at,
+                "completed_at": self.stamp(task_id + 1440) if status == "done" else None,
+                "rollup_completed": 0, "rollup_total": 0,
+            }
+            tasks.append(task)
+            if rng.random() < spec.checklist_ratio:
+                self._checklist(task, checklists, items, assignees)
+            return task
+
+        # Depth-first, so every task is emitted before its subtasks
+        remaining = spec.tasks_per_project
+        while remaining > 0:
+            root = new_task(None, 0, len(roots))
+            roots.append(root["id"])
+            remaining -= 1
+            stack = [(root, 0)]
+            while stack and remaining > 0:
+                parent, depth = stack.pop()
+                if depth + 1 >= spec.depth:
+                    continue
+                children = [new_task(parent["id"], depth + 1, index)
+                            for index in range(min(1 + int(rng.random() * spec.fanout), remaining))]
+                remaining -= len(children)
+                stack.extend((child, depth + 1) for child in reversed(children))
+
+        self._rollups(tasks, checklists)
+        self.dataset.root_task_ids[project_id] = roots
+        self.dataset.task_ids[project_id] = [task["id"] for task in tasks]
+        self.dataset.checklist_ids[project_id] = [checklist["id"] for checklist in checklists]
+        self.dataset.action_item_ids[project_id] = [item["id"] for item in items]
+        return tasks, checklists, items
+
+    def _checklist(self, task: dict, checklists: List[dict], items: List[dict], assignees: List[int]):
+        rng = self.rng
+        checklist_id = self.next_checklist_id
+        self.next_checklist_id += 1
+        checklist = {
+            "id": checklist_id, "title": _title(rng, "Checklist", checklist_id), "description": None,
+            "task_id": task["id"], "order_index": 0, "is_completed": False,
+            "items_completed": 0, "items_total": 0,
+            "created_at": task["created_at"], "updated_at": task["created_at"], "completed_at": None,
+        }
+        for index in range(1 + int(rng.random() * self.spec.items_per_checklist)):
+            item_id = self.next_item_id
+            self.next_item_id += 1
+            completed = rng.random() < 0.4
+            items.append({
+                "id": item_id, "title": _title(rng, "Item", item_id), "description": None,
+                "checklist_id": checklist_id, "assignee_id": _pick(rng, assignees) if rng.random() < 0.5 else None,
+                "order_index": index, "is_completed": completed, "priority": _pick(rng, PRIORITY_TABLE),
+                "due_date": None, "created_at": task["created_at"], "updated_at": task["created_at"],
+                "completed_at": task["created_at"] if completed else None,
+            })
+            checklist["items_total"] += 1
+            checklist["items_completed"] += int(completed)
+        checklist["is_completed"] = checklist["items_completed"] == checklist["items_total"]
+        checklists.append(checklist)
+
+    @staticmethod
+    def _rollups(tasks: List[dict], checklists: List[dict]):
+        """Fill rollup counters the way crud.py maintains them"""
+        by_id = {task["id"]: task for task in tasks}
+        for checklist in checklists:
+            task = by_id[checklist["task_id"]]
+            task["rollup_completed"] += checklist["items_completed"]
+            task["rollup_total"] += checklist["items_total"]
+        # Subtasks come after their parent, so walking backwards finishes children first
+        for task in reversed(tasks):
+            parent = by_id.get(task["parent_task_id"])
+            if parent is not None:
+                parent["rollup_completed"] += int(task["status"] == "done") + task["rollup_completed"]
+                parent["rollup_total"] += 1 + task["rollup_total"]
+
+
+def _batches(rows: List[dict], size: int) -> Iterator[List[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+
+
+def generate(engine: Engine, spec: DatasetSpec, password_hash: Optional[str] = None,
+             batch_size: int = 5000) -> Dataset:
+    """Insert a dataset into an empty, migrated database and describe it"""
+    # Imported here so callers can point DATABASE_URL elsewhere before app.database loads
+    from app.models.database import Base
+
+    if password_hash is None:
+        from app.auth import get_password_hash
+        password_hash = get_password_hash(DEFAULT_PASSWORD)
+
+    generator = DatasetGenerator(spec, password_hash)
+    dataset = generator.dataset
+    with engine.begin() as conn:
+        for table, rows in generator.tables():
+            # Enum columns take member names, which the generator emits
+            for batch in _batches(rows, batch_size):
+                conn.execute(insert(Base.metadata.tables[table]), batch)
+            dataset.rows[table] = dataset.rows.get(table, 0) + len(rows)
+    return dataset
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser, with_defaults: bool = True):
+    """DatasetSpec fields as command line options (None when not given and with_defaults is False)"""
+    for name, value in vars(DatasetSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value if with_defaults else None)
+
+
+def spec_from_args(args: argparse.Namespace, base: Optional[DatasetSpec] = None) -> DatasetSpec:
+    """A DatasetSpec from parsed options, taking fields not given from base"""
+    fields = vars(base or DatasetSpec())
+    return DatasetSpec(**{
+        name: default if getattr(args, name) is None else getattr(args, name) for name, default in fields.items()
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL / settings)")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import create_tables, engine
+
+    create_tables()
+    started = time.perf_counter()
+    dataset = generate(engine, spec_from_args(args))
+    elapsed = time.perf_counter() - started
+    total = sum(dataset.rows.values())
+    print(f"Inserted {total} rows in {elapsed:.2f}s ({total / elapsed:.0f} rows/s): {dataset.rows}")
+    print(f"Log in as {dataset.admin_username} (or bench_user1..) with password '{dataset.password}'")
+
+
+if __name__ == "__main__":
+    main()
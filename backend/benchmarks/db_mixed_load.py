@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write throughput benchmark for the database engine profile
+
+Compares a bare create_engine (rollback journal, default pool) against the
+engine built by app.database.build_engine (WAL, pragmas, tuned pool) on a
+scratch SQLite file.
+
+Usage (from backend/):
+    python -m benchmarks.db_mixed_load --threads 16 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import TaskCRUD
+from app.database import build_engine
+from app.migrations import run_migrations
+from app.models.database import Base, User, Project, Task
+
+PROFILES = {
+    "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+    "tuned": build_engine,
+}
+
+def seed(engine, tasks: int):
+    """Create one user, one project and a batch of tasks"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = User(username="bench", email="bench@example.com", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        project = Project(name="Bench", key="BENCH", owner_id=user.id)
+        db.add(project)
+        db.flush()
+        db.add_all(Task(title=f"Task {i}", project_id=project.id, order_index=i) for i in range(tasks))
+        db.commit()
+        return project.id
+
+def worker(Session, project_id: int, write_ratio: float, deadline: float, stats: dict, lock: threading.Lock):
+    rng = random.Random(threading.get_ident())
+    reads = writes = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            with Session() as db:
+                if rng.random() < write_ratio:
+                    db.add(Task(title="Write", project_id=project_id, order_index=rng.randint(0, 1000)))
+                    db.commit()
+                    writes += 1
+                else:
+                    TaskCRUD.query_tasks(db, project_id=project_id, skip=rng.randint(0, 500), limit=50)
+                    reads += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["errors"] += errors
+
+def run_profile(name: str, threads: int, seconds: float, write_ratio: float, tasks: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = PROFILES[name](url)
+        project_id = seed(engine, tasks)
+        Session = sessionmaker(bind=engine)
+
+        stats = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+        pool = [
+            threading.Thread(target=worker, args=(Session, project_id, write_ratio, deadline, stats, lock))
+            for _ in range(threads)
+        ]
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    stats["ops_per_sec"] = (stats["reads"] + stats["writes"]) / elapsed
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed read/write database benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--tasks", type=int, default=5000, help="tasks seeded before the run")
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append",
+                        help="profile(s) to run (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'ops/s':>10}{'reads':>10}{'writes':>10}{'locked':>10}")
+    for name in args.profile or ["default", "tuned"]:
+        stats = run_profile(name, args.threads, args.seconds, args.write_ratio, args.tasks)
+        print(f"{name:<10}{stats['ops_per_sec']:>10.0f}{stats['reads']:>10}{stats['writes']:>10}{stats['errors']:>10}")
+
+if __name__ == "__main__":
+    main()
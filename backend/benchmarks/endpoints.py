@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite
+
+Seeds a scratch database with benchmarks.datagen, then drives the API
+routers in-process through an ASGI client. Each scenario runs on its own at
+the configured concurrency and reports p50/p95/p99 latency, throughput and
+the SQL statements per request (from the X-DB-Query-Count header that
+app.instrumentation sends in debug mode). Read scenarios run before write
+scenarios so every read sees the generated data.
+
+Results can be saved as a baseline and later runs compared against it; a
+scenario regresses when its p95 grows by more than --threshold (and by
+more than --min-delta-ms, to ignore noise on fast endpoints) or when it
+issues more statements per request. The exit status is 1 when anything
+regressed, so the suite can gate CI.
+
+The SSE / WebSocket change feed streams instead of answering, so it is not
+timed here.
+
+Usage (from backend/):
+    python -m benchmarks.endpoints --requests 200 --concurrency 8 --save results.json
+    python -m benchmarks.endpoints --baseline results.json --only tasks.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import Dataset, add_spec_arguments, generate, spec_from_args
+from benchmarks.login_throughput import percentile
+
+
+class Context:
+    """Dataset, tokens and ids created along the way, shared by all scenarios"""
+
+    def __init__(self, dataset: Dataset, seed: int):
+        self.dataset = dataset
+        self.rng = random.Random(seed)
+        self.headers: Dict[int, dict] = {}  # user_id -> Authorization header
+        self.created_tasks: List[Tuple[int, int]] = []  # (project_id, task_id) from tasks.create
+        self.registered = 0
+
+    def project(self, i: int) -> int:
+        projects = self.dataset.project_ids
+        return projects[i % len(projects)]
+
+    def owner(self, project_id: int) -> dict:
+        return self.headers[self.dataset.project_owners[project_id]]
+
+    def admin(self) -> dict:
+        return self.headers[self.dataset.user_ids[0]]
+
+    def pick(self, ids: Dict[int, List[int]], project_id: int) -> int:
+        return self.rng.choice(ids[project_id])
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    headers: Optional[dict] = None
+    params: Optional[dict] = None
+    json: Optional[object] = None
+    data: Optional[dict] = None
+    content: Optional[bytes] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Context, int], Request]
+    write: bool = False
+    # bcrypt-bound scenarios run --slow-requests times instead of --requests
+    slow: bool = False
+    on_response: Optional[Callable[[Context, object], None]] = None
+
+
+def _owned(ctx: Context, i: int, method: str, path: str, **kwargs) -> Request:
+    """A request on project i's data made by the project owner"""
+    project_id = ctx.project(i)
+    return Request(method, path.format(project_id=project_id), headers=ctx.owner(project_id), **kwargs)
+
+
+def _task_request(ctx: Context, i: int, method: str, path: str, ids=None, **kwargs) -> Request:
+    project_id = ctx.project(i)
+    record_id = ctx.pick(ids or ctx.dataset.task_ids, project_id)
+    return Request(method, path.format(id=record_id), headers=ctx.owner(project_id), **kwargs)
+
+
+def _remember_task(ctx: Context, response):
+    if response.status_code == 200:
+        task = response.json()
+        ctx.created_tasks.append((task["project_id"], task["id"]))
+
+
+def _delete_created_task(ctx: Context) -> Request:
+    project_id, task_id = ctx.created_tasks.pop()
+    return Request("DELETE", f"/api/v1/tasks/{task_id}", headers=ctx.owner(project_id))
+
+
+def _import_body(i: int) -> bytes:
+    lines = [{"type": "task", "id": f"t{n}", "title": f"Imported {i}-{n}", "status": "todo"} for n in range(20)]
+    lines += [{"type": "task", "id": f"s{n}", "parent_id": f"t{n}", "title": f"Imported sub {i}-{n}"} for n in range(20)]
+    return "\n".join(json.dumps(line) for line in lines).encode()
+
+
+def _register(ctx: Context, i: int) -> Request:
+    ctx.registered += 1
+    username = f"bench_new{ctx.registered}"
+    password = ctx.dataset.password
+    return Request("POST", "/api/v1/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "full_name": username,
+        "password": password, "confirm_password": password,
+    })
+
+
+SCENARIOS: List[Scenario] = [
+    # Reads
+    Scenario("root", lambda ctx, i: Request("GET", "/")),
+    Scenario("health", lambda ctx, i: Request("GET", "/api/health")),
+    Scenario("auth.me", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/auth/me")),
+    Scenario("users.list", lambda ctx, i: Request("GET", "/api/v1/users/", headers=ctx.admin())),
+    Scenario("users.get", lambda ctx, i: Request(
+        "GET", f"/api/v1/users/{ctx.rng.choice(ctx.dataset.user_ids)}", headers=ctx.admin())),
+    Scenario("projects.list", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/")),
+    Scenario("projects.my", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/my")),
+    Scenario("projects.get", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/{project_id}")),
+    Scenario("projects.stats", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/{project_id}/stats")),
+    Scenario("projects.export", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/{project_id}/export")),
+    Scenario("projects.task_tree", lambda ctx, i: _owned(
+        ctx, i, "GET", "/api/v1/projects/{project_id}/task-tree", params={"max_depth": 2})),
+    Scenario("members.list", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/{project_id}/members")),
+    Scenario("members.user_projects", lambda ctx, i: Request(
+        "GET", f"/api/v1/users/{ctx.dataset.project_owners[ctx.project(i)]}/projects", headers=ctx.admin())),
+    Scenario("tasks.list", lambda ctx, i: _owned(
+        ctx, i, "GET", "/api/v1/tasks/", params={"project_id": ctx.project(i), "limit": 50})),
+    Scenario("tasks.list_filtered", lambda ctx, i: _owned(
+        ctx, i, "GET", "/api/v1/tasks/", params={"project_id": ctx.project(i), "status": "in_progress", "limit": 50})),
+    Scenario("tasks.my", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/tasks/my", params={"limit": 50})),
+    Scenario("tasks.get", lambda ctx, i: _task_request(ctx, i, "GET", "/api/v1/tasks/{id}")),
+    Scenario("tasks.subtasks", lambda ctx, i: _task_request(
+        ctx, i, "GET", "/api/v1/tasks/{id}/subtasks", ids=ctx.dataset.root_task_ids)),
+    Scenario("tasks.hierarchy", lambda ctx, i: _task_request(
+        ctx, i, "GET", "/api/v1/tasks/{id}/hierarchy", ids=ctx.dataset.root_task_ids)),
+    Scenario("tasks.completion", lambda ctx, i: _task_request(
+        ctx, i, "GET", "/api/v1/tasks/{id}/completion", ids=ctx.dataset.root_task_ids)),
+    Scenario("checklists.list", lambda ctx, i: _task_request(ctx, i, "GET", "/api/v1/tasks/{id}/checklists")),
+    Scenario("action_items.list", lambda ctx, i: _task_request(
+        ctx, i, "GET", "/api/v1/checklists/{id}/action-items", ids=ctx.dataset.checklist_ids)),
+    Scenario("action_items.user", lambda ctx, i: _owned(
+        ctx, i, "GET", f"/api/v1/users/{ctx.dataset.project_owners[ctx.project(i)]}/action-items")),
+    Scenario("search", lambda ctx, i: _owned(
+        ctx, i, "GET", "/api/v1/search", params={"q": ctx.rng.choice(["billing", "sear*", "deploy webhook"])})),
+    Scenario("imports.list", lambda ctx, i: _owned(ctx, i, "GET", "/api/v1/projects/{project_id}/imports")),
+    Scenario("jobs.list", lambda ctx, i: Request("GET", "/api/v1/jobs/", headers=ctx.admin())),
+    # Writes
+    Scenario("tasks.create", lambda ctx, i: _owned(ctx, i, "POST", "/api/v1/tasks/", json={
+        "title": f"Benchmark task {i}", "project_id": ctx.project(i), "priority": "high",
+    }), write=True, on_response=_remember_task),
+    Scenario("tasks.update", lambda ctx, i: _task_request(ctx, i, "PUT", "/api/v1/tasks/{id}", json={
+        "status": ctx.rng.choice(["todo", "in_progress", "done"]),
+    }), write=True),
+    Scenario("tasks.bulk_create", lambda ctx, i: _owned(ctx, i, "POST", "/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Bulk {i}-{n}", "project_id": ctx.project(i)} for n in range(20)
+    ]}), write=True),
+    Scenario("tasks.bulk_update", lambda ctx, i: _owned(ctx, i, "PATCH", "/api/v1/tasks/bulk", json={
+        "task_ids": ctx.rng.sample(ctx.dataset.task_ids[ctx.project(i)], 20), "changes": {"priority": "urgent"},
+    }), write=True),
+    Scenario("tasks.delete", lambda ctx, i: _delete_created_task(ctx), write=True),
+    Scenario("checklists.create", lambda ctx, i: _task_request(ctx, i, "POST", "/api/v1/tasks/{id}/checklists", json={
+        "title": f"Benchmark checklist {i}", "task_id": 0,
+    }), write=True),
+    Scenario("action_items.create", lambda ctx, i: _task_request(
+        ctx, i, "POST", "/api/v1/checklists/{id}/action-items", ids=ctx.dataset.checklist_ids,
+        json={"title": f"Benchmark item {i}", "checklist_id": 0}), write=True),
+    Scenario("action_items.update", lambda ctx, i: _task_request(
+        ctx, i, "PUT", "/api/v1/action-items/{id}", ids=ctx.dataset.action_item_ids,
+        json={"is_completed": ctx.rng.random() < 0.5}), write=True),
+    Scenario("projects.update", lambda ctx, i: _owned(
+        ctx, i, "PUT", "/api/v1/projects/{project_id}", json={"description": f"Updated {i}"}), write=True),
+    Scenario("imports.ndjson", lambda ctx, i: _owned(
+        ctx, i, "POST", "/api/v1/projects/{project_id}/import", content=_import_body(i)), write=True),
+    # bcrypt-bound
+    Scenario("auth.login", lambda ctx, i: Request("POST", "/api/v1/auth/login", data={
+        "username": ctx.dataset.usernames[i % len(ctx.dataset.usernames)], "password": ctx.dataset.password,
+    }), slow=True),
+    Scenario("auth.register", _register, write=True, slow=True),
+]
+
+
+async def run_scenario(client, ctx: Context, scenario: Scenario, requests: int, concurrency: int,
+                       offset: int = 0) -> dict:
+    """Send requests for one scenario and summarize them"""
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    statuses: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            request = scenario.build(ctx, offset + i)
+            started = time.perf_counter()
+            response = await client.request(
+                request.method, request.url, headers=request.headers, params=request.params,
+                json=request.json, data=request.data, content=request.content,
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if "x-db-query-count" in response.headers:
+                query_counts.append(int(response.headers["x-db-query-count"]))
+            if scenario.on_response:
+                scenario.on_response(ctx, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for code, count in statuses.items() if not code.startswith(("2", "3")))
+    return {
+        "requests": requests,
+        "errors": errors,
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "queries_avg": round(statistics.fmean(query_counts), 2) if query_counts else None,
+        "queries_max": max(query_counts) if query_counts else None,
+    }
+
+
+async def run(args, dataset: Dataset) -> dict:
+    import httpx
+    from app.database import async_engine
+    from main import app
+
+    selected = [scenario for scenario in SCENARIOS
+                if not args.only or any(scenario.name.startswith(prefix) for prefix in args.only)]
+    if args.reads_only:
+        selected = [scenario for scenario in selected if not scenario.write]
+
+    ctx = Context(dataset, args.seed)
+    results = {}
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        for user_id, username in zip(dataset.user_ids, dataset.usernames):
+            response = await client.post("/api/v1/auth/login", data={"username": username, "password": dataset.password})
+            response.raise_for_status()
+            ctx.headers[user_id] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for scenario in selected:
+            requests = args.slow_requests if scenario.slow else args.requests
+            if args.warmup and not scenario.write:
+                await run_scenario(client, ctx, scenario, args.warmup, args.concurrency, offset=requests)
+            if scenario.name == "tasks.delete":
+                # Deletes consume the tasks created by tasks.create
+                requests = min(requests, len(ctx.created_tasks))
+                if not requests:
+                    print(f"{scenario.name:<24} skipped (run tasks.create first)")
+                    continue
+            results[scenario.name] = await run_scenario(client, ctx, scenario, requests, args.concurrency)
+            print(_format_row(scenario.name, results[scenario.name]), flush=True)
+
+    await async_engine.dispose()
+    return results
+
+
+def _format_row(name: str, result: dict) -> str:
+    queries = "-" if result["queries_avg"] is None else f"{result['queries_avg']:.1f}"
+    return (f"{name:<24} {result['requests']:>6} {result['errors']:>5} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f} {queries:>8}")
+
+
+HEADER = f"{'scenario':<24} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8}"
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """Regressions of results against a baseline, one line each"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        p95, old_p95 = result["p95_ms"], before["p95_ms"]
+        if p95 > old_p95 * (1 + threshold) and p95 - old_p95 > min_delta_ms:
+            regressions.append(f"{name}: p95 {old_p95:.2f}ms -> {p95:.2f}ms (+{(p95 / old_p95 - 1) * 100:.0f}%)")
+        queries, old_queries = result["queries_avg"], before.get("queries_avg")
+        if queries is not None and old_queries is not None and queries > old_queries + 0.5:
+            regressions.append(f"{name}: queries per request {old_queries:.1f} -> {queries:.1f}")
+        if result["errors"] > before.get("errors", 0):
+            regressions.append(f"{name}: errors {before.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Endpoint latency, throughput and query count benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--slow-requests", type=int, default=20, help="requests per bcrypt-bound scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests before each read scenario")
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes to run (e.g. tasks. search)")
+    parser.add_argument("--reads-only", action="store_true")
+    parser.add_argument("--save", help="write results to this JSON file (usable as a baseline)")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 growth")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 growth below this")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    # A scratch database unless one is configured explicitly; debug mode makes
+    # the query stats middleware send X-DB-Query-Count
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp.name, 'bench.db')}")
+    os.environ["DEBUG"] = "true"
+    os.environ["QUERY_STATS_ENABLED"] = "true"
+    os.environ.setdefault("JOBS_INPROCESS_WORKERS", "0")
+
+    from app.database import create_tables, engine
+
+    create_tables()
+    started = time.perf_counter()
+    dataset = generate(engine, spec)
+    print(f"Seeded {sum(dataset.rows.values())} rows in {time.perf_counter() - started:.1f}s: {dataset.rows}")
+    print(HEADER)
+    results = asyncio.run(run(args, dataset))
+    tmp.cleanup()
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "dataset": asdict(spec),
+        },
+        "scenarios": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("dataset") != report["meta"]["dataset"]:
+            print("Warning: the baseline was recorded with a different dataset")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+
+Fires concurrent POST /api/v1/auth/login requests at the app in-process and,
+at the same time, pings GET / to show whether bcrypt stalls the event loop.
+
+Usage (from backend/):
+    python -m benchmarks.login_throughput --users 20 --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run(args):
+    import httpx
+    from app.database import create_tables, async_engine
+    from main import app
+
+    create_tables()
+    password = "benchmark-password"
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for i in range(args.users):
+            await client.post("/api/v1/auth/register", json={
+                "username": f"bench{i}", "email": f"bench{i}@example.com", "full_name": f"Bench {i}",
+                "password": password, "confirm_password": password,
+            })
+
+        login_latencies, ping_latencies, statuses = [], [], {}
+        semaphore = asyncio.Semaphore(args.concurrency)
+        done = asyncio.Event()
+
+        async def login(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/auth/login", data={
+                    "username": f"bench{i % args.users}", "password": password,
+                })
+                login_latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def ping():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                ping_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        pinger = asyncio.create_task(ping())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await pinger
+
+    await async_engine.dispose()
+
+    print(f"logins:        {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s)")
+    print(f"status codes:  {statuses}")
+    print(f"login latency: p50={percentile(login_latencies, 50) * 1000:.0f}ms "
+          f"p99={percentile(login_latencies, 99) * 1000:.0f}ms")
+    print(f"ping latency:  p50={percentile(ping_latencies, 50) * 1000:.1f}ms "
+          f"p99={percentile(ping_latencies, 99) * 1000:.1f}ms "
+          f"max={max(ping_latencies, default=0) * 1000:.1f}ms "
+          f"(mean {statistics.fmean(ping_latencies) * 1000 if ping_latencies else 0:.1f}ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    # Use a scratch database unless one is configured explicitly
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp.name, 'bench.db')}")
+    asyncio.run(run(args))
+    tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
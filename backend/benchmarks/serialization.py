@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+List serialization microbenchmark
+
+Compares the old list path (from_orm().dict() per row, PaginatedResponse,
+then FastAPI's response_model validation, jsonable_encoder and json.dumps)
+with app.responses.page_response (one TypeAdapter validation plus orjson).
+Rows are transient ORM objects, so no database is involved.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.database import Task, TaskType
+from app.models.schemas import PaginatedResponse, TaskResponse
+from app.responses import page_response
+
+def make_tasks(count: int):
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        Task(
+            id=i, title=f"Task {i}", description="Benchmark task " * 4, task_type=TaskType.TASK,
+            status="todo", priority="medium", project_id=1, assignee_id=1, parent_task_id=None,
+            order_index=i, estimated_hours=3, due_date=now + timedelta(days=i % 30),
+            start_date=now, completed_at=None, created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+# The old path used the deprecated from_orm()/dict() helpers
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+async def old_path(field, tasks, limit: int) -> bytes:
+    content = PaginatedResponse(
+        items=[TaskResponse.from_orm(task).dict() for task in tasks],
+        total=len(tasks), page=1, per_page=limit, pages=1
+    )
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+async def new_path(field, tasks, limit: int) -> bytes:
+    return page_response(TaskResponse, tasks, len(tasks), 0, limit).body
+
+async def measure(path, field, tasks, limit: int, repeat: int) -> float:
+    await path(field, tasks, limit)  # warm up adapters and caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await path(field, tasks, limit)
+    return len(tasks) * repeat / (time.perf_counter() - started)
+
+async def run(args):
+    tasks = make_tasks(args.rows)
+    field = create_response_field(name="response", type_=PaginatedResponse)
+    old = await measure(old_path, field, tasks, args.rows, args.repeat)
+    new = await measure(new_path, field, tasks, args.rows, args.repeat)
+    print(f"{'path':<16}{'rows/s':>12}")
+    print(f"{'before':<16}{old:>12.0f}")
+    print(f"{'page_response':<16}{new:>12.0f}")
+    print(f"speedup: {new / old:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="List serialization microbenchmark")
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages serialized per path")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
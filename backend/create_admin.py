@@ -6,21 +6,15 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from app.models.database import User, Base
+from app.models.database import User
 from app.auth import get_password_hash
-from app.database import DATABASE_URL
+from app.database import SessionLocal, create_tables
 
 def create_admin_user():
     """Cria o usuário administrador padrão"""
     
-    # Criar engine e sessão
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Criar tabelas se não existirem
-    Base.metadata.create_all(bind=engine)
+    # Criar tabelas se não existirem e aplicar migrações
+    create_tables()
     
     db = SessionLocal()
     
@@ -69,8 +63,6 @@ def create_admin_user():
 def create_test_users():
     """Cria alguns usuários de teste"""
     
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
     
     test_users = [
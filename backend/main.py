@@ -2,14 +2,20 @@
 TaskManager Pro - Main Application Entry Point
 """
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 from datetime import datetime
 
 from app.config import settings
-from app.database import create_tables
-from app.api import auth, users, projects, tasks, project_members, hierarchy
+from app.database import create_tables, async_engine, ping_database
+from app.cache import cache_status, close_cache, principal_cache, project_stats_cache, role_cache
+from app.events import event_broker
+from app.jobs import JobWorker
+from app.instrumentation import QueryStatsMiddleware
+from app import metrics
+from app.api import auth, users, projects, tasks, project_members, hierarchy, imports, search, events, jobs
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -20,26 +26,53 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+# Background job threads started with the API (see app.jobs)
+job_worker = JobWorker(settings.jobs_inprocess_workers)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins for development
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count", "X-DB-Query-Count", "X-DB-Time-ms", "X-DB-Repeated-Queries"],
 )
 
+# Count SQL statements per request and flag likely N+1 loops
+if settings.query_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Request latency, in-flight and status code metrics (added last: outermost)
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include API routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(projects.router, prefix="/api/v1")
 app.include_router(tasks.router, prefix="/api/v1")
 app.include_router(project_members.router, prefix="/api/v1")
+app.include_router(imports.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
+app.include_router(events.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(hierarchy.router)  # routes already carry the /api/v1 prefix
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
+    """Initialize database tables and start the in-process job workers"""
     create_tables()
+    if job_worker.concurrency > 0:
+        job_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers, close the event feed, cache and pooled async database connections"""
+    job_worker.stop()
+    event_broker.close()
+    await close_cache()
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
@@ -54,16 +87,38 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
+    """Health check endpoint (503 when the database does not answer)"""
+    cache = await run_in_threadpool(cache_status)
+    try:
+        latency = await ping_database(settings.health_db_timeout_seconds)
+        database = {"status": "online", "latency_ms": round(latency * 1000, 2)}
+    except Exception as e:
+        database = {"status": "offline", "error": f"{type(e).__name__}: {e}"[:200]}
+    healthy = database["status"] == "online"
+    body = {
+        "status": "healthy" if healthy else "unhealthy",
         "timestamp": datetime.now().isoformat(),
         "services": {
             "api": "online",
-            "database": "pending",  # Will be updated when DB is configured
-            "cache": "pending"
+            "database": database["status"],
+            "cache": cache["status"]
+        },
+        "database": database,
+        "cache": cache,
+        "events": event_broker.stats(),
+        "caches": {
+            "principal": principal_cache.stats(),
+            "project_roles": role_cache.stats(),
+            "project_stats": project_stats_cache.stats()
         }
     }
+    return JSONResponse(body, status_code=200 if healthy else 503)
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Process metrics in the Prometheus text format"""
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/api/v1/info")
 async def api_info():
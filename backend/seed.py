@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Bulk seeding for staging and load-test databases
+
+Fills an empty database with synthetic organisations (users, projects with
+members, deep task trees, checklists and action items) from
+benchmarks.datagen, then creates the default admin like create_admin.py.
+Loading bypasses the API and the ORM:
+
+- rows go in through executemany batches inside large transactions
+- every generated user shares one precomputed password hash
+- on SQLite, rows are bound as tuples with timestamps pre-formatted in
+  SQLAlchemy's storage format, and --fast relaxes durability pragmas
+  (synchronous=OFF, in-memory journal) for the duration of the load
+- secondary indexes and the search index triggers are dropped before the
+  load and rebuilt once afterwards, followed by ANALYZE
+
+A crash during a --fast load can leave the database corrupt; only seed
+databases you can recreate.
+
+Usage (from backend/):
+    python seed.py --preset medium
+    python seed.py --preset large --projects 1000 --no-fast
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from operator import itemgetter
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.datagen import (
+    BASE_TIME, DEFAULT_PASSWORD, Dataset, DatasetGenerator, DatasetSpec,
+    add_spec_arguments, datetime_stamp, spec_from_args
+)
+
+# Organisation sizes: tasks = projects * tasks_per_project, plus roughly
+# 0.3 checklists and 0.75 action items per task
+PRESETS: Dict[str, DatasetSpec] = {
+    "small": DatasetSpec(users=50, projects=10, members_per_project=8, tasks_per_project=1000),
+    "medium": DatasetSpec(users=500, projects=100, members_per_project=12, tasks_per_project=5000),
+    "large": DatasetSpec(users=2000, projects=400, members_per_project=15, tasks_per_project=5000),
+}
+
+# Tables whose secondary indexes are dropped during the load
+LOAD_TABLES = ("project_members", "tasks", "checklists", "action_items")
+
+FAST_PRAGMAS = {"synchronous": "OFF", "journal_mode": "MEMORY", "temp_store": "MEMORY", "cache_size": "-1048576"}
+
+
+class SQLiteStamps:
+    """Timestamps as SQLAlchemy stores DateTime on SQLite, without per-row datetime arithmetic"""
+
+    def __init__(self):
+        self._days: Dict[int, str] = {}
+
+    def __call__(self, minutes: int) -> str:
+        day, minute = divmod(minutes, 1440)
+        prefix = self._days.get(day)
+        if prefix is None:
+            prefix = self._days[day] = (BASE_TIME + timedelta(days=day)).strftime("%Y-%m-%d")
+        return f"{prefix} {minute // 60:02d}:{minute % 60:02d}:00.000000"
+
+
+class Loader:
+    """Writes generated rows to one connection and keeps count"""
+
+    def __init__(self, conn, batch_size: int, commit_rows: int):
+        self.conn = conn
+        self.sqlite = conn.dialect.name == "sqlite"
+        self.batch_size = batch_size
+        self.commit_rows = commit_rows
+        self.rows: Dict[str, int] = {}
+        self._pending = 0
+        self._statements: Dict[str, Tuple[str, Callable]] = {}
+
+    def _statement(self, table: str, columns: List[str]) -> Tuple[str, Callable]:
+        if table not in self._statements:
+            names = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join("?" for _ in columns)
+            self._statements[table] = (f'INSERT INTO "{table}" ({names}) VALUES ({placeholders})', itemgetter(*columns))
+        return self._statements[table]
+
+    def insert(self, table: str, rows: List[dict]):
+        from sqlalchemy import insert
+        from app.models.database import Base
+
+        if not rows:
+            return
+        if self.sqlite:
+            # Positional tuples bind about twice as fast as named parameters
+            sql, as_tuple = self._statement(table, list(rows[0]))
+            for start in range(0, len(rows), self.batch_size):
+                self.conn.exec_driver_sql(sql, list(map(as_tuple, rows[start:start + self.batch_size])))
+        else:
+            for start in range(0, len(rows), self.batch_size):
+                self.conn.execute(insert(Base.metadata.tables[table]), rows[start:start + self.batch_size])
+        self.rows[table] = self.rows.get(table, 0) + len(rows)
+        self._pending += len(rows)
+        if self._pending >= self.commit_rows:
+            self.conn.commit()
+            self._pending = 0
+
+
+def _secondary_indexes(table: str):
+    from app.models.database import Base
+    return [index for index in Base.metadata.tables[table].indexes if not index.unique]
+
+
+def _set_pragmas(conn, pragmas: Dict[str, str]):
+    for name, value in pragmas.items():
+        conn.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+
+def _reset_sequences(conn, tables):
+    """Move PostgreSQL id sequences past the explicit ids the generator wrote"""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        )
+
+
+def seed(engine, spec: DatasetSpec, fast: bool = True, drop_indexes: bool = True,
+         batch_size: int = 10000, commit_rows: int = 500000,
+         log: Callable[[str], None] = print) -> Tuple[Dataset, Dict[str, float]]:
+    """Load a generated dataset into an empty, migrated database.
+
+    Returns the dataset description and the seconds spent per phase.
+    """
+    from sqlalchemy import func, select
+    from app.auth import get_password_hash
+    from app.config import settings
+    from app.migrations import create_indexes
+    from app.models.database import User
+    from app.search import create_search_index, drop_search_triggers, rebuild_search_index
+
+    timings: Dict[str, float] = {}
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(User)).scalar()
+        if existing:
+            raise RuntimeError(f"Seed into an empty database (found {existing} users)")
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite and fast:
+            conn.commit()  # journal_mode cannot change inside a transaction
+            _set_pragmas(conn, FAST_PRAGMAS)
+
+        if drop_indexes:
+            for table in LOAD_TABLES:
+                for index in _secondary_indexes(table):
+                    index.drop(bind=conn, checkfirst=True)
+        drop_search_triggers(conn)
+        conn.commit()
+
+        started = time.perf_counter()
+        # One bcrypt call for every generated user
+        generator = DatasetGenerator(spec, get_password_hash(DEFAULT_PASSWORD),
+                                     stamp=SQLiteStamps() if sqlite else datetime_stamp)
+        loader = Loader(conn, batch_size, commit_rows)
+        for table, rows in generator.tables():
+            loader.insert(table, rows)
+            if table == "action_items":
+                log(f"  {loader.rows.get('tasks', 0)} tasks loaded")
+        _reset_sequences(conn, ("users", "projects", "project_members", "tasks", "checklists", "action_items"))
+        conn.commit()
+        generator.dataset.rows = loader.rows
+        timings["load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for table in LOAD_TABLES:
+            create_indexes(conn, table)
+        conn.commit()
+        timings["indexes"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if create_search_index(conn):
+            rebuild_search_index(conn)
+        conn.commit()
+        timings["search_index"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if sqlite:
+            conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+        timings["analyze"] = time.perf_counter() - started
+
+        if sqlite and fast:
+            _set_pragmas(conn, {
+                "journal_mode": settings.sqlite_journal_mode,
+                "synchronous": settings.sqlite_synchronous,
+                "temp_store": "DEFAULT",
+                "cache_size": f"-{int(settings.sqlite_cache_size_kb)}",
+            })
+    return generator.dataset, timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed an empty database with synthetic organisations")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small",
+                        help="dataset size; the options below override single fields")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL / settings)")
+    parser.add_argument("--no-fast", dest="fast", action="store_false",
+                        help="keep the configured SQLite durability pragmas during the load")
+    parser.add_argument("--keep-indexes", dest="drop_indexes", action="store_false",
+                        help="maintain indexes row by row instead of rebuilding them afterwards")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per executemany call")
+    parser.add_argument("--commit-rows", type=int, default=500000, help="rows per transaction")
+    parser.add_argument("--no-admin", dest="admin", action="store_false",
+                        help="do not create the default admin (see create_admin.py)")
+    add_spec_arguments(parser, with_defaults=False)
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import create_tables, engine
+
+    spec = spec_from_args(args, PRESETS[args.preset])
+    create_tables()
+    print(f"Seeding {spec.projects} projects x {spec.tasks_per_project} tasks for {spec.users} users")
+    started = time.perf_counter()
+    try:
+        dataset, timings = seed(engine, spec, fast=args.fast, drop_indexes=args.drop_indexes,
+                                batch_size=args.batch_size, commit_rows=args.commit_rows)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    total = sum(dataset.rows.values())
+    print(f"Loaded {total} rows: {dataset.rows}")
+    print("  " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in timings.items()))
+    print(f"  {total / timings['load']:.0f} rows/s loading, {total / elapsed:.0f} rows/s including index rebuilds")
+    print(f"Users log in as bench_admin, bench_user1.. with password '{dataset.password}'")
+
+    if args.admin:
+        from create_admin import create_admin_user
+        create_admin_user()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Shared test fixtures: a scratch SQLite database and an API client
+
+app.database builds its engines when it is imported, so the environment is
+pointed at a temporary database before anything from app is imported.
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="taskmanager-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATA_DIR}/test.db"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["EVENTS_BACKEND"] = "memory"
+os.environ["JOBS_INPROCESS_WORKERS"] = "0"
+os.environ["IMPORT_UPLOAD_DIR"] = f"{_DATA_DIR}/uploads"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import principal_cache, project_stats_cache, role_cache
+
+PASSWORD = "password123"
+
+_usernames = (f"user{n}" for n in itertools.count(1))
+_project_keys = (f"P{n}" for n in itertools.count(1))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client; startup creates the tables and shutdown disposes the pools"""
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register and log in a new user, returning (auth headers, user id)"""
+    def make(role=None):
+        username = next(_usernames)
+        payload = {
+            "username": username, "email": f"{username}@example.com", "full_name": username.title(),
+            "password": PASSWORD, "confirm_password": PASSWORD,
+        }
+        if role:
+            payload["role"] = role
+        response = client.post("/api/v1/auth/register", json=payload)
+        assert response.status_code == 200, response.text
+        token = client.post(
+            "/api/v1/auth/login", data={"username": username, "password": PASSWORD}
+        ).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}, response.json()["data"]["user_id"]
+    return make
+
+
+@pytest.fixture
+def make_project(client):
+    """Create a project owned by the user behind headers and return its id"""
+    def make(headers):
+        key = next(_project_keys)
+        response = client.post("/api/v1/projects/", json={"name": f"Project {key}", "key": key}, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return make
+
+
+@pytest.fixture
+def cold_caches():
+    """Empty the in-process caches so a request pays for every lookup"""
+    def clear():
+        for cache in (principal_cache, role_cache, project_stats_cache):
+            cache.clear()
+    return clear
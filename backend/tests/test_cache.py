@@ -0,0 +1,238 @@
+"""
+Redis cache backend against a local fake Redis-protocol server
+
+FakeRedis speaks just enough RESP2 for RedisBackend: PING, GET, MGET,
+SET with PX, DEL, SCAN and INFO, with keys expiring on their PX deadline.
+"""
+import asyncio
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app import cache as cache_module
+from app.cache import CacheNamespace, MemoryBackend, RedisBackend
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RedisHandler)
+        self.data = {}  # key -> (value, expires_at or None)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connections = set()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return "redis://%s:%d/0" % self.server_address
+
+    def stop(self):
+        """Stop listening and drop open connections, like a crashed server"""
+        self.shutdown()
+        self.server_close()
+        for connection in list(self.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def lookup(self, key: bytes):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections.add(self.request)
+        while True:
+            try:
+                command = self._read_command()
+            except (OSError, ValueError):
+                command = None
+            if command is None:
+                return
+            with self.server.lock:
+                reply = self._execute(command[0].upper(), command[1:])
+            self.wfile.write(reply)
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _execute(self, name: bytes, args: list) -> bytes:
+        server = self.server
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"GET":
+            return _bulk(server.lookup(args[0]))
+        if name == b"MGET":
+            return _array([server.lookup(key) for key in args])
+        if name == b"SET":
+            expires_at = None
+            if len(args) > 3 and args[2].upper() == b"PX":
+                expires_at = time.monotonic() + int(args[3]) / 1000
+            server.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            removed = sum(server.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if name == b"SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [key for key in server.data if fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b"*2\r\n" + _bulk(b"0") + _array(keys)
+        if name == b"INFO":
+            section = args[0].lower() if args else b""
+            if section == b"memory":
+                return _bulk(b"# Memory\r\nused_memory_human:1.00K\r\n")
+            return _bulk(b"# Stats\r\nkeyspace_hits:%d\r\nkeyspace_misses:%d\r\n" % (server.hits, server.misses))
+        return b"-ERR unknown command '%s'\r\n" % name
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(values) -> bytes:
+    return b"*%d\r\n" % len(values) + b"".join(_bulk(value) for value in values)
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedis()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def namespace(redis_server):
+    return CacheNamespace("test", ttl_seconds=60, backend=RedisBackend(redis_server.url))
+
+
+def test_get_and_set(namespace):
+    assert namespace.get("alice", default="missing") == "missing"
+    namespace.set("alice", {"id": 1, "roles": ["admin"]})
+    assert namespace.get("alice") == {"id": 1, "roles": ["admin"]}
+    assert namespace.stats()["hits"] == 1
+    assert namespace.stats()["misses"] == 1
+
+
+def test_bulk_get_and_set(namespace):
+    namespace.set_many({1: "one", 2: "two"})
+    assert namespace.get_many([1, 2, 3]) == {1: "one", 2: "two"}
+    namespace.invalidate_many([1])
+    assert namespace.get_many([1, 2]) == {2: "two"}
+
+
+def test_ttl_expiry(namespace):
+    namespace.set("short", "value", ttl_seconds=0.05)
+    namespace.set("long", "value")
+    time.sleep(0.1)
+    assert namespace.get("short") is None
+    assert namespace.get("long") == "value"
+
+
+def test_versioned_invalidation(namespace):
+    namespace.set(7, {"total": 3}, version=1)
+    assert namespace.get(7, version=1) == {"total": 3}
+    # Bumping the version retires the old entry without deleting it
+    assert namespace.get(7, version=2) is None
+    namespace.invalidate(7, version=1)
+    assert namespace.get(7, version=1) is None
+
+
+def test_clear_only_touches_the_namespace(redis_server, namespace):
+    other = CacheNamespace("other", ttl_seconds=60, backend=namespace.backend)
+    namespace.set("a", 1)
+    other.set("a", 2)
+    namespace.clear()
+    assert namespace.get("a") is None
+    assert other.get("a") == 2
+
+
+def test_backend_failure_is_a_miss(redis_server, namespace):
+    namespace.set("alice", "cached")
+    redis_server.stop()
+
+    assert namespace.get("alice", default="fallback") == "fallback"
+    namespace.set("bob", "ignored")  # must not raise
+    assert namespace.backend.errors >= 1
+    assert namespace.backend.status()["status"] == "offline"
+
+
+def test_async_accessors(namespace):
+    async def scenario():
+        await namespace.set_async("alice", "cached")
+        assert await namespace.get_async("alice") == "cached"
+        assert await namespace.get_many_async(["alice", "bob"]) == {"alice": "cached"}
+        await namespace.invalidate_async("alice")
+        assert await namespace.get_async("alice") is None
+        await namespace.backend.close()
+    asyncio.run(scenario())
+
+
+def test_sync_accessors_inside_run_sync(namespace):
+    """CRUD code run through AsyncSession.run_sync awaits Redis on the loop"""
+    async def scenario():
+        await greenlet_spawn(namespace.set, "alice", "cached")
+        assert await greenlet_spawn(namespace.get, "alice") == "cached"
+        assert namespace.backend._async_clients  # went through the asyncio client
+        await namespace.backend.close()
+    asyncio.run(scenario())
+
+
+def test_health_reports_cache(client, redis_server, monkeypatch):
+    backend = RedisBackend(redis_server.url)
+    for name in ("principal_cache", "role_cache", "project_stats_cache"):
+        monkeypatch.setattr(getattr(cache_module, name), "backend", backend)
+        monkeypatch.setattr(getattr(cache_module, name), "hits", 0)
+        monkeypatch.setattr(getattr(cache_module, name), "misses", 0)
+
+    cache_module.role_cache.set((1, 1), "OWNER")
+    cache_module.role_cache.get((1, 1))
+    cache_module.role_cache.get((1, 2))
+
+    body = client.get("/api/health").json()
+    assert body["services"]["cache"] == "online"
+    assert body["cache"]["backend"] == "redis"
+    assert body["cache"]["server_hit_ratio"] == 0.5
+    assert body["caches"]["project_roles"]["backend"] == "redis"
+    assert body["caches"]["project_roles"]["hit_ratio"] == 0.5
+
+
+def test_memory_ttl_caps_only_the_memory_backend(namespace):
+    """Invalidations on the memory backend stay in one worker, so auth caches expire sooner"""
+    memory = CacheNamespace("auth", ttl_seconds=60, backend=MemoryBackend(10), memory_ttl_seconds=0.05)
+    memory.set("alice", "cached")
+    time.sleep(0.1)
+    assert memory.get("alice") is None
+
+    shared = CacheNamespace("auth", ttl_seconds=60, backend=namespace.backend, memory_ttl_seconds=0.05)
+    assert shared.ttl_seconds == 60
+
+    for cache in (cache_module.principal_cache, cache_module.role_cache):
+        assert cache.ttl_seconds <= cache_module.settings.auth_cache_memory_ttl_seconds
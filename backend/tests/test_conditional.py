@@ -0,0 +1,77 @@
+"""
+ETag revalidation of project, task and tree reads via the project version
+"""
+from app.crud import ProjectCRUD
+from app.database import SessionLocal
+
+
+def project_version(project_id: int) -> int:
+    with SessionLocal() as db:
+        return ProjectCRUD.get_project_version(db, project_id)
+
+
+def revalidate(client, headers, url: str, etag: str):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_unchanged_reads_answer_304(client, make_user, make_project):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    client.post(f"/api/v1/projects/{project_id}/members", json={"user_id": user_id, "role": "OWNER"}, headers=headers)
+    task_id = client.post("/api/v1/tasks/", json={"title": "Tagged", "project_id": project_id},
+                          headers=headers).json()["id"]
+
+    for url in (f"/api/v1/projects/{project_id}", f"/api/v1/tasks/{task_id}",
+                f"/api/v1/tasks/{task_id}/hierarchy", f"/api/v1/projects/{project_id}/task-tree"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        etag = response.headers["ETag"]
+
+        response = revalidate(client, headers, url, etag)
+        assert response.status_code == 304, url
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert revalidate(client, headers, url, f'"stale", {etag}').status_code == 304
+        assert revalidate(client, headers, url, "*").status_code == 304
+        assert revalidate(client, headers, url, '"stale"').status_code == 200
+
+
+def test_writes_bump_the_version_and_the_etag(client, make_user, make_project):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    other_project_id = make_project(headers)
+    client.post(f"/api/v1/projects/{project_id}/members", json={"user_id": user_id, "role": "OWNER"}, headers=headers)
+    task_id = client.post("/api/v1/tasks/", json={"title": "Tagged", "project_id": project_id},
+                          headers=headers).json()["id"]
+    tree_url = f"/api/v1/projects/{project_id}/task-tree"
+
+    def write_changes_etag(write) -> None:
+        version = project_version(project_id)
+        etag = client.get(tree_url, headers=headers).headers["ETag"]
+        response = write()
+        assert response.status_code == 200, response.text
+        assert project_version(project_id) == version + 1
+        response = revalidate(client, headers, tree_url, etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    write_changes_etag(lambda: client.put(f"/api/v1/tasks/{task_id}", json={"title": "Renamed"}, headers=headers))
+    checklist = {}
+
+    def create_checklist():
+        response = client.post(f"/api/v1/tasks/{task_id}/checklists", json={"title": "Steps", "task_id": task_id},
+                               headers=headers)
+        checklist.update(response.json())
+        return response
+    write_changes_etag(create_checklist)
+    write_changes_etag(lambda: client.post(f"/api/v1/checklists/{checklist['id']}/action-items", json={
+        "title": "Step", "checklist_id": checklist["id"]
+    }, headers=headers))
+    write_changes_etag(lambda: client.patch("/api/v1/tasks/bulk", json={
+        "task_ids": [task_id], "changes": {"status": "done"}
+    }, headers=headers))
+
+    # Writes to another project leave this one's tags valid
+    etag = client.get(tree_url, headers=headers).headers["ETag"]
+    client.post("/api/v1/tasks/", json={"title": "Elsewhere", "project_id": other_project_id}, headers=headers)
+    assert revalidate(client, headers, tree_url, etag).status_code == 304
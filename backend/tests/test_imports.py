@@ -0,0 +1,97 @@
+"""
+Imports run as background jobs: the upload is written to disk and queued
+"""
+import json
+import os
+
+from app.config import settings
+from app.jobs import JobWorker
+
+ROWS = [
+    {"type": "task", "id": "t1", "title": "Parent"},
+    {"type": "task", "id": "t2", "parent_task_id": "t1", "title": "Child"},
+    {"type": "checklist", "id": "c1", "task_id": "t2", "title": "Checklist"},
+    {"type": "action_item", "checklist_id": "c1", "title": "Item"},
+    {"type": "checklist", "title": "Orphan"},
+]
+
+
+def ndjson(rows) -> bytes:
+    return b"".join(json.dumps(row).encode() + b"\n" for row in rows)
+
+
+def test_import_runs_as_job(client, make_user, make_project):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+
+    response = client.post(f"/api/v1/projects/{project_id}/import", content=ndjson(ROWS), headers=headers)
+    assert response.status_code == 202, response.text
+    status_url = response.json()["data"]["status_url"]
+    assert response.headers["Location"] == status_url
+    assert client.get(status_url, headers=headers).json()["status"] == "queued"
+    assert os.listdir(settings.import_upload_dir)
+
+    assert JobWorker().run_next()
+    job = client.get(status_url, headers=headers).json()
+    assert job["status"] == "succeeded", job["error"]
+    assert job["progress_done"] == len(ROWS)
+    assert job["result"]["rows_imported"] == 4
+    assert job["result"]["errors"] == [{"row": 5, "error": "Missing task_id"}]
+    assert not os.listdir(settings.import_upload_dir)
+
+    runs = client.get(f"/api/v1/projects/{project_id}/imports", headers=headers).json()
+    assert [run["id"] for run in runs] == [job["result"]["id"]]
+
+
+def test_cancelled_import_discards_upload(client, make_user, make_project):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+
+    job_id = client.post(
+        f"/api/v1/projects/{project_id}/import", content=ndjson(ROWS), headers=headers
+    ).json()["data"]["job_id"]
+    response = client.post(f"/api/v1/jobs/{job_id}/cancel", headers=headers)
+    assert response.json()["status"] == "cancelled"
+    assert not os.listdir(settings.import_upload_dir)
+
+
+def test_resume_of_unknown_run_is_rejected(client, make_user, make_project):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+
+    response = client.post(
+        f"/api/v1/projects/{project_id}/import", params={"resume_run_id": 999}, content=ndjson(ROWS), headers=headers
+    )
+    assert response.status_code == 404
+
+
+def test_parent_cycles_are_not_linked(client, make_user, make_project):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+    rows = [
+        {"type": "task", "id": "self", "parent_task_id": "self", "title": "Own parent"},
+        {"type": "task", "id": "a", "parent_task_id": "b", "title": "A"},
+        {"type": "task", "id": "b", "parent_task_id": "a", "title": "B"},
+        {"type": "task", "id": "x", "parent_task_id": "z", "title": "X"},
+        {"type": "task", "id": "y", "parent_task_id": "x", "title": "Y"},
+        {"type": "task", "id": "z", "parent_task_id": "y", "title": "Z"},
+    ]
+    status_url = client.post(
+        f"/api/v1/projects/{project_id}/import", content=ndjson(rows), headers=headers
+    ).json()["data"]["status_url"]
+    assert JobWorker().run_next()
+    result = client.get(status_url, headers=headers).json()["result"]
+
+    assert result["rows_imported"] == 5
+    assert {error["row"] for error in result["errors"]} == {1, 2, 4}
+    assert "own parent" in result["errors"][0]["error"]
+
+    tasks = client.get("/api/v1/tasks/", params={"project_id": project_id}, headers=headers).json()["items"]
+    parents = {task["title"]: task["parent_task_id"] for task in tasks}
+    ids = {task["title"]: task["id"] for task in tasks}
+    assert parents == {"A": None, "B": ids["A"], "X": None, "Y": ids["X"], "Z": ids["Y"]}
+    # Tree walks over the imported rows finish
+    for task in tasks:
+        response = client.put(f"/api/v1/tasks/{task['id']}", json={"status": "done"}, headers=headers)
+        assert response.status_code == 200, response.text
+    assert client.get(f"/api/v1/tasks/{ids['X']}/hierarchy", headers=headers).status_code in (200, 403)
@@ -0,0 +1,39 @@
+"""
+Maintenance jobs report progress (and with it a heartbeat) as they go
+"""
+from app.database import SessionLocal
+from app.jobs import JobWorker
+from app.models.database import Project
+
+
+def run_job(client, headers, kind: str, payload=None) -> dict:
+    response = client.post("/api/v1/jobs/", json={"kind": kind, "payload": payload or {}}, headers=headers)
+    assert response.status_code == 202, response.text
+    assert JobWorker().run_next()
+    job = client.get(f"/api/v1/jobs/{response.json()['id']}", headers=headers).json()
+    assert job["status"] == "succeeded", job["error"]
+    return job
+
+
+def test_rollup_rebuild_reports_each_project(client, make_user, make_project):
+    headers, _ = make_user(role="admin")
+    make_project(headers)
+    with SessionLocal() as db:
+        projects = db.query(Project).count()
+
+    job = run_job(client, headers, "rollups.rebuild")
+    assert job["progress_total"] == projects
+    assert job["progress_done"] == projects
+    assert job["result"] == {"corrected": 0}
+
+
+def test_search_rebuild_reports_each_record_type(client, make_user, make_project):
+    headers, _ = make_user(role="admin")
+    project_id = make_project(headers)
+    client.post("/api/v1/tasks/", json={"title": "Reindexed quokka", "project_id": project_id}, headers=headers)
+
+    job = run_job(client, headers, "search.rebuild")
+    assert (job["progress_done"], job["progress_total"]) == (3, 3)
+    assert job["result"]["indexed"] > 0
+    response = client.get("/api/v1/search", params={"q": "quokka"}, headers=headers)
+    assert [hit["title"] for hit in response.json()["items"]] == ["Reindexed quokka"]
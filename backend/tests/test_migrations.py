@@ -0,0 +1,36 @@
+"""
+Schema migrations and the hot-path query plan check
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import engine
+from app.migrations import MIGRATIONS, check_query_plans
+from app.models.database import Base
+
+
+def test_hot_path_queries_use_indexes(client):
+    results = check_query_plans(engine)
+    failures = {name: plan for name, plan, ok in results if not ok}
+    assert not failures
+
+
+def test_index_migrations_create_only_their_indexes():
+    scratch = create_engine("sqlite://")
+    Base.metadata.create_all(scratch)
+    with scratch.begin() as conn:
+        for index in Base.metadata.tables["tasks"].indexes:
+            if len(index.columns) > 1:  # the composite indexes added by migrations
+                index.drop(bind=conn)
+
+    def task_indexes():
+        return {index["name"] for index in inspect(scratch).get_indexes("tasks")}
+
+    migrations = {m.version: m for m in MIGRATIONS}
+    with scratch.begin() as conn:
+        migrations[1].upgrade(conn)
+    assert "ix_tasks_project_order" in task_indexes()
+    assert "ix_tasks_project_stats" not in task_indexes()
+
+    with scratch.begin() as conn:
+        migrations[7].upgrade(conn)
+    assert "ix_tasks_project_stats" in task_indexes()
@@ -0,0 +1,64 @@
+"""
+Project stats: cached per project version and recomputed after task writes
+"""
+import pytest
+
+
+@pytest.fixture
+def project(client, make_user, make_project):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    task_ids = [
+        client.post("/api/v1/tasks/", json={
+            "title": f"Task {n}", "project_id": project_id, "priority": "high" if n else "low"
+        }, headers=headers).json()["id"]
+        for n in range(3)
+    ]
+    return headers, user_id, project_id, task_ids
+
+
+def get_stats(client, headers, project_id):
+    response = client.get(f"/api/v1/projects/{project_id}/stats", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_stats_are_cached_until_a_task_write(client, project):
+    headers, user_id, project_id, task_ids = project
+    stats = get_stats(client, headers, project_id)
+    assert (stats["total"], stats["completed"]) == (3, 0)
+    assert stats["by_priority"] == {"low": 1, "high": 2}
+    # Served from the cache while nothing changes
+    assert get_stats(client, headers, project_id) == stats
+
+    writes = [
+        lambda: client.post("/api/v1/tasks/", json={"title": "Task 3", "project_id": project_id}, headers=headers),
+        lambda: client.put(f"/api/v1/tasks/{task_ids[0]}", json={"status": "done"}, headers=headers),
+        lambda: client.patch("/api/v1/tasks/bulk", json={
+            "task_ids": task_ids[1:], "changes": {"assignee_id": user_id}
+        }, headers=headers),
+        lambda: client.delete(f"/api/v1/tasks/{task_ids[2]}", headers=headers),
+    ]
+    expected = [
+        {"total": 4, "completed": 0},
+        {"total": 4, "completed": 1},
+        {"total": 4, "completed": 1},
+        {"total": 3, "completed": 1},
+    ]
+    for write, counts in zip(writes, expected):
+        assert write().status_code == 200
+        previous, stats = stats, get_stats(client, headers, project_id)
+        assert stats["version"] > previous["version"]
+        assert stats["computed_at"] != previous["computed_at"]
+        assert {key: stats[key] for key in counts} == counts
+
+    assert stats["by_status"]["done"] == 1
+    assert {row["assignee_id"]: row["total"] for row in stats["by_assignee"]} == {user_id: 1, None: 2}
+
+
+def test_writes_elsewhere_keep_the_cached_stats(client, make_project, project):
+    headers, _, project_id, _ = project
+    stats = get_stats(client, headers, project_id)
+    other_id = make_project(headers)
+    client.post("/api/v1/tasks/", json={"title": "Elsewhere", "project_id": other_id}, headers=headers)
+    assert get_stats(client, headers, project_id) == stats
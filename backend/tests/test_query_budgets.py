@@ -0,0 +1,104 @@
+"""
+Query budgets for the hot read endpoints
+
+Each endpoint is called with cold caches at two data sizes: the statement
+count must stay within the budget and must not grow with the number of
+rows (no statement shape repeated per row, i.e. no N+1 loops).
+"""
+import pytest
+
+from app.instrumentation import query_budget
+
+SIZES = [2, 8]
+
+
+def add_member(client, headers, project_id: int, user_id: int, role: str = "MEMBER"):
+    response = client.post(f"/api/v1/projects/{project_id}/members", json={
+        "user_id": user_id, "role": role
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def create_task(client, headers, project_id: int, parent_task_id=None) -> int:
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Budget task", "project_id": project_id, "parent_task_id": parent_task_id
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def create_checklist(client, headers, task_id: int, items: int) -> int:
+    response = client.post(f"/api/v1/tasks/{task_id}/checklists", json={
+        "title": "Budget checklist", "task_id": task_id
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    checklist_id = response.json()["id"]
+    for _ in range(items):
+        response = client.post(f"/api/v1/checklists/{checklist_id}/action-items", json={
+            "title": "Budget item", "checklist_id": checklist_id
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+    return checklist_id
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_task_list_budget(client, make_user, make_project, cold_caches, size):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+    for _ in range(size):
+        create_task(client, headers, project_id)
+
+    cold_caches()
+    with query_budget(4, allow_repeated=False):
+        response = client.get("/api/v1/tasks/", params={"project_id": project_id, "limit": 5}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_task_hierarchy_budget(client, make_user, make_project, cold_caches, size):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    add_member(client, headers, project_id, user_id, "OWNER")  # checklist routes check membership
+    root_id = create_task(client, headers, project_id)
+    for _ in range(size):
+        subtask_id = create_task(client, headers, project_id, parent_task_id=root_id)
+        create_task(client, headers, project_id, parent_task_id=subtask_id)
+        create_checklist(client, headers, subtask_id, items=2)
+
+    cold_caches()
+    with query_budget(6, allow_repeated=False):
+        response = client.get(f"/api/v1/tasks/{root_id}/hierarchy", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["subtasks"]) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_task_checklists_budget(client, make_user, make_project, cold_caches, size):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    add_member(client, headers, project_id, user_id, "OWNER")
+    task_id = create_task(client, headers, project_id)
+    for _ in range(size):
+        create_checklist(client, headers, task_id, items=3)
+
+    cold_caches()
+    with query_budget(5, allow_repeated=False):
+        response = client.get(f"/api/v1/tasks/{task_id}/checklists", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_project_members_budget(client, make_user, make_project, cold_caches, size):
+    headers, _ = make_user()
+    project_id = make_project(headers)
+    for _ in range(size):
+        _, user_id = make_user()
+        add_member(client, headers, project_id, user_id)
+
+    cold_caches()
+    with query_budget(4, allow_repeated=False):
+        response = client.get(f"/api/v1/projects/{project_id}/members", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= size
@@ -0,0 +1,58 @@
+"""
+Stored completion rollups stay in step with the rows they count
+
+Every assertion is also cross-checked against rebuild_rollups, which
+recomputes the counters from scratch and reports any drift.
+"""
+from app.crud import TaskHierarchyCRUD
+from app.database import SessionLocal
+
+
+def completion(client, headers, task_id: int):
+    response = client.get(f"/api/v1/tasks/{task_id}/completion", headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return body["completed_items"], body["total_items"]
+
+
+def assert_no_drift(project_id: int):
+    with SessionLocal() as db:
+        assert TaskHierarchyCRUD.rebuild_rollups(db, project_id=project_id) == 0
+
+
+def test_rollups_follow_bulk_create_update_and_delete(client, make_user, make_project):
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    client.post(f"/api/v1/projects/{project_id}/members", json={"user_id": user_id, "role": "OWNER"}, headers=headers)
+    existing_id = client.post("/api/v1/tasks/", json={"title": "Existing", "project_id": project_id},
+                              headers=headers).json()["id"]
+
+    response = client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": "Root", "project_id": project_id, "ref": "root"},
+        {"title": "A", "project_id": project_id, "ref": "a", "parent_ref": "root", "status": "done"},
+        {"title": "B", "project_id": project_id, "ref": "b", "parent_ref": "root"},
+        {"title": "C", "project_id": project_id, "parent_ref": "a", "status": "done"},
+        {"title": "D", "project_id": project_id, "parent_task_id": existing_id, "status": "done"},
+    ]}, headers=headers)
+    assert response.json()["created"] == 5
+    root_id, a_id, b_id = (row["id"] for row in response.json()["results"][:3])
+
+    assert completion(client, headers, root_id) == (2, 3)
+    assert completion(client, headers, a_id) == (1, 1)
+    assert completion(client, headers, existing_id) == (1, 1)
+    assert_no_drift(project_id)
+
+    response = client.patch("/api/v1/tasks/bulk", json={"task_ids": [b_id], "changes": {"status": "done"}},
+                            headers=headers)
+    assert response.json()["updated"] == 1
+    assert completion(client, headers, root_id) == (3, 3)
+    response = client.patch("/api/v1/tasks/bulk", json={
+        "filter": {"project_id": project_id, "status": "done"}, "changes": {"status": "todo"}
+    }, headers=headers)
+    assert completion(client, headers, root_id) == (0, 3)
+    assert completion(client, headers, existing_id) == (0, 1)
+    assert_no_drift(project_id)
+
+    assert client.delete(f"/api/v1/tasks/{a_id}", headers=headers).status_code == 200
+    assert completion(client, headers, root_id) == (0, 1)
+    assert_no_drift(project_id)
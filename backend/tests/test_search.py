@@ -0,0 +1,94 @@
+"""
+Full-text search: FTS5 ranking on SQLite and the LIKE fallback
+"""
+import pytest
+
+from app import crud
+
+
+@pytest.fixture
+def board(client, make_user, make_project):
+    """A project with 'quasar' in a title, in a description, in a checklist
+    and in an action item, plus another user's project with a title hit"""
+    headers, user_id = make_user()
+    project_id = make_project(headers)
+    client.post(f"/api/v1/projects/{project_id}/members", json={"user_id": user_id, "role": "OWNER"}, headers=headers)
+
+    def task(title, description=None, project=project_id, auth=headers):
+        return client.post("/api/v1/tasks/", json={
+            "title": title, "description": description, "project_id": project
+        }, headers=auth).json()["id"]
+
+    ids = {
+        "description": task("Telescope maintenance", "Recalibrate before the quasar survey"),
+        "title": task("Quasar survey", "Point the array north"),
+    }
+    checklist = client.post(f"/api/v1/tasks/{ids['title']}/checklists", json={
+        "title": "Quasar targets", "task_id": ids["title"]
+    }, headers=headers).json()
+    ids["checklist"] = checklist["id"]
+    ids["action_item"] = client.post(f"/api/v1/checklists/{checklist['id']}/action-items", json={
+        "title": "Confirm quasar coordinates", "checklist_id": checklist["id"]
+    }, headers=headers).json()["id"]
+
+    other_headers, _ = make_user()
+    task("Quasar survey (private)", project=make_project(other_headers), auth=other_headers)
+    return headers, project_id, ids
+
+
+def search(client, headers, q, **params):
+    response = client.get("/api/v1/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def hits(page):
+    return [(hit["type"], hit["id"]) for hit in page["items"]]
+
+
+def test_title_hits_rank_above_description_hits(client, board):
+    headers, _, ids = board
+    page = search(client, headers, "quasar survey")
+    assert hits(page) == [("task", ids["title"]), ("task", ids["description"])]
+    assert page["items"][0]["score"] > page["items"][1]["score"]
+    assert "<mark>" in page["items"][1]["snippet"]
+
+
+def test_every_record_type_is_found_only_in_accessible_projects(client, board):
+    headers, _, ids = board
+    page = search(client, headers, "quasar")
+    assert page["total"] == 4
+    assert set(hits(page)) == {("task", ids["title"]), ("task", ids["description"]),
+                               ("checklist", ids["checklist"]), ("action_item", ids["action_item"])}
+    assert hits(search(client, headers, "quasar", type="action_item")) == [("action_item", ids["action_item"])]
+
+
+def test_last_term_matches_as_prefix(client, board):
+    headers, _, ids = board
+    assert ("task", ids["title"]) in hits(search(client, headers, "survey quas"))
+    assert search(client, headers, "quas")["total"] == 4
+
+
+def test_index_follows_writes(client, board):
+    headers, _, ids = board
+    client.put(f"/api/v1/tasks/{ids['title']}", json={"title": "Pulsar survey"}, headers=headers)
+    assert ("task", ids["title"]) in hits(search(client, headers, "pulsar"))
+    assert ("task", ids["title"]) not in hits(search(client, headers, "quasar"))
+
+    client.delete(f"/api/v1/action-items/{ids['action_item']}", headers=headers)
+    assert ("action_item", ids["action_item"]) not in hits(search(client, headers, "quasar"))
+
+
+def test_like_fallback(client, board, monkeypatch):
+    """Databases without FTS5 match every term with LIKE; full-title matches rank first"""
+    headers, _, ids = board
+    monkeypatch.setattr(crud, "fts_available", lambda conn: False)
+
+    page = search(client, headers, "quasar survey")
+    assert hits(page) == [("task", ids["title"]), ("task", ids["description"])]
+    assert page["items"][0]["score"] > page["items"][1]["score"]
+
+    page = search(client, headers, "QUASAR")
+    assert page["total"] == 4
+    assert hits(search(client, headers, "quasar", type="checklist")) == [("checklist", ids["checklist"])]
+    assert search(client, headers, "quasar_")["total"] == 0  # LIKE wildcards in terms are literal
@@ -0,0 +1,85 @@
+"""
+Keyset pagination of the task list: (order_index, id) cursors
+"""
+import base64
+
+import pytest
+
+# order_index per task: ties at 1 and 2 make page boundaries fall inside a run
+ORDER = [1, 1, 0, 2, 1, 2, 1, 0]
+
+
+@pytest.fixture
+def tasks(client, make_user, make_project):
+    """A project with ORDER tasks; every third one is done. Returns (headers, project_id, tasks)"""
+    headers, _ = make_user()
+    project_id = make_project(headers)
+    created = []
+    for position, order_index in enumerate(ORDER):
+        task_id = client.post("/api/v1/tasks/", json={
+            "title": f"Task {position}", "project_id": project_id
+        }, headers=headers).json()["id"]
+        status = "done" if position % 3 == 0 else "todo"
+        response = client.put(f"/api/v1/tasks/{task_id}", json={"order_index": order_index, "status": status},
+                              headers=headers)
+        assert response.status_code == 200, response.text
+        created.append({"id": task_id, "order_index": order_index, "status": status})
+    return headers, project_id, sorted(created, key=lambda task: (task["order_index"], task["id"]))
+
+
+def get_page(client, headers, **params):
+    response = client.get("/api/v1/tasks/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, len(ORDER)])
+def test_cursor_pages_cover_every_task_once(client, tasks, limit):
+    headers, project_id, expected = tasks
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"project_id": project_id, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        page = get_page(client, headers, **params)
+        assert page["total"] == len(ORDER)
+        seen += [task["id"] for task in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [task["id"] for task in expected]
+    assert pages == -(-len(ORDER) // limit)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"no separator").decode(),
+    base64.urlsafe_b64encode(b"1:two").decode(),
+    base64.urlsafe_b64encode(b"1:2:3").decode(),
+])
+def test_malformed_cursor_is_rejected(client, tasks, cursor):
+    headers, project_id, _ = tasks
+    response = client.get("/api/v1/tasks/", params={"project_id": project_id, "cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_past_the_end_gives_an_empty_page(client, tasks):
+    headers, project_id, _ = tasks
+    cursor = base64.urlsafe_b64encode(b"99:999999").decode().rstrip("=")
+    page = get_page(client, headers, project_id=project_id, cursor=cursor)
+    assert page["items"] == []
+    assert page["next_cursor"] is None
+
+
+def test_filter_change_continues_from_the_cursor_position(client, tasks):
+    """A cursor is a position in the (order_index, id) order, not a snapshot
+    of the query: with other filters the page starts after the same row"""
+    headers, project_id, expected = tasks
+    first = get_page(client, headers, project_id=project_id, limit=3)
+    page = get_page(client, headers, project_id=project_id, status="done", cursor=first["next_cursor"])
+
+    after_cursor = expected[3:]
+    assert [task["id"] for task in page["items"]] == [task["id"] for task in after_cursor if task["status"] == "done"]
+    assert page["total"] == sum(task["status"] == "done" for task in expected)